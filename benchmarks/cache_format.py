@@ -0,0 +1,95 @@
+"""
+Pipeline cache layers: JSON (indent=2 and compact) vs. the sectioned zlib format of
+pdf_grepper.cache (encode_layer / LazyLayer).
+
+Builds a synthetic exported model (pages of text spans plus entities and relations), writes it in
+each format and reports the file size, the time to rebuild the whole DocumentModel and the time to
+read only the entities.
+
+    python benchmarks/cache_format.py [--pages 500] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+SENTENCE = "The maintenance contractor shall inspect pump station {n} and report to the operator."
+
+
+def _make_model(pages: int):
+	from pdf_grepper.types import DocumentModel, Entity, Page, Relation, SourceSpan, TextSpan
+
+	model = DocumentModel(sources=["synthetic.pdf"])
+	for i in range(pages):
+		page = Page(index=i, kind="native")
+		for k in range(30):
+			span = SourceSpan(page_index=i, bbox=(72.0, 72.0 + 20 * k, 540.0, 86.0 + 20 * k), source_path="synthetic.pdf")
+			page.text_blocks.append(TextSpan(text=SENTENCE.format(n=i * 30 + k), span=span, confidence=0.98))
+		model.pages.append(page)
+	for i in range(pages * 4):
+		span = SourceSpan(page_index=i // 4, source_path="synthetic.pdf")
+		model.entities.append(Entity(id=f"e{i}", text=f"pump station {i}", label="FACILITY", span=span, confidence=0.9))
+	for i in range(pages * 2):
+		model.relations.append(Relation(id=f"r{i}", subject_id=f"e{i}", predicate="pg:reportsTo", object_id=f"e{i + 1}"))
+	return model
+
+
+def _best(fn, repeat: int) -> float:
+	best = float("inf")
+	for _ in range(repeat):
+		t0 = time.perf_counter()
+		fn()
+		best = min(best, time.perf_counter() - t0)
+	return best
+
+
+def main() -> None:
+	ap = argparse.ArgumentParser()
+	ap.add_argument("--pages", type=int, default=500)
+	ap.add_argument("--repeat", type=int, default=5)
+	args = ap.parse_args()
+	from pdf_grepper.cache import LazyLayer, encode_layer, model_from_dict
+
+	data = asdict(_make_model(args.pages))
+	with tempfile.TemporaryDirectory() as tmp:
+		paths = {
+			"json indent=2": os.path.join(tmp, "layer.pretty.json"),
+			"json compact": os.path.join(tmp, "layer.json"),
+			"pgc": os.path.join(tmp, "layer.pgc"),
+		}
+		with open(paths["json indent=2"], "w", encoding="utf-8") as f:
+			json.dump(data, f, ensure_ascii=False, indent=2)
+		with open(paths["json compact"], "w", encoding="utf-8") as f:
+			json.dump(data, f, ensure_ascii=False)
+		with open(paths["pgc"], "wb") as f:
+			f.write(encode_layer(data))
+
+		def load_json(path):
+			with open(path, "r", encoding="utf-8") as f:
+				return json.load(f)
+
+		def load_pgc(path):
+			with open(path, "rb") as f:
+				return LazyLayer(f.read())
+
+		print(f"{args.pages} pages, {len(data['entities'])} entities, {len(data['relations'])} relations")
+		print(f"{'format':<15}{'size (KiB)':>12}{'model (ms)':>12}{'entities (ms)':>15}")
+		for name, path in paths.items():
+			load = load_pgc if name == "pgc" else load_json
+			full = _best(lambda: model_from_dict(load(path)), args.repeat)
+			entities = _best(lambda: load(path)["entities"], args.repeat)
+			size = os.path.getsize(path) / 1024
+			print(f"{name:<15}{size:>12.0f}{full * 1000:>12.1f}{entities * 1000:>15.1f}")
+
+
+if __name__ == "__main__":
+	main()
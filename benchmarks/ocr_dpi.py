@@ -0,0 +1,112 @@
+"""
+OCR cost per page at the fixed 300 dpi vs. --ocr-dpi auto (pdf_grepper.pdf.loader._choose_ocr_dpi).
+
+Renders a slide, a body-text page, 7pt and 5pt fine print and a 600 dpi scan of the body page, then
+reports the chosen DPI, rendered pixels, render time and - when an OCR engine is available -
+Tesseract time, recognised word count and correct words (recognised words also in the page's text
+layer, the body page's for the scan) for both policies. --engine picks the tesseract binary
+(pytesseract) or in-process libtesseract (tesserocr, timed without the pool's process hop);
+auto uses whichever is installed.
+
+    python benchmarks/ocr_dpi.py [--repeat 3] [--engine auto|pytesseract|tesserocr]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+LINE = "The quick brown fox jumps over the lazy dog 0123456789"
+
+
+def _make_pages():
+	import fitz
+
+	doc = fitz.open()
+	pages = {}
+	for name, fontsize in (("slide 40pt", 40), ("body 11pt", 11), ("fine 7pt", 7), ("fine 5pt", 5)):
+		page = doc.new_page()
+		# drop trailing words until the line fits the page
+		words = LINE.split()
+		while fitz.get_text_length(" ".join(words), fontsize=fontsize) > page.rect.width - 72:
+			words.pop()
+		for y in range(72, 770, int(fontsize * 1.5)):
+			page.insert_text((36, y), " ".join(words), fontsize=fontsize)
+		pages[name] = page.number
+	pix = doc[pages["body 11pt"]].get_pixmap(dpi=600, colorspace=fitz.csGRAY)
+	scan = doc.new_page()
+	scan.insert_image(scan.rect, stream=pix.tobytes("png"))
+	pages["scan 600dpi"] = scan.number
+	# page objects are invalidated by new_page: hand out fresh ones
+	return doc, {name: doc[number] for name, number in pages.items()}
+
+
+def _measure(page, policy, repeat: int, ocr, truth: Counter):
+	from pdf_grepper.pdf.loader import _choose_ocr_dpi, _render_for_ocr
+
+	render_s = ocr_s = 0.0
+	words = correct = None
+	for _ in range(repeat):
+		t0 = time.perf_counter()
+		dpi = _choose_ocr_dpi(page) if policy == "auto" else policy
+		img = _render_for_ocr(page, dpi=dpi)
+		render_s += time.perf_counter() - t0
+		if ocr is not None:
+			t0 = time.perf_counter()
+			found = (ocr(img) or "").split()
+			ocr_s += time.perf_counter() - t0
+			words, correct = len(found), sum((Counter(found) & truth).values())
+	return dpi, img.size, render_s / repeat, (ocr_s / repeat if ocr is not None else None), words, correct
+
+
+def _engine(name: str):
+	"""OCR callable for the engine, or None when it is not installed."""
+	from pdf_grepper.pdf import ocr as ocr_mod
+
+	if name == "auto":
+		name = "pytesseract" if ocr_mod.tesseract_available() else "tesserocr"
+	if name == "pytesseract":
+		return ocr_mod.ocr_image_to_text if ocr_mod.tesseract_available() else None
+	if not ocr_mod.tesserocr_available():
+		return None
+	# the pool worker's Tesseract handle and task, run in this process
+	ocr_mod._init_pool_worker("eng")
+
+	def recognize(img):
+		dpi = img.info.get("dpi")
+		return ocr_mod._pool_recognize(img.mode, img.size, img.tobytes(), int(round(dpi[0])) if dpi else None)
+
+	return recognize
+
+
+def main() -> None:
+	ap = argparse.ArgumentParser()
+	ap.add_argument("--repeat", type=int, default=3)
+	ap.add_argument("--engine", choices=("auto", "pytesseract", "tesserocr"), default="auto")
+	args = ap.parse_args()
+
+	ocr = _engine(args.engine)
+	if ocr is None:
+		print(f"no OCR engine ({args.engine}) found: reporting render cost only")
+	_, pages = _make_pages()
+	print(
+		f"{'page':<14}{'policy':<8}{'dpi':>5}{'pixels':>14}{'render (s)':>12}{'ocr (s)':>10}{'words':>7}{'correct':>9}"
+	)
+	for name, page in pages.items():
+		truth = Counter((pages["body 11pt"] if name.startswith("scan") else page).get_text().split())
+		for policy in (300, "auto"):
+			dpi, size, render_s, ocr_s, words, correct = _measure(page, policy, args.repeat, ocr, truth)
+			ocr_col = f"{ocr_s:>10.2f}" if ocr_s is not None else f"{'-':>10}"
+			words_col = f"{words:>7}{correct:>9}" if words is not None else f"{'-':>7}{'-':>9}"
+			print(
+				f"{name:<14}{str(policy):<8}{dpi:>5}{size[0]:>7}x{size[1]:<6}{render_s:>12.3f}{ocr_col}{words_col}"
+			)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,96 @@
+"""
+Peak RSS of OCR page rasterisation: legacy RGB render + Image.frombytes copy vs. the grayscale
+zero-copy path used by pdf_grepper.pdf.loader._render_for_ocr, and the same path tiled under a
+16 MP budget (--ocr-tile-pixels), rendering one tile at a time.
+
+Each variant runs in a fresh process so ru_maxrss reflects only that variant.
+
+    python benchmarks/ocr_raster_rss.py [--paper a0|a1|a3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import resource
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+PAPER = {"a0": (2384, 3370), "a1": (1684, 2384), "a3": (842, 1191)}
+
+
+def _rss_mib() -> float:
+	# ru_maxrss is KiB on Linux
+	return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _make_page(paper: str):
+	import fitz
+
+	doc = fitz.open()
+	w, h = PAPER[paper]
+	page = doc.new_page(width=w, height=h)
+	for i in range(0, int(h) - 72, 36):
+		page.insert_text((72, 72 + i), f"Engineering drawing annotation line {i}", fontsize=12)
+	return doc, page
+
+
+def _legacy(page):
+	from PIL import Image
+
+	pix = page.get_pixmap(dpi=300, alpha=False)
+	return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+
+def _gray(page):
+	from pdf_grepper.pdf.loader import _render_for_ocr
+
+	return _render_for_ocr(page)
+
+
+def _tiled(page):
+	from pdf_grepper.pdf.loader import _render_for_ocr, _tile_clips
+
+	clips, _ = _tile_clips(page.rect, 300, TILE_PIXELS)
+	largest = (0, 0)
+	for clip in clips:
+		img = _render_for_ocr(page, clip=clip)
+		largest = max(largest, img.size, key=lambda s: s[0] * s[1])
+		del img
+	return largest
+
+
+TILE_PIXELS = 16_000_000
+VARIANTS = {"rgb+copy": lambda p: _legacy(p).size, "gray zero-copy": lambda p: _gray(p).size, "gray tiled": _tiled}
+
+
+def _run(variant: str, paper: str, out) -> None:
+	doc, page = _make_page(paper)
+	before = _rss_mib()
+	t0 = time.perf_counter()
+	size = VARIANTS[variant](page)
+	elapsed = time.perf_counter() - t0
+	out.put((variant, size, _rss_mib() - before, elapsed))
+
+
+def main() -> None:
+	ap = argparse.ArgumentParser()
+	ap.add_argument("--paper", default="a0", choices=sorted(PAPER))
+	args = ap.parse_args()
+	ctx = mp.get_context("spawn")
+	q = ctx.Queue()
+	print(f"paper={args.paper} dpi=300")
+	print(f"{'variant':<16}{'pixels':>16}{'peak RSS delta (MiB)':>24}{'render (s)':>12}")
+	for variant in VARIANTS:
+		p = ctx.Process(target=_run, args=(variant, args.paper, q))
+		p.start()
+		name, size, rss, elapsed = q.get()
+		p.join()
+		print(f"{name:<16}{size[0]:>8}x{size[1]:<7}{rss:>24.1f}{elapsed:>12.2f}")
+
+
+if __name__ == "__main__":
+	main()
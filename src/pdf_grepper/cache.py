@@ -0,0 +1,504 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple, Union
+import json
+import os
+import shutil
+import sqlite3
+import struct
+import tempfile
+import time
+import zlib
+
+from pdf_grepper.types import (
+	DocumentModel,
+	Page,
+	SourceSpan,
+	TextSpan,
+	Entity,
+	Relation,
+	StakeholderPerspective,
+	Dimension,
+	DiagramNode,
+	DiagramEdge,
+)
+
+
+def span_from_dict(d: Optional[dict]) -> Optional[SourceSpan]:
+	if not d:
+		return None
+	return SourceSpan(
+		page_index=d.get("page_index"),
+		bbox=tuple(d["bbox"]) if d.get("bbox") else None,
+		source_path=d.get("source_path"),
+		note=d.get("note"),
+	)
+
+
+def page_from_dict(d: dict) -> Page:
+	page = Page(index=d["index"], kind=d.get("kind"))
+	page.aligned = [span_from_dict(s) for s in d.get("aligned", [])]
+	for ts in d.get("text_blocks", []):
+		page.text_blocks.append(
+			TextSpan(
+				text=ts["text"],
+				span=span_from_dict(ts.get("span")),
+				confidence=ts.get("confidence"),
+				alt_spans=[span_from_dict(a) for a in ts.get("alt_spans", [])],
+				boilerplate=bool(ts.get("boilerplate", False)),
+			)
+		)
+	for n in d.get("diagram_nodes", []):
+		page.diagram_nodes.append(
+			DiagramNode(id=n["id"], label=n.get("label"), span=span_from_dict(n.get("span")), kind=n.get("kind"))
+		)
+	for e in d.get("diagram_edges", []):
+		page.diagram_edges.append(
+			DiagramEdge(
+				id=e["id"],
+				source=e["source"],
+				target=e["target"],
+				label=e.get("label"),
+				span=span_from_dict(e.get("span")),
+				directed=bool(e.get("directed", True)),
+			)
+		)
+	return page
+
+
+def model_from_dict(d: dict) -> DocumentModel:
+	model = DocumentModel(
+		sources=list(d.get("sources", [])),
+		title=d.get("title"),
+		pages=[page_from_dict(p) for p in d.get("pages", [])],
+		entities=[
+			Entity(
+				id=e["id"],
+				text=e["text"],
+				label=e["label"],
+				span=span_from_dict(e.get("span")),
+				confidence=e.get("confidence"),
+				domain_type=e.get("domain_type"),
+			)
+			for e in d.get("entities", [])
+		],
+		relations=[
+			Relation(
+				id=r["id"],
+				subject_id=r["subject_id"],
+				predicate=r["predicate"],
+				object_id=r["object_id"],
+				span=span_from_dict(r.get("span")),
+				confidence=r.get("confidence"),
+			)
+			for r in d.get("relations", [])
+		],
+		stakeholders=[
+			StakeholderPerspective(
+				id=s["id"],
+				actor=s["actor"],
+				claim=s["claim"],
+				span=span_from_dict(s.get("span")),
+				confidence=s.get("confidence"),
+			)
+			for s in d.get("stakeholders", [])
+		],
+		dimensions=[
+			Dimension(
+				id=dm["id"],
+				name=dm["name"],
+				value=dm.get("value"),
+				unit=dm.get("unit"),
+				span=span_from_dict(dm.get("span")),
+				confidence=dm.get("confidence"),
+			)
+			for dm in d.get("dimensions", [])
+		],
+		domain_labels=list(d.get("domain_labels", [])),
+		extra_metadata=dict(d.get("extra_metadata", {})),
+	)
+	return model
+
+
+def write_atomic(path: str, payload: Union[str, bytes]) -> None:
+	"""
+	Write via a temp file + rename so concurrent writers (e.g. loader worker processes) never
+	expose a partially written entry.
+	"""
+	fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+	try:
+		with (os.fdopen(fd, "wb") if isinstance(payload, bytes) else os.fdopen(fd, "w", encoding="utf-8")) as f:
+			f.write(payload)
+		os.replace(tmp, path)
+	except Exception:
+		try:
+			os.unlink(tmp)
+		except OSError:
+			pass
+		raise
+
+
+def read_page(cache_dir: str, key: str) -> Optional[Page]:
+	"""
+	Return the cached Page for a page-content key, or None on a miss or unreadable entry.
+	"""
+	path = os.path.join(cache_dir, f"{key}.json")
+	try:
+		with open(path, "r", encoding="utf-8") as f:
+			page = page_from_dict(json.load(f))
+	except (OSError, ValueError, KeyError, TypeError):
+		return None
+	touch(path)
+	return page
+
+
+def write_page(cache_dir: str, key: str, page: Page) -> None:
+	os.makedirs(cache_dir, exist_ok=True)
+	write_atomic(os.path.join(cache_dir, f"{key}.json"), json.dumps(asdict(page), ensure_ascii=False))
+
+
+# Layer files: LAYER_MAGIC, a little-endian u32 index length, the JSON index {section: [offset, length]}
+# (offsets count from the end of the index), then one zlib-compressed compact-JSON blob per
+# top-level key of the payload, so a reader decodes only the sections it touches.
+LAYER_MAGIC = b"PGC1"
+LAYER_SUFFIX = ".pgc"
+LAYER_LEVEL = 6
+
+
+def encode_layer(data: Mapping[str, object], level: int = LAYER_LEVEL) -> bytes:
+	index: Dict[str, List[int]] = {}
+	blobs: List[bytes] = []
+	offset = 0
+	for name, value in data.items():
+		blob = zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), level)
+		index[name] = [offset, len(blob)]
+		blobs.append(blob)
+		offset += len(blob)
+	header = json.dumps(index, separators=(",", ":")).encode("utf-8")
+	return b"".join([LAYER_MAGIC, struct.pack("<I", len(header)), header, *blobs])
+
+
+class LazyLayer(Mapping):
+	"""
+	Read-only mapping over an encoded layer: each section is decompressed and parsed on first
+	access, so e.g. reading entities never touches the pages.
+	"""
+
+	def __init__(self, blob: bytes):
+		if blob[: len(LAYER_MAGIC)] != LAYER_MAGIC:
+			raise ValueError("not a layer file")
+		start = len(LAYER_MAGIC) + 4
+		(size,) = struct.unpack_from("<I", blob, len(LAYER_MAGIC))
+		self._index: Dict[str, List[int]] = json.loads(blob[start : start + size])
+		self._base = start + size
+		if any(off < 0 or self._base + off + n > len(blob) for off, n in self._index.values()):
+			raise ValueError("truncated layer file")
+		self._blob = blob
+		self._decoded: Dict[str, object] = {}
+
+	@property
+	def nbytes(self) -> int:
+		return len(self._blob)
+
+	def __getitem__(self, name: str) -> object:
+		if name not in self._decoded:
+			off, n = self._index[name]
+			start = self._base + off
+			try:
+				self._decoded[name] = json.loads(zlib.decompress(self._blob[start : start + n]))
+			except zlib.error as e:
+				raise ValueError(f"corrupt layer section {name!r}") from e
+		return self._decoded[name]
+
+	def __iter__(self) -> Iterator[str]:
+		return iter(self._index)
+
+	def __len__(self) -> int:
+		return len(self._index)
+
+
+def layer_path(cache_dir: str, layer: str, key: str, suffix: str = LAYER_SUFFIX) -> str:
+	return os.path.join(cache_dir, layer, f"{key}{suffix}")
+
+
+def read_layer(cache_dir: str, layer: str, key: str) -> Optional[LazyLayer]:
+	"""
+	Return the cached payload of one pipeline layer (ingest, ie, domain, export), or None on a miss.
+	Sections are decoded lazily (see LazyLayer).
+	"""
+	path = layer_path(cache_dir, layer, key)
+	try:
+		with open(path, "rb") as f:
+			data = LazyLayer(f.read())
+	except (OSError, ValueError, struct.error):
+		return None
+	touch(path)
+	return data
+
+
+def write_layer(cache_dir: str, layer: str, key: str, data: dict) -> int:
+	"""Write one layer; returns the bytes written."""
+	path = layer_path(cache_dir, layer, key)
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	blob = encode_layer(data)
+	write_atomic(path, blob)
+	return len(blob)
+
+
+def _entries(directory: str, keep: Tuple[str, ...] = ()) -> List[Tuple[float, int, str]]:
+	"""
+	(mtime, size, path) of every file below directory, except top-level files named in keep.
+	"""
+	found: List[Tuple[float, int, str]] = []
+	for root, _, files in os.walk(directory):
+		for name in files:
+			if root == directory and name in keep:
+				continue
+			path = os.path.join(root, name)
+			try:
+				st = os.stat(path)
+			except OSError:
+				continue
+			found.append((st.st_mtime, st.st_size, path))
+	return found
+
+
+def directory_size(directory: str) -> int:
+	return sum(size for _, size, _ in _entries(directory))
+
+
+def evict_lru(directory: str, max_bytes: int, target_ratio: float = 0.9) -> int:
+	"""
+	Delete least recently used files (oldest mtime first; readers bump mtime on hit) until the
+	directory holds at most target_ratio * max_bytes. Returns the remaining size in bytes.
+	"""
+	return _evict(sorted(_entries(directory)), max_bytes, target_ratio)[0]
+
+
+def _evict(entries: List[Tuple[float, int, str]], max_bytes: int, target_ratio: float) -> Tuple[int, int]:
+	"""(remaining bytes, files removed) after evicting the oldest of mtime-sorted entries."""
+	total = sum(size for _, size, _ in entries)
+	if total <= max_bytes:
+		return total, 0
+	target = int(max_bytes * target_ratio)
+	removed = 0
+	for _, size, path in entries:
+		if total <= target:
+			break
+		freed = _drop(path, size)
+		if freed is not None:
+			total -= freed
+			removed += 1
+	return total, removed
+
+
+def _drop(path: str, size: int) -> Optional[int]:
+	"""Delete one entry (the NER memo is emptied in place instead); the bytes freed, None on failure."""
+	if os.path.basename(path) == NER_MEMO_FILE:
+		return _empty_memo(path, size)
+	try:
+		os.unlink(path)
+		return size
+	except OSError:
+		return None
+
+
+def _memo_entry(cache_dir: str) -> Optional[Tuple[float, int, str]]:
+	"""(mtime, size with its SQLite sidecars, path) of the NER memo, None without one."""
+	path = os.path.join(cache_dir, NER_MEMO_FILE)
+	try:
+		mtime = os.stat(path).st_mtime
+	except OSError:
+		return None
+	size = sum(os.path.getsize(path + s) for s in ("", *_SQLITE_SIDECARS) if os.path.exists(path + s))
+	return mtime, size, path
+
+
+def _empty_memo(path: str, size: int) -> Optional[int]:
+	"""Delete every memo row and VACUUM the file: runs holding it open keep a valid, empty memo."""
+	try:
+		db = sqlite3.connect(path, timeout=30)
+		try:
+			with db:
+				db.execute("DELETE FROM ner")
+			db.execute("VACUUM")
+		finally:
+			db.close()
+	except sqlite3.Error:
+		return None
+	left = _memo_entry(os.path.dirname(path))
+	return size - (left[1] if left else 0)
+
+
+def touch(path: str) -> None:
+	"""
+	Mark a cache entry as recently used.
+	"""
+	try:
+		os.utime(path)
+	except OSError:
+		pass
+
+
+# Pipeline cache policy defaults (run_pipeline cache_max_bytes / cache_max_age_days; 0 = unlimited)
+CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+CACHE_MAX_AGE_DAYS = 0.0
+# Bookkeeping files at the top of a cache dir, never deleted. The NER memo is one SQLite file other
+# processes may hold open: it counts toward the policy as one entry, and eviction empties it in place.
+STATS_FILE = "stats.json"
+FINGERPRINTS_FILE = "fingerprints.json"
+NER_MEMO_FILE = "ner.sqlite"
+_META_FILES = (STATS_FILE, FINGERPRINTS_FILE, NER_MEMO_FILE)
+# What a pipeline cache dir holds: per-stage layer dirs, page/OCR results and compiled gazetteers
+CACHE_AREAS = ("pages", "ocr", "ingest", "ie", "domain", "export", "gazetteer")
+_SQLITE_SIDECARS = ("-journal", "-wal", "-shm")
+
+
+@dataclass
+class CacheStats:
+	"""Layer cache counters; a run's counters are added to the totals in <cache_dir>/stats.json."""
+
+	hits: int = 0
+	misses: int = 0
+	bytes_read: int = 0
+	bytes_written: int = 0
+	evicted: int = 0
+
+	def add(self, other: "CacheStats") -> None:
+		for f in fields(self):
+			setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+
+def load_stats(cache_dir: str) -> CacheStats:
+	try:
+		with open(os.path.join(cache_dir, STATS_FILE), "r", encoding="utf-8") as f:
+			data = json.load(f)
+		return CacheStats(**{f.name: int(data.get(f.name, 0)) for f in fields(CacheStats)})
+	except (OSError, ValueError, TypeError, AttributeError):
+		return CacheStats()
+
+
+def record_stats(cache_dir: str, run: CacheStats) -> CacheStats:
+	"""Add a run's counters to the persisted totals; returns the new totals."""
+	totals = load_stats(cache_dir)
+	totals.add(run)
+	os.makedirs(cache_dir, exist_ok=True)
+	write_atomic(os.path.join(cache_dir, STATS_FILE), json.dumps(asdict(totals)))
+	return totals
+
+
+def prune(cache_dir: str, max_bytes: int = CACHE_MAX_BYTES, max_age_days: float = CACHE_MAX_AGE_DAYS) -> Tuple[int, int]:
+	"""
+	Enforce the cache policy on every entry below cache_dir (layers, pages, OCR results, the NER
+	memo): drop entries not used for max_age_days, then least recently used ones until the total fits
+	max_bytes (0 = no limit). Returns (remaining bytes, entries removed).
+	"""
+	if not os.path.isdir(cache_dir):
+		return 0, 0
+	entries = _entries(cache_dir, keep=_META_FILES + tuple(NER_MEMO_FILE + s for s in _SQLITE_SIDECARS))
+	memo = _memo_entry(cache_dir)
+	if memo is not None:
+		entries.append(memo)
+	entries.sort()
+	removed = 0
+	if max_age_days > 0:
+		cutoff = time.time() - max_age_days * 86400
+		fresh = []
+		for entry in entries:
+			freed = None if entry[0] >= cutoff else _drop(entry[2], entry[1])
+			if freed is None:
+				fresh.append(entry)
+			else:
+				removed += 1
+				if entry[1] > freed:
+					fresh.append((time.time(), entry[1] - freed, entry[2]))
+		entries = sorted(fresh)
+	if max_bytes > 0:
+		total, evicted = _evict(entries, max_bytes, 0.9)
+		return total, removed + evicted
+	return sum(size for _, size, _ in entries), removed
+
+
+def is_cache_dir(cache_dir: str) -> bool:
+	"""True for a directory a pipeline run has used as its cache (every run records stats.json)."""
+	return os.path.isfile(os.path.join(cache_dir, STATS_FILE)) or os.path.isfile(
+		os.path.join(cache_dir, FINGERPRINTS_FILE)
+	)
+
+
+def clear(cache_dir: str) -> int:
+	"""
+	Delete the cache areas (CACHE_AREAS), the NER memo and the bookkeeping files; returns the bytes
+	freed. Anything else in the directory is left alone, and a directory that is not a pipeline
+	cache (see is_cache_dir) is refused with ValueError.
+	"""
+	if not os.path.isdir(cache_dir):
+		return 0
+	if not is_cache_dir(cache_dir):
+		raise ValueError(f"Not a pdf-grepper cache directory: {cache_dir}")
+	freed = 0
+	for name in CACHE_AREAS:
+		path = os.path.join(cache_dir, name)
+		if os.path.isdir(path) and not os.path.islink(path):
+			freed += directory_size(path)
+			shutil.rmtree(path, ignore_errors=True)
+	names = [NER_MEMO_FILE + suffix for suffix in _SQLITE_SIDECARS] + list(_META_FILES)
+	for name in names:
+		path = os.path.join(cache_dir, name)
+		try:
+			size = os.path.getsize(path)
+			os.unlink(path)
+			freed += size
+		except OSError:
+			pass
+	return freed
+
+
+# Files modified this recently are not recorded: a later write within the same mtime tick would
+# go unnoticed (git's "racily clean" problem)
+FINGERPRINT_RACE_NS = 2_000_000_000
+
+
+class FingerprintIndex:
+	"""
+	Persistent map of file path -> content digests, valid while (size, mtime_ns, inode) is unchanged,
+	so unchanged inputs are not re-read to compute cache keys. Stored as one JSON file; entries of
+	files that have since changed are simply overwritten.
+	"""
+
+	def __init__(self, path: str):
+		self.path = path
+		self.dirty = False
+		try:
+			with open(path, "r", encoding="utf-8") as f:
+				self._entries: Dict[str, dict] = json.load(f)
+		except (OSError, ValueError):
+			self._entries = {}
+
+	@staticmethod
+	def _stamp(st: os.stat_result) -> List[int]:
+		return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+	def lookup(self, path: str, st: os.stat_result, algo: str) -> Optional[str]:
+		entry = self._entries.get(os.path.abspath(path))
+		if not entry or entry.get("stat") != self._stamp(st):
+			return None
+		return entry.get("digests", {}).get(algo)
+
+	def record(self, path: str, st: os.stat_result, algo: str, digest: str) -> None:
+		if time.time_ns() - st.st_mtime_ns < FINGERPRINT_RACE_NS:
+			return
+		key = os.path.abspath(path)
+		entry = self._entries.get(key)
+		if not entry or entry.get("stat") != self._stamp(st):
+			entry = self._entries[key] = {"stat": self._stamp(st), "digests": {}}
+		entry["digests"][algo] = digest
+		self.dirty = True
+
+	def save(self) -> None:
+		if not self.dirty:
+			return
+		os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+		write_atomic(self.path, json.dumps(self._entries, sort_keys=True))
+		self.dirty = False
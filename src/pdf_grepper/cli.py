@@ -8,12 +8,16 @@ from typing import Optional
 import typer
 from rich import print
 
+from pdf_grepper import cache as cache_mod
 from pdf_grepper.da import run_da
+from pdf_grepper.inputs import HASH_ALGOS, hash_available
 from pdf_grepper.meaning import run_meaning
 from pdf_grepper.pipeline import run_pipeline
 from pdf_grepper.validate import load_graph, validate_with_pyshacl
 
 app = typer.Typer(add_completion=False, no_args_is_help=True)
+cache_app = typer.Typer(add_completion=False, no_args_is_help=True, help="Inspect and manage a pipeline cache directory.")
+app.add_typer(cache_app, name="cache")
 
 
 @app.callback()
@@ -28,12 +32,64 @@ def parse_command(
 	out: str = typer.Option("model.ttl", "--out", "-o", help="Output Turtle path."),
 	json_out: Optional[str] = typer.Option(None, "--json", help="Optional JSON mirror path."),
 	ocr: str = typer.Option("auto", "--ocr", help="OCR mode: none|local|auto"),
+	ocr_engine: str = typer.Option(
+		"pytesseract", "--ocr-engine", help="OCR engine: pytesseract|tesserocr (persistent worker pool)"
+	),
 	cloud: str = typer.Option("", "--cloud", help="Comma-list: openai,google,aws,azure"),
 	enrich_web: bool = typer.Option(False, "--enrich-web", help="Enable web enrichment for domain inference."),
 	offline: bool = typer.Option(False, "--offline", help="Disable all network calls."),
 	base_uri: str = typer.Option("http://example.org/pdf-grepper/", "--base-uri", help="Base URI for RDF resources."),
+	ocr_regions: bool = typer.Option(
+		False, "--ocr-regions", help="OCR only image regions lacking vector text instead of whole pages."
+	),
+	ocr_prefetch: int = typer.Option(
+		0, "--ocr-prefetch", help="Pipeline page rendering and OCR, holding at most N rendered pages (0 = off)."
+	),
+	ocr_dpi: str = typer.Option(
+		"300", "--ocr-dpi", help="OCR render resolution: auto (per page, from text height and scan resolution) or a DPI."
+	),
+	ocr_tile_pixels: int = typer.Option(
+		0, "--ocr-tile-pixels", help="OCR pages larger than N rendered pixels as overlapping tiles (0 = never tile)."
+	),
+	align_sources: bool = typer.Option(
+		False, "--align-sources", help="Align pages across PDF inputs; skip OCR of scans matching a native-text page."
+	),
+	fuse_sources: bool = typer.Option(
+		False, "--fuse-sources", help="Fuse near-duplicate text blocks across inputs into one span with multi-source provenance (not with --stream-window)."
+	),
+	skip_boilerplate: bool = typer.Option(
+		False, "--skip-boilerplate", help="Detect running headers/footers/page numbers; skip them in IE, export them once."
+	),
+	workers: int = typer.Option(1, "--workers", help="Worker processes for page-parallel PDF ingestion."),
+	stream_window: int = typer.Option(
+		0, "--stream-window", help="Stream pages through the pipeline in windows of N pages (0 = load whole document)."
+	),
+	cache: Optional[str] = typer.Option(None, "--cache", help="Cache directory for pages, OCR results and stage layers."),
+	cache_max_mb: int = typer.Option(
+		cache_mod.CACHE_MAX_BYTES // (1024 * 1024), "--cache-max-mb", help="Evict least recently used cache entries above N MiB, NER memo included (0 = no limit)."
+	),
+	cache_max_age: float = typer.Option(
+		cache_mod.CACHE_MAX_AGE_DAYS, "--cache-max-age", help="Evict cache entries unused for N days (0 = no limit)."
+	),
+	hash_algo: str = typer.Option("sha256", "--hash-algo", help="Content digest for cache keys: sha256|xxh3_128 (needs pdf-grepper[xxhash])"),
+	ner_processes: int = typer.Option(1, "--ner-processes", help="Processes for spaCy NER (nlp.pipe n_process)."),
+	gazetteer: Optional[list[str]] = typer.Option(
+		None, "--gazetteer", help="Entity dictionary file (name[<TAB>label] per line); repeatable."
+	),
 ) -> None:
 	cloud_list = [c.strip() for c in cloud.split(",") if c.strip()]
+	if ocr_dpi != "auto" and not ocr_dpi.isdigit():
+		print(f"[red]--ocr-dpi must be 'auto' or a positive integer, got {ocr_dpi!r}[/red]")
+		raise typer.Exit(code=2)
+	if hash_algo not in HASH_ALGOS:
+		print(f"[red]--hash-algo must be one of {'|'.join(HASH_ALGOS)}, got {hash_algo!r}[/red]")
+		raise typer.Exit(code=2)
+	if fuse_sources and stream_window > 0:
+		print("[red]--fuse-sources cannot be combined with --stream-window[/red]")
+		raise typer.Exit(code=2)
+	if not hash_available(hash_algo):
+		print(f"[red]--hash-algo {hash_algo} needs xxhash; install pdf-grepper[xxhash][/red]")
+		raise typer.Exit(code=2)
 	print(f"[bold]pdf-grepper[/bold] inputs={inputs} out={out}")
 	model = run_pipeline(
 		input_paths=inputs,
@@ -44,12 +100,75 @@ def parse_command(
 		enrich_web=enrich_web,
 		offline=offline,
 		base_uri=base_uri,
+		workers=workers,
+		stream_window=stream_window,
+		ocr_engine=ocr_engine,
+		ocr_prefetch=ocr_prefetch,
+		ocr_regions=ocr_regions,
+		ocr_dpi=ocr_dpi if ocr_dpi == "auto" else int(ocr_dpi),
+		ocr_tile_pixels=ocr_tile_pixels,
+		align_sources=align_sources,
+		fuse_sources=fuse_sources,
+		skip_boilerplate=skip_boilerplate,
+		cache_dir=cache,
+		cache_max_bytes=cache_max_mb * 1024 * 1024,
+		cache_max_age_days=cache_max_age,
+		hash_algo=hash_algo,
+		ner_processes=ner_processes,
+		gazetteers=gazetteer or [],
 	)
 	print(f"[green]Wrote Turtle to {out}[/green]")
 	if json_out:
 		print(f"[green]Wrote JSON to {json_out}[/green]")
 
 
+@cache_app.command("stats")
+def cache_stats_command(cache_dir: str = typer.Argument(..., help="Cache directory (as given to parse --cache).")) -> None:
+	"""Entries and size per cache area, plus the hit/miss/byte counters of past runs."""
+	if not os.path.isdir(cache_dir):
+		print(f"[red]No cache at {cache_dir}[/red]")
+		raise typer.Exit(code=1)
+	for name in cache_mod.CACHE_AREAS:
+		path = os.path.join(cache_dir, name)
+		if os.path.isdir(path):
+			files = sum(len(f) for _, _, f in os.walk(path))
+			print(f"{name:<8} {files:>8} entries {cache_mod.directory_size(path) / 1048576:>10.1f} MiB")
+	stats = cache_mod.load_stats(cache_dir)
+	print(f"total    {cache_mod.directory_size(cache_dir) / 1048576:>27.1f} MiB")
+	print(
+		f"hits={stats.hits} misses={stats.misses} bytes_read={stats.bytes_read} "
+		f"bytes_written={stats.bytes_written} evicted={stats.evicted}"
+	)
+
+
+@cache_app.command("prune")
+def cache_prune_command(
+	cache_dir: str = typer.Argument(..., help="Cache directory (as given to parse --cache)."),
+	max_mb: int = typer.Option(
+		cache_mod.CACHE_MAX_BYTES // (1024 * 1024), "--max-mb", help="Evict least recently used entries above N MiB, NER memo included (0 = no limit)."
+	),
+	max_age: float = typer.Option(cache_mod.CACHE_MAX_AGE_DAYS, "--max-age", help="Evict entries unused for N days (0 = no limit)."),
+) -> None:
+	"""Apply a size/age policy now."""
+	if not os.path.isdir(cache_dir):
+		print(f"[yellow]No cache at {cache_dir}; nothing to prune[/yellow]")
+		return
+	remaining, removed = cache_mod.prune(cache_dir, max_mb * 1024 * 1024, max_age)
+	cache_mod.record_stats(cache_dir, cache_mod.CacheStats(evicted=removed))
+	print(f"[green]Removed {removed} entries; {remaining / 1048576:.1f} MiB left[/green]")
+
+
+@cache_app.command("clear")
+def cache_clear_command(cache_dir: str = typer.Argument(..., help="Cache directory (as given to parse --cache).")) -> None:
+	"""Delete every cache entry and the statistics; other files in the directory are kept."""
+	try:
+		freed = cache_mod.clear(cache_dir)
+	except ValueError as e:
+		print(f"[red]{e}[/red]")
+		raise typer.Exit(code=1)
+	print(f"[green]Cleared {cache_dir} ({freed / 1048576:.1f} MiB)[/green]")
+
+
 @app.command("da")
 def da_command(
 	input_path: str = typer.Argument(..., help="Input: a parsed pg Turtle (.ttl) (preferred) or a PDF to parse first."),
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from typing import Callable, Dict, Generic, Hashable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+V = TypeVar("V")
+
+# (start, end, value) of one match; text[start:end] is the key
+Match = Tuple[int, int, V]
+
+# Transition table key: state in the high bits, symbol id in the low _SHIFT bits
+_SHIFT = 32
+_MASK = (1 << _SHIFT) - 1
+
+
+def is_word_char(ch: str) -> bool:
+	return ch.isalnum() or ch == "_"
+
+
+def word_bounded(text: str, start: int, end: int) -> bool:
+	"""True when text[start:end] neither starts nor ends inside a word."""
+	return (start == 0 or not is_word_char(text[start - 1]) or not is_word_char(text[start])) and (
+		end == len(text) or not is_word_char(text[end]) or not is_word_char(text[end - 1])
+	)
+
+
+class Automaton(Generic[V]):
+	"""
+	Aho-Corasick automaton: one pass over a text reports every occurrence of every key, in time
+	linear in the text plus the number of matches, however many keys there are. Keys and texts are
+	strings, or any sequences of hashable symbols (e.g. word ids, see gazetteer).
+
+	add() keys, build() once, then search with finditer() (all matches) or longest() (leftmost-longest,
+	non-overlapping). Transitions live in one flat int -> int table rather than a dict per state, so
+	large automata stay compact and convert to a few int arrays for storage (to_arrays/from_arrays).
+	"""
+
+	def __init__(self) -> None:
+		self._symbols: Dict[Hashable, int] = {}
+		# (state << _SHIFT) | symbol id -> next state
+		self._goto: Dict[int, int] = {}
+		self._depth = array("l", [0])
+		self._fail = array("l", [0])
+		# per state: index into _values of the key ending there (-1: none), and the nearest state
+		# along the fail links where another key ends (0: none), filled in by build
+		self._key = array("l", [-1])
+		self._link = array("l", [0])
+		self._values: List[V] = []
+		self._built = False
+
+	def __len__(self) -> int:
+		return len(self._values)
+
+	def add(self, key: Sequence[Hashable], value: V) -> None:
+		if not key:
+			return
+		if self._built:
+			raise ValueError("automaton already built")
+		state = 0
+		for ch in key:
+			code = (state << _SHIFT) | self._symbols.setdefault(ch, len(self._symbols))
+			nxt = self._goto.get(code)
+			if nxt is None:
+				nxt = self._goto[code] = len(self._depth)
+				self._depth.append(self._depth[state] + 1)
+				self._key.append(-1)
+			state = nxt
+		if self._key[state] >= 0:
+			self._values[self._key[state]] = value  # a re-added key keeps its latest value
+		else:
+			self._key[state] = len(self._values)
+			self._values.append(value)
+
+	def build(self) -> "Automaton[V]":
+		"""Compute fail links (breadth first) and the output links along them."""
+		children: Dict[int, List[Tuple[int, int]]] = {}
+		for code, nxt in self._goto.items():
+			children.setdefault(code >> _SHIFT, []).append((code & _MASK, nxt))
+		goto, key = self._goto, self._key
+		fail = array("l", [0]) * len(self._depth)
+		link = array("l", [0]) * len(self._depth)
+		queue = deque(nxt for _, nxt in children.get(0, ()))
+		while queue:
+			state = queue.popleft()
+			for sid, nxt in children.get(state, ()):
+				queue.append(nxt)
+				f = fail[state]
+				while f and (f << _SHIFT) | sid not in goto:
+					f = fail[f]
+				target = goto.get((f << _SHIFT) | sid, 0)
+				fail[nxt] = target = target if target != nxt else 0
+				link[nxt] = target if key[target] >= 0 else link[target]
+		self._fail, self._link = fail, link
+		self._built = True
+		return self
+
+	def to_arrays(self) -> Tuple[List[Hashable], List[V], Dict[str, array]]:
+		"""
+		The built automaton as plain data: its symbols in id order, its values and its int arrays
+		(goto_keys/goto_next hold the transition table). from_arrays restores it.
+		"""
+		if not self._built:
+			self.build()
+		arrays = {
+			"goto_keys": array("q", self._goto.keys()),
+			"goto_next": array("q", self._goto.values()),
+			"depth": self._depth,
+			"fail": self._fail,
+			"key": self._key,
+			"link": self._link,
+		}
+		return list(self._symbols), list(self._values), arrays
+
+	@classmethod
+	def from_arrays(cls, symbols: Sequence[Hashable], values: Sequence[V], arrays: Dict[str, array]) -> "Automaton[V]":
+		"""A built automaton from to_arrays output; ValueError when the parts do not fit together."""
+		states = len(arrays["depth"])
+		if not states or any(len(arrays[name]) != states for name in ("fail", "key", "link")):
+			raise ValueError("automaton arrays differ in length")
+		if len(arrays["goto_keys"]) != len(arrays["goto_next"]):
+			raise ValueError("automaton transition arrays differ in length")
+		for name in ("goto_next", "fail", "link"):
+			if arrays[name] and (min(arrays[name]) < 0 or max(arrays[name]) >= states):
+				raise ValueError(f"automaton {name} refers to a missing state")
+		if max(arrays["key"]) >= len(values) or min(arrays["key"]) < -1:
+			raise ValueError("automaton key refers to a missing value")
+		automaton: Automaton[V] = cls()
+		automaton._symbols = {sym: i for i, sym in enumerate(symbols)}
+		automaton._goto = dict(zip(arrays["goto_keys"], arrays["goto_next"]))
+		automaton._depth, automaton._fail = arrays["depth"], arrays["fail"]
+		automaton._key, automaton._link = arrays["key"], arrays["link"]
+		automaton._values = list(values)
+		automaton._built = True
+		return automaton
+
+	def finditer(self, text: Sequence[Hashable]) -> Iterator[Match]:
+		"""Every occurrence of every key, ordered by end offset (longer keys first at the same end)."""
+		if not self._built:
+			self.build()
+		symbols, goto, fail = self._symbols, self._goto, self._fail
+		depth, key, link, values = self._depth, self._key, self._link, self._values
+		state = 0
+		for i, ch in enumerate(text):
+			sid = symbols.get(ch)
+			if sid is None:
+				state = 0  # no key contains this symbol
+				continue
+			while state and (state << _SHIFT) | sid not in goto:
+				state = fail[state]
+			state = goto.get((state << _SHIFT) | sid, 0)
+			hit = state if key[state] >= 0 else link[state]
+			while hit:
+				yield i + 1 - depth[hit], i + 1, values[key[hit]]
+				hit = link[hit]
+
+	def longest(
+		self, text: Sequence[Hashable], accept: Optional[Callable[[Sequence[Hashable], int, int], bool]] = None
+	) -> List[Match]:
+		"""
+		Leftmost-longest non-overlapping matches, optionally only those accept(text, start, end) allows
+		(e.g. word_bounded).
+		"""
+		best: Dict[int, Match] = {}
+		for start, end, value in self.finditer(text):
+			if accept is not None and not accept(text, start, end):
+				continue
+			if start not in best or end > best[start][1]:
+				best[start] = (start, end, value)
+		matches: List[Match] = []
+		cursor = 0
+		for start in sorted(best):
+			if start >= cursor:
+				matches.append(best[start])
+				cursor = best[start][1]
+		return matches
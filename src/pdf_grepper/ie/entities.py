@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import re
-from typing import List, Optional, Tuple
+import threading
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Optional, Tuple
 from uuid import uuid4
 
 try:
@@ -9,44 +11,166 @@ try:
 except Exception:  # pragma: no cover - optional
 	spacy = None  # type: ignore
 
+from pdf_grepper.ie.memo import ChunkEntities, NerMemo
 from pdf_grepper.types import Entity, SourceSpan
 
 COMMON_ENTITY_LABELS = {"PERSON", "ORG", "GPE", "PRODUCT", "FAC", "LOC", "EVENT"}
 
+NER_MODEL = "en_core_web_sm"
+# Span texts are joined into chunks of at most this many characters (spaCy's default max_length
+# is 1,000,000) and fed to nlp.pipe NER_BATCH_SIZE chunks at a time
+NER_CHUNK_CHARS = 100_000
+NER_BATCH_SIZE = 8
+# Components NER can depend on (shared embedding layers); tagger, parser, lemmatizer etc. are disabled
+NER_PIPES = ("tok2vec", "transformer", "ner")
 
-def _load_nlp() -> Optional["spacy.Language"]:
+_nlp_cache: Dict[str, Optional["spacy.Language"]] = {}
+_nlp_lock = threading.Lock()
+
+
+def _load_nlp(model: str = NER_MODEL) -> Optional["spacy.Language"]:
 	if spacy is None:
 		return None
 	try:
-		return spacy.load("en_core_web_sm")
+		nlp = spacy.load(model)
 	except Exception:
 		# fallback to blank pipeline
 		return spacy.blank("en")
+	nlp.select_pipes(disable=[name for name in nlp.pipe_names if name not in NER_PIPES])
+	return nlp
+
+
+def get_nlp(model: str = NER_MODEL) -> Optional["spacy.Language"]:
+	"""
+	Process-wide spaCy pipeline for model, loaded on first use with only the NER components enabled.
+	"""
+	with _nlp_lock:
+		if model not in _nlp_cache:
+			_nlp_cache[model] = _load_nlp(model)
+		return _nlp_cache[model]
+
+
+class SpanIndex:
+	"""
+	Character offset -> SourceSpan for one chunk: the sorted start offsets of the texts joined into
+	it, searched with bisect, so each entity finds its block in O(log n).
+	"""
+
+	__slots__ = ("starts", "spans")
+
+	def __init__(self):
+		self.starts: List[int] = []
+		self.spans: List[Optional[SourceSpan]] = []
+
+	def add(self, start: int, span: Optional[SourceSpan]) -> None:
+		self.starts.append(start)
+		self.spans.append(span)
+
+	def at(self, char: int) -> Optional[SourceSpan]:
+		i = bisect_right(self.starts, char) - 1
+		return self.spans[i] if i >= 0 else None
+
+
+def _split(text: str, max_chars: int) -> Iterator[str]:
+	"""text in pieces of at most max_chars, cut at whitespace where possible."""
+	while len(text) > max_chars:
+		cut = text.rfind(" ", 0, max_chars)
+		cut = cut if cut > 0 else max_chars
+		yield text[:cut]
+		text = text[cut:].lstrip(" ")
+	yield text
 
 
-def extract_entities(texts: List[Tuple[str, Optional[SourceSpan]]]) -> List[Entity]:
+def _chunks(
+	texts: List[Tuple[str, Optional[SourceSpan]]], max_chars: int = NER_CHUNK_CHARS
+) -> Iterator[Tuple[str, SpanIndex]]:
+	"""
+	Newline-joined runs of texts of at most max_chars, each with the SpanIndex of its texts; a single
+	longer text is cut at whitespace.
+	"""
+	parts: List[str] = []
+	index = SpanIndex()
+	size = 0
+	for text, span in texts:
+		for piece in _split(text, max_chars):
+			if parts and size + 1 + len(piece) > max_chars:
+				yield "\n".join(parts), index
+				parts, index, size = [], SpanIndex(), 0
+			start = size + 1 if parts else 0
+			index.add(start, span)
+			parts.append(piece)
+			size = start + len(piece)
+	if parts:
+		yield "\n".join(parts), index
+
+
+def model_id(nlp: "spacy.Language") -> str:
+	"""Name, version and enabled components of a pipeline, for memo keys."""
+	meta = getattr(nlp, "meta", None) or {}
+	version = getattr(spacy, "__version__", "")
+	return f"{meta.get('lang', '')}_{meta.get('name', '')}@{meta.get('version', '')}:{','.join(nlp.pipe_names)}:spacy-{version}"
+
+
+def _memoised_ents(
+	nlp: "spacy.Language",
+	chunks: List[Tuple[str, SpanIndex]],
+	memo: NerMemo,
+	n_process: int,
+	batch_size: int,
+) -> List[ChunkEntities]:
+	"""
+	Entities per chunk. Chunks are looked up in memo by their exact text; only chunks never seen with
+	this model run through nlp.pipe and are then recorded, so the result matches the unmemoised path.
+	"""
+	model = model_id(nlp)
+	keys = [NerMemo.key(model, text) for text, _ in chunks]
+	known = memo.get_many(keys)
+	todo = {k: text for k, (text, _) in zip(keys, chunks) if k not in known}
+	fresh: Dict[str, ChunkEntities] = {}
+	pipe = nlp.pipe(((text, k) for k, text in todo.items()), as_tuples=True, batch_size=batch_size, n_process=n_process)
+	for doc, k in pipe:
+		fresh[k] = [(ent.start_char, ent.text, ent.label_) for ent in doc.ents]
+	memo.put_many(fresh)
+	known.update(fresh)
+	return [known[k] for k in keys]
+
+
+def extract_entities(
+	texts: List[Tuple[str, Optional[SourceSpan]]],
+	n_process: int = 1,
+	batch_size: int = NER_BATCH_SIZE,
+	memo: Optional[NerMemo] = None,
+) -> List[Entity]:
 	"""
 	Extract entities from list of (text, span) using spaCy if available, else regex heuristics.
+
+	The spaCy path runs nlp.pipe over chunks of the span texts (see _chunks); n_process > 1 spreads
+	the chunks over that many processes. Each entity takes the span of the text it starts in.
+	With a memo, chunks seen before skip the model (see NerMemo); the output is the same.
 	"""
-	nlp = _load_nlp()
+	nlp = get_nlp()
 	entities: List[Entity] = []
 	if nlp is not None and "ner" in nlp.pipe_names:
-		doc = nlp("\n".join(t for t, _ in texts))
-		offset = 0
-		# Map character offsets to spans; simple approach: assign entire doc span to None
-		for ent in doc.ents:
-			label = ent.label_
-			if label not in COMMON_ENTITY_LABELS:
-				continue
-			entities.append(
-				Entity(
-					id=str(uuid4()),
-					text=ent.text,
-					label=label,
-					span=None,
-					confidence=None,
+		found: Iterator[Tuple[ChunkEntities, SpanIndex]]
+		if memo is not None:
+			chunks = list(_chunks(texts, NER_CHUNK_CHARS))
+			found = zip(_memoised_ents(nlp, chunks, memo, n_process, batch_size), (index for _, index in chunks))
+		else:
+			pipe = nlp.pipe(_chunks(texts, NER_CHUNK_CHARS), as_tuples=True, batch_size=batch_size, n_process=n_process)
+			found = (([(ent.start_char, ent.text, ent.label_) for ent in doc.ents], index) for doc, index in pipe)
+		for ents, index in found:
+			for start, text, label in ents:
+				if label not in COMMON_ENTITY_LABELS:
+					continue
+				entities.append(
+					Entity(
+						id=str(uuid4()),
+						text=text,
+						label=label,
+						span=index.at(start),
+						confidence=None,
+					)
 				)
-			)
 	else:
 		# Simple heuristic: Proper noun sequences (capitalized words) as ORG/PRODUCT/CONCEPT
 		proper_noun_pattern = re.compile(r"(?:[A-Z][a-zA-Z0-9\-]+(?:\s+[A-Z][a-zA-Z0-9\-]+)+)")
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import uuid4
+
+from pdf_grepper import cache as cache_mod
+from pdf_grepper.ie.automaton import Automaton
+from pdf_grepper.types import Entity, SourceSpan
+
+# Bump when tokenisation or the compiled file layout changes; compiled gazetteers of other versions are rebuilt
+GAZETTEER_VERSION = 2
+DEFAULT_LABEL = "CONCEPT"
+GAZETTEER_CONFIDENCE = 0.9
+
+# Words and single punctuation marks; matching is on casefolded tokens, so case and the amount of
+# whitespace between words do not matter and matches always fall on word boundaries
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+# Text tokens missing from the dictionary vocabulary: no transition, the automaton restarts
+_UNKNOWN = -1
+
+# (canonical name, label) of one dictionary entry
+Entry = Tuple[str, str]
+
+# Compiled gazetteer file: magic, format version, the byte length of a JSON section (digest, vocab
+# tokens, automaton symbols, entry names and labels) and the lengths of the automaton's int64 arrays, followed by
+# the JSON and the little-endian arrays. Plain data only: loading one never runs code from the file
+COMPILED_SUFFIX = ".pgz"
+_MAGIC = b"PGGZ"
+_ARRAYS = ("goto_keys", "goto_next", "depth", "fail", "key", "link")
+_HEADER = struct.Struct(f"<4sIQ{len(_ARRAYS)}Q")
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+	"""(casefolded token, start, end) for every token of text."""
+	return [(m.group(0).casefold(), m.start(), m.end()) for m in _TOKEN.finditer(text)]
+
+
+def read_entries(path: str) -> Iterator[Entry]:
+	"""
+	Dictionary file entries: one name per line, optionally followed by a tab and a label (default
+	DEFAULT_LABEL). Blank lines and lines starting with # are skipped.
+	"""
+	with open(path, "r", encoding="utf-8") as f:
+		for line in f:
+			line = line.rstrip("\n")
+			if not line.strip() or line.lstrip().startswith("#"):
+				continue
+			name, _, label = line.partition("\t")
+			# labels repeat across entries: one shared string each keeps the automaton small
+			yield name.strip(), sys.intern(label.strip() or DEFAULT_LABEL)
+
+
+class Gazetteer:
+	"""
+	Dictionary-backed entity matcher: an Aho-Corasick automaton over the token ids of every name,
+	so a text is matched in one pass whatever the dictionary size. Matches are leftmost-longest
+	("Acme Corp Cloud" wins over "Acme Corp") and non-overlapping.
+	"""
+
+	def __init__(self) -> None:
+		self.vocab: Dict[str, int] = {}
+		self.automaton: Automaton[Entry] = Automaton()
+		self.digest = ""
+
+	def __len__(self) -> int:
+		return len(self.automaton)
+
+	def add(self, name: str, label: str = DEFAULT_LABEL) -> None:
+		ids = tuple(self.vocab.setdefault(tok, len(self.vocab)) for tok, _, _ in tokenize(name))
+		if ids:
+			self.automaton.add(ids, (name, label))
+
+	@classmethod
+	def from_entries(cls, entries: Iterable[Entry]) -> "Gazetteer":
+		gazetteer = cls()
+		for name, label in entries:
+			gazetteer.add(name, label)
+		gazetteer.automaton.build()
+		return gazetteer
+
+	@classmethod
+	def from_files(cls, paths: Sequence[str], compiled_dir: Optional[str] = None) -> "Gazetteer":
+		"""
+		Gazetteer of the dictionary files. With compiled_dir, the built automaton is kept there keyed
+		on the files' contents, and later calls load it instead of rebuilding.
+		"""
+		h = hashlib.sha256(f"gazetteer-v{GAZETTEER_VERSION}".encode())
+		for path in paths:
+			with open(path, "rb") as f:
+				h.update(hashlib.sha256(f.read()).digest())
+		digest = h.hexdigest()
+		compiled = os.path.join(compiled_dir, digest + COMPILED_SUFFIX) if compiled_dir else None
+		if compiled:
+			try:
+				gazetteer = cls.load(compiled)
+				cache_mod.touch(compiled)
+				return gazetteer
+			except (OSError, ValueError, KeyError, TypeError, struct.error):
+				pass
+		gazetteer = cls.from_entries(entry for path in paths for entry in read_entries(path))
+		gazetteer.digest = digest
+		if compiled:
+			try:
+				gazetteer.save(compiled)
+			except OSError:
+				pass
+		return gazetteer
+
+	def save(self, path: str) -> None:
+		"""Write the compiled gazetteer (see COMPILED_SUFFIX for the layout)."""
+		os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+		symbols, values, arrays = self.automaton.to_arrays()
+		labels: Dict[str, int] = {}
+		meta = {
+			"digest": self.digest,
+			"vocab": sorted(self.vocab, key=self.vocab.__getitem__),
+			"symbols": symbols,
+			"names": [name for name, _ in values],
+			"label_ids": [labels.setdefault(label, len(labels)) for _, label in values],
+		}
+		meta["labels"] = list(labels)
+		data = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+		parts = [_HEADER.pack(_MAGIC, GAZETTEER_VERSION, len(data), *(len(arrays[name]) for name in _ARRAYS)), data]
+		for name in _ARRAYS:
+			arr = array("q", arrays[name])
+			if sys.byteorder == "big":
+				arr.byteswap()
+			parts.append(arr.tobytes())
+		cache_mod.write_atomic(path, b"".join(parts))
+
+	@classmethod
+	def load(cls, path: str) -> "Gazetteer":
+		"""Load a gazetteer written by save; ValueError for a foreign, truncated or other-version file."""
+		with open(path, "rb") as f:
+			data = f.read()
+		magic, version, meta_len, *lengths = _HEADER.unpack_from(data)
+		if magic != _MAGIC:
+			raise ValueError(f"not a compiled gazetteer: {path}")
+		if version != GAZETTEER_VERSION:
+			raise ValueError(f"gazetteer version {version}, expected {GAZETTEER_VERSION}")
+		if _HEADER.size + meta_len + 8 * sum(lengths) != len(data):
+			raise ValueError(f"truncated compiled gazetteer: {path}")
+		offset = _HEADER.size + meta_len
+		meta = json.loads(data[_HEADER.size : offset].decode("utf-8"))
+		arrays = {}
+		for name, n in zip(_ARRAYS, lengths):
+			arr = array("q")
+			arr.frombytes(data[offset : offset + 8 * n])
+			if sys.byteorder == "big":
+				arr.byteswap()
+			arrays[name] = arr
+			offset += 8 * n
+		labels = meta["labels"]
+		values = list(zip(meta["names"], [labels[i] for i in meta["label_ids"]]))
+		gazetteer = cls()
+		gazetteer.vocab = {tok: i for i, tok in enumerate(meta["vocab"])}
+		gazetteer.automaton = Automaton.from_arrays(meta["symbols"], values, arrays)
+		gazetteer.digest = meta["digest"]
+		return gazetteer
+
+	def find(self, text: str) -> List[Tuple[int, int, str, str]]:
+		"""(start, end, name, label) of the leftmost-longest dictionary matches in text."""
+		tokens = tokenize(text)
+		ids = [self.vocab.get(tok, _UNKNOWN) for tok, _, _ in tokens]
+		return [
+			(tokens[start][1], tokens[end - 1][2], name, label)
+			for start, end, (name, label) in self.automaton.longest(ids)
+		]
+
+	def extract(self, texts: List[Tuple[str, Optional[SourceSpan]]]) -> List[Entity]:
+		"""
+		One Entity per distinct dictionary name found in texts (e.g. _collect_text_spans output), with
+		the dictionary label and the span of its first occurrence.
+		"""
+		found: Dict[str, Entity] = {}
+		for text, span in texts:
+			for _, _, name, label in self.find(text):
+				key = name.lower().strip()
+				if key not in found:
+					found[key] = Entity(
+						id=str(uuid4()), text=name, label=label, span=span, confidence=GAZETTEER_CONFIDENCE
+					)
+		return list(found.values())
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from pdf_grepper import cache as cache_mod
+
+# (start char, entity text, label) triples found in one NER chunk
+ChunkEntities = List[Tuple[int, str, str]]
+# Bumped when the stored results change meaning; part of every key
+NER_MEMO_VERSION = 2
+
+
+class NerMemo:
+	"""
+	Persistent NER results per chunk, keyed on the exact chunk text fed to the model plus the model's
+	name and version, so documents re-read by later runs (other options, other inputs alongside) are
+	run through the model once. Stored in one SQLite file, safe to share between processes.
+	"""
+
+	def __init__(self, path: str):
+		self.path = path
+		os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+		self._lock = threading.Lock()
+		self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+		with self._db:
+			self._db.execute("CREATE TABLE IF NOT EXISTS ner (key TEXT PRIMARY KEY, ents TEXT NOT NULL)")
+		self.hits = 0
+		self.misses = 0
+
+	@staticmethod
+	def key(model: str, text: str) -> str:
+		return hashlib.sha256(f"{NER_MEMO_VERSION}\0{model}\0{text}".encode("utf-8")).hexdigest()
+
+	def get_many(self, keys: Iterable[str]) -> Dict[str, ChunkEntities]:
+		keys = list(dict.fromkeys(keys))
+		found: Dict[str, ChunkEntities] = {}
+		with self._lock:
+			# stay under SQLite's bound-parameter limit
+			for i in range(0, len(keys), 500):
+				batch = keys[i : i + 500]
+				rows = self._db.execute(
+					f"SELECT key, ents FROM ner WHERE key IN ({','.join('?' * len(batch))})", batch
+				).fetchall()
+				found.update((k, [tuple(e) for e in json.loads(v)]) for k, v in rows)
+		self.hits += len(found)
+		self.misses += len(keys) - len(found)
+		return found
+
+	def put_many(self, results: Dict[str, ChunkEntities]) -> None:
+		if not results:
+			return
+		with self._lock, self._db:
+			self._db.executemany(
+				"INSERT OR REPLACE INTO ner (key, ents) VALUES (?, ?)",
+				[(k, json.dumps(v, ensure_ascii=False)) for k, v in results.items()],
+			)
+
+	def close(self) -> None:
+		with self._lock:
+			self._db.close()
+		if self.hits:
+			# reads leave the file alone: mark the memo used for the cache's age/LRU policy
+			cache_mod.touch(self.path)
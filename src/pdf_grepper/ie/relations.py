@@ -1,44 +1,105 @@
 from __future__ import annotations
 
 import re
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from uuid import uuid4
 
+from pdf_grepper.ie.automaton import Automaton, Match, word_bounded
 from pdf_grepper.types import Entity, Relation, SourceSpan
 
+# Trigger phrase -> predicate. Multi-word triggers allow any whitespace between their words.
+TRIGGERS = {
+	"uses": "pg:uses",
+	"depends on": "pg:dependsOn",
+	"integrates with": "pg:integratesWith",
+	"is part of": "pg:isPartOf",
+}
+
+# One alternation for every trigger; lines are lowercased before matching
+_TRIGGER_RE = re.compile(
+	r"(?<!\S)(" + "|".join(r"\s+".join(map(re.escape, t.split())) for t in TRIGGERS) + r")(?!\S)"
+)
+# The longest word of each trigger, which every match of it contains: the cheap per-line prefilter.
+# Short words ("is", "on") would pass almost every line
+_TRIGGER_WORDS = tuple(sorted({max(t.split(), key=len) for t in TRIGGERS}))
+# Negation or hedge between the subject and the trigger ("X no longer uses Y", "X may be part of Y")
+_NEGATION_RE = re.compile(r"(?:\b(?:not|never|no\s+longer|may|might)|n't)\b")
+
+
+def _predicate(trigger: str) -> str:
+	return TRIGGERS[" ".join(trigger.split())]
+
+
+def _entity_automaton(entities: List[Entity]) -> Automaton[Entity]:
+	automaton: Automaton[Entity] = Automaton()
+	for e in entities:
+		key = e.text.strip().lower()
+		if key:
+			automaton.add(key, e)
+	return automaton.build()
+
+
+def _nearest_before(mentions: List[Match], lo: int, hi: int) -> Optional[Match]:
+	"""The mention in [lo, hi) ending closest to hi."""
+	found = None
+	for m in mentions:
+		if m[0] >= lo and m[1] <= hi and (found is None or m[1] > found[1]):
+			found = m
+	return found
+
+
+def _nearest_after(mentions: List[Match], lo: int, hi: int) -> Optional[Match]:
+	"""The mention in [lo, hi) starting closest to lo."""
+	for m in mentions:
+		if m[0] >= lo and m[1] <= hi:
+			return m
+	return None
+
 
 def extract_relations(entities: List[Entity], texts: List[Tuple[str, SourceSpan | None]]) -> List[Relation]:
 	"""
 	Very lightweight relation mining: looks for patterns like 'X uses Y' or 'X depends on Y'.
+
+	Lines without a trigger word are skipped by substring checks; the rest are scanned once with the
+	trigger alternation and once with an Aho-Corasick automaton of the entity texts. Each trigger
+	links the nearest entity mention before it to the nearest after it, within the stretch of the
+	line between the neighbouring triggers, unless a negation or hedge ("not", "no longer", "never",
+	"may") stands between the subject and the trigger. Confidence is 0.5 when the mentions are the
+	whole of both sides, 0.4 otherwise.
 	"""
-	index_by_text = {e.text.lower(): e for e in entities}
 	relations: List[Relation] = []
-	patterns = [
-		# Anchor patterns so the object captures the full remainder of the line.
-		(r"(.+?)\s+uses\s+(.+)$", "pg:uses"),
-		(r"(.+?)\s+depends\s+on\s+(.+)$", "pg:dependsOn"),
-		(r"(.+?)\s+integrates\s+with\s+(.+)$", "pg:integratesWith"),
-		(r"(.+?)\s+is\s+part\s+of\s+(.+)$", "pg:isPartOf"),
-	]
+	automaton: Optional[Automaton[Entity]] = None
 	for text, span in texts:
-		line = text.strip()
-		for pat, pred in patterns:
-			for m in re.finditer(pat, line, flags=re.IGNORECASE):
-				subj = m.group(1).strip().lower()
-				obj = m.group(2).strip().lower()
-				subj_e = index_by_text.get(subj)
-				obj_e = index_by_text.get(obj)
-				if subj_e and obj_e and subj_e.id != obj_e.id:
-					relations.append(
-						Relation(
-							id=str(uuid4()),
-							subject_id=subj_e.id,
-							predicate=pred,
-							object_id=obj_e.id,
-							span=span,
-							confidence=0.5,
-						)
-					)
+		line = text.strip().lower()
+		if not any(word in line for word in _TRIGGER_WORDS):
+			continue
+		triggers = list(_TRIGGER_RE.finditer(line))
+		if not triggers:
+			continue
+		if automaton is None:
+			automaton = _entity_automaton(entities)
+		mentions = automaton.longest(line, word_bounded)
+		if len(mentions) < 2:
+			continue
+		for k, trig in enumerate(triggers):
+			lo = triggers[k - 1].end() if k else 0
+			hi = triggers[k + 1].start() if k + 1 < len(triggers) else len(line)
+			subj = _nearest_before(mentions, lo, trig.start())
+			obj = _nearest_after(mentions, trig.end(), hi)
+			if subj is None or obj is None or subj[2].id == obj[2].id:
+				continue
+			if _NEGATION_RE.search(line, subj[1], trig.start()):
+				continue
+			whole = not line[lo : subj[0]].strip() and not line[subj[1] : trig.start()].strip()
+			whole = whole and not line[trig.end() : obj[0]].strip() and not line[obj[1] : hi].strip()
+			relations.append(
+				Relation(
+					id=str(uuid4()),
+					subject_id=subj[2].id,
+					predicate=_predicate(trig.group(1)),
+					object_id=obj[2].id,
+					span=span,
+					confidence=0.5 if whole else 0.4,
+				)
+			)
 	return relations
-
-
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import mmap
+import os
+from typing import BinaryIO, Dict, List, Optional, Sequence, Union
+
+import fitz  # PyMuPDF
+
+try:
+	import xxhash  # type: ignore
+except Exception:  # pragma: no cover - optional
+	xxhash = None  # type: ignore
+
+# Content digests accepted for cache keys. sha256 is the default (cryptographic, always available);
+# xxh3_128 (pdf-grepper[xxhash]) is non-cryptographic but several times faster on large inputs
+HASH_ALGOS = ("sha256", "xxh3_128")
+
+# Magic numbers for inputs without a file name
+_SIGNATURES = ((b"%PDF", ".pdf"), (b"PK\x03\x04", ".docx"))
+# Names of the input kinds in load errors
+_KINDS = {".pdf": "PDF", ".docx": "DOCX"}
+
+
+class InputDocument:
+	"""
+	One source document held as a single in-memory buffer - bytes, or a read-only memory map of
+	a file - so hashing and parsing read it exactly once. name is the provenance source_path.
+
+	Construct directly for in-memory documents (services need not write temp files), or via
+	from_path / as_input.
+	"""
+
+	def __init__(
+		self,
+		data: Union[bytes, bytearray, memoryview, mmap.mmap],
+		name: str,
+		path: Optional[str] = None,
+		stat: Optional[os.stat_result] = None,
+	):
+		self.name = name
+		# set when the document is a file: workers of a parallel run re-open it by path
+		self.path = path
+		# stat of the mapped file (taken from the open descriptor), for FingerprintIndex
+		self.stat = stat
+		self._mmap = data if isinstance(data, mmap.mmap) else None
+		self.data = memoryview(data)
+		self._digests: Dict[str, str] = {}
+		self.ext = os.path.splitext(name)[1].lower() or _sniff(self.data)
+
+	@classmethod
+	def from_path(cls, path: Union[str, os.PathLike]) -> "InputDocument":
+		path = os.fspath(path)
+		with open(path, "rb") as f:
+			try:
+				data: Union[bytes, mmap.mmap] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+			except ValueError:
+				data = b""  # empty files cannot be mapped
+			stat = os.fstat(f.fileno())
+		return cls(data, name=path, path=path, stat=stat)
+
+	def digest(self, algo: str = "sha256") -> str:
+		"""Hex digest of the content (algo: one of HASH_ALGOS), computed once per algorithm."""
+		if algo not in HASH_ALGOS:
+			raise ValueError(f"Unsupported hash algorithm: {algo}")
+		if algo not in self._digests:
+			if algo == "xxh3_128":
+				if xxhash is None:
+					raise RuntimeError("xxhash is not installed; install pdf-grepper[xxhash] or use sha256")
+				self._digests[algo] = xxhash.xxh3_128_hexdigest(self.data)
+			else:
+				self._digests[algo] = hashlib.new(algo, self.data).hexdigest()
+		return self._digests[algo]
+
+	def open_pdf(self) -> fitz.Document:
+		return fitz.open(stream=self.data, filetype="pdf")
+
+	def open_stream(self) -> BinaryIO:
+		return io.BytesIO(self.data)
+
+	def close(self) -> None:
+		self.data.release()
+		if self._mmap is not None:
+			self._mmap.close()
+
+
+def hash_available(algo: str) -> bool:
+	"""Check if algo is one of HASH_ALGOS and its implementation is importable."""
+	return algo == "sha256" or (algo == "xxh3_128" and xxhash is not None)
+
+
+InputLike = Union[str, os.PathLike, bytes, bytearray, memoryview, mmap.mmap, BinaryIO, InputDocument]
+
+
+def _sniff(data: memoryview) -> str:
+	head = bytes(data[:1024])
+	for magic, ext in _SIGNATURES:
+		if magic in head[:8] or (ext == ".pdf" and magic in head):
+			return ext
+	return ""
+
+
+def as_input(src: InputLike, index: int = 0) -> InputDocument:
+	"""
+	Wrap one input: paths are memory-mapped, file-like objects read once, buffers used as they are.
+	Unnamed inputs are called <input-N> plus the extension sniffed from their content.
+	"""
+	if isinstance(src, InputDocument):
+		return src
+	if isinstance(src, (str, os.PathLike)):
+		return InputDocument.from_path(src)
+	if isinstance(src, (bytes, bytearray, memoryview, mmap.mmap)):
+		data = src
+		name = f"<input-{index}>"
+	else:
+		data = src.read()
+		name = getattr(src, "name", None) or f"<input-{index}>"
+		if not isinstance(name, str):
+			name = f"<input-{index}>"
+	doc = InputDocument(data, name=name)
+	if not os.path.splitext(name)[1]:
+		doc.name = name + doc.ext
+	return doc
+
+
+def input_name(src: InputLike, index: int = 0) -> str:
+	"""The provenance name as_input will give src, without reading it."""
+	if isinstance(src, InputDocument):
+		return src.name
+	if isinstance(src, (str, os.PathLike)):
+		return os.fspath(src)
+	if isinstance(src, (bytes, bytearray, memoryview, mmap.mmap)):
+		return f"<input-{index}>" + _sniff(memoryview(src))
+	name = getattr(src, "name", None)
+	return name if isinstance(name, str) else f"<input-{index}>"
+
+
+def open_input(src: InputLike, index: int = 0) -> InputDocument:
+	"""as_input, with read errors raised as ValueError("Failed to open PDF/DOCX/input: name: error")."""
+	try:
+		return as_input(src, index)
+	except OSError as e:
+		name = input_name(src, index)
+		kind = _KINDS.get(os.path.splitext(name)[1].lower(), "input")
+		raise ValueError(f"Failed to open {kind}: {name}: {e}") from e
+
+
+def as_inputs(srcs: Sequence[InputLike]) -> List[InputDocument]:
+	"""
+	open_input every source; when one fails, the documents already opened for earlier ones (memory
+	maps) are closed before the ValueError propagates.
+	"""
+	docs: List[InputDocument] = []
+	try:
+		for i, src in enumerate(srcs):
+			docs.append(open_input(src, i))
+	except BaseException:
+		for src, doc in zip(srcs, docs):
+			if doc is not src:
+				doc.close()
+		raise
+	return docs
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-from typing import Iterable
+from typing import Iterable, Optional, TextIO
 
 from rdflib import Graph, Literal, RDF, RDFS, URIRef
 from rdflib.namespace import DCTERMS, XSD
 
 from pdf_grepper.ontology.model import make_graph
+from pdf_grepper.pdf.boilerplate import normalise as normalise_boilerplate
 from pdf_grepper.types import (
 	DocumentModel,
 	Page,
@@ -59,8 +60,7 @@ def _add_span(g: Graph, ctx, s: URIRef, label: str, span) -> None:
 		g.add((s, DCTERMS.description, Literal(span.note)))
 
 
-def export_turtle(model: DocumentModel, ttl_path: str, base_uri: str = "http://example.org/pdf-grepper/") -> Graph:
-	g, ctx = make_graph(base_uri=base_uri)
+def _add_document(g: Graph, ctx, model: DocumentModel, base_uri: str) -> URIRef:
 	doc_uri = URIRef(f"{base_uri}document/main")
 	g.add((doc_uri, RDF.type, ctx.pg.Document))
 	for s in model.sources:
@@ -70,21 +70,46 @@ def export_turtle(model: DocumentModel, ttl_path: str, base_uri: str = "http://e
 	if model.domain_labels:
 		for lbl in model.domain_labels:
 			g.add((doc_uri, ctx.pg.domainLabel, Literal(lbl)))
+	return doc_uri
+
 
-	# Pages & text
-	for p in model.pages:
+def _add_pages(
+	g: Graph, ctx, doc_uri: URIRef, pages: Iterable[Page], base_uri: str, boilerplate_seen: Optional[set] = None
+) -> None:
+	# Boilerplate spans (running headers, footers, ...) are exported on their first occurrence only
+	boilerplate_seen = set() if boilerplate_seen is None else boilerplate_seen
+	for p in pages:
 		page_uri = _page_uri(base_uri, p.index)
 		g.add((page_uri, RDF.type, ctx.pg.Page))
 		g.add((doc_uri, ctx.pg.hasPage, page_uri))
+		if p.kind:
+			g.add((page_uri, ctx.pg.pageKind, Literal(p.kind)))
+		for k, span in enumerate(p.aligned):
+			al_uri = URIRef(f"{base_uri}aligned/{p.index}/{k}")
+			g.add((page_uri, ctx.pg.alignedWith, al_uri))
+			_add_span(g, ctx, al_uri, "aligned", span)
 		for i, ts in enumerate(p.text_blocks):
+			if ts.boilerplate:
+				key = normalise_boilerplate(ts.text)
+				if key in boilerplate_seen:
+					continue
+				boilerplate_seen.add(key)
 			ts_uri = URIRef(f"{base_uri}text/{p.index}/{i}")
 			g.add((ts_uri, RDF.type, ctx.pg.TextSpan))
+			if ts.boilerplate:
+				g.add((ts_uri, ctx.pg.boilerplate, Literal(True)))
 			g.add((ts_uri, RDFS.label, Literal(ts.text)))
 			g.add((page_uri, ctx.pg.hasText, ts_uri))
 			_add_span(g, ctx, ts_uri, "text", ts.span)
 			if ts.confidence is not None:
 				g.add((ts_uri, ctx.pg.confidence, Literal(ts.confidence, datatype=XSD.float)))
+			for k, alt in enumerate(ts.alt_spans):
+				alt_uri = URIRef(f"{ts_uri}/alt/{k}")
+				g.add((ts_uri, ctx.pg.alsoFoundIn, alt_uri))
+				_add_span(g, ctx, alt_uri, "text", alt)
 
+
+def _add_findings(g: Graph, ctx, doc_uri: URIRef, model: DocumentModel, base_uri: str) -> None:
 	# Entities
 	for e in model.entities:
 		e_uri = _entity_uri(base_uri, e.id)
@@ -135,8 +160,9 @@ def export_turtle(model: DocumentModel, ttl_path: str, base_uri: str = "http://e
 		_add_span(g, ctx, d_uri, "dimension", d.span)
 		g.add((doc_uri, ctx.pg.hasDimension, d_uri))
 
-	# Diagrams
-	for p in model.pages:
+
+def _add_diagrams(g: Graph, ctx, doc_uri: URIRef, pages: Iterable[Page], base_uri: str) -> None:
+	for p in pages:
 		for n in p.diagram_nodes:
 			n_uri = _diagram_node_uri(base_uri, n.id)
 			g.add((n_uri, RDF.type, ctx.pg.Node))
@@ -157,8 +183,54 @@ def export_turtle(model: DocumentModel, ttl_path: str, base_uri: str = "http://e
 			_add_span(g, ctx, de_uri, "edge", e.span)
 			g.add((doc_uri, ctx.pg.hasEdge, de_uri))
 
+
+def export_turtle(model: DocumentModel, ttl_path: str, base_uri: str = "http://example.org/pdf-grepper/") -> Graph:
+	g, ctx = make_graph(base_uri=base_uri)
+	doc_uri = _add_document(g, ctx, model, base_uri)
+	_add_pages(g, ctx, doc_uri, model.pages, base_uri)
+	_add_findings(g, ctx, doc_uri, model, base_uri)
+	_add_diagrams(g, ctx, doc_uri, model.pages, base_uri)
+
 	# Write TTL
 	g.serialize(destination=ttl_path, format="turtle")
 	return g
 
 
+class TurtleStreamWriter:
+	"""
+	Incremental Turtle export for streaming runs: each window of pages is serialized and dropped,
+	document-level resources (entities, relations, ...) are written once on close.
+	The result is a sequence of Turtle chunks; repeated @prefix directives are valid Turtle.
+	"""
+
+	def __init__(self, ttl_path: str, base_uri: str = "http://example.org/pdf-grepper/"):
+		self.base_uri = base_uri
+		self.doc_uri = URIRef(f"{base_uri}document/main")
+		self._fh: Optional[TextIO] = open(ttl_path, "w", encoding="utf-8")
+		self._boilerplate_seen: set = set()
+
+	def _write(self, g: Graph) -> None:
+		assert self._fh is not None, "TurtleStreamWriter is closed"
+		self._fh.write(g.serialize(format="turtle"))
+
+	def write_pages(self, pages: Iterable[Page]) -> None:
+		pages = list(pages)
+		g, ctx = make_graph(base_uri=self.base_uri)
+		_add_pages(g, ctx, self.doc_uri, pages, self.base_uri, self._boilerplate_seen)
+		_add_diagrams(g, ctx, self.doc_uri, pages, self.base_uri)
+		self._write(g)
+
+	def close(self, model: DocumentModel) -> None:
+		"""
+		Write document metadata and findings from model (its pages are ignored) and close the file.
+		"""
+		if self._fh is None:
+			return
+		try:
+			g, ctx = make_graph(base_uri=self.base_uri)
+			doc_uri = _add_document(g, ctx, model, self.base_uri)
+			_add_findings(g, ctx, doc_uri, model, self.base_uri)
+			self._write(g)
+		finally:
+			self._fh.close()
+			self._fh = None
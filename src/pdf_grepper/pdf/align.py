@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from pdf_grepper.inputs import InputDocument
+from pdf_grepper.pdf import preflight
+
+# (source path, page index within that source)
+PageRef = Tuple[str, int]
+
+HASH_SIDE = 16  # aHash grid: HASH_SIDE x HASH_SIDE bits
+THUMB_SIDE = 64  # longest side of the probe render, in pixels
+# Largest Hamming distance between a scan and a native page still taken as the same page
+MAX_DISTANCE = int(HASH_SIDE * HASH_SIDE * 0.12)
+# The best native match must beat the runner-up by this many bits; near-identical pages
+# (e.g. form pages differing in a page number) stay unaligned and are OCRed as usual
+MIN_MARGIN = 4
+# Relative page-size tolerance (scanners add or trim a few points)
+SIZE_TOLERANCE = 0.03
+
+
+@dataclass(frozen=True)
+class PageSignature:
+	"""Cheap identity of a page: geometry, a tiny-render average hash and whether it carries text."""
+
+	ref: PageRef
+	width: float
+	height: float
+	ahash: int
+	native: bool
+	scanned: bool
+
+
+def average_hash(page: fitz.Page) -> int:
+	"""
+	Average hash of a page: a THUMB_SIDE px grayscale render box-filtered to HASH_SIDE x HASH_SIDE,
+	one bit per cell darker than the mean.
+	"""
+	zoom = THUMB_SIDE / max(page.rect.width, page.rect.height, 1.0)
+	pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+	img = Image.frombytes("L", (pix.width, pix.height), pix.samples).resize((HASH_SIDE, HASH_SIDE), Image.BOX)
+	cells = img.tobytes()
+	mean = sum(cells) / len(cells)
+	bits = 0
+	for v in cells:
+		bits = (bits << 1) | (v < mean)
+	return bits
+
+
+def page_signature(path: str, page: fitz.Page) -> PageSignature:
+	profile = preflight.profile_page(page)
+	return PageSignature(
+		ref=(path, page.number),
+		width=page.rect.width,
+		height=page.rect.height,
+		ahash=average_hash(page),
+		native=profile.has_text,
+		scanned=profile.kind == "scanned",
+	)
+
+
+def _same_size(a: PageSignature, b: PageSignature) -> bool:
+	return abs(a.width - b.width) <= SIZE_TOLERANCE * b.width and abs(a.height - b.height) <= SIZE_TOLERANCE * b.height
+
+
+def align_signatures(signatures: Sequence[PageSignature]) -> Dict[PageRef, List[PageRef]]:
+	"""
+	Pair scanned pages with native-text pages of other sources: same size within SIZE_TOLERANCE,
+	hashes within MAX_DISTANCE and unambiguous (MIN_MARGIN), closest pairs first and each native
+	page used once per scanned source. Returns the links in both directions.
+	"""
+	scans = [s for s in signatures if s.scanned]
+	natives = [s for s in signatures if s.native]
+	candidates = []
+	for scan in scans:
+		distances = sorted(
+			(bin(scan.ahash ^ native.ahash).count("1"), native.ref)
+			for native in natives
+			if native.ref[0] != scan.ref[0] and _same_size(scan, native)
+		)
+		if not distances or distances[0][0] > MAX_DISTANCE:
+			continue
+		if len(distances) > 1 and distances[1][0] - distances[0][0] < MIN_MARGIN:
+			continue
+		candidates.append((distances[0][0], scan.ref, distances[0][1]))
+	candidates.sort()
+	links: Dict[PageRef, List[PageRef]] = {}
+	used = set()
+	for _, scan_ref, native_ref in candidates:
+		if scan_ref in links or (scan_ref[0], native_ref) in used:
+			continue
+		used.add((scan_ref[0], native_ref))
+		links[scan_ref] = [native_ref]
+		links.setdefault(native_ref, []).append(scan_ref)
+	return links
+
+
+def align_sources(sources: Sequence[InputDocument]) -> Dict[PageRef, List[PageRef]]:
+	"""Signatures for every page of the PDF sources, aligned (see align_signatures)."""
+	signatures: List[PageSignature] = []
+	for source in sources:
+		if source.ext != ".pdf":
+			continue
+		try:
+			with source.open_pdf() as doc:
+				signatures.extend(page_signature(source.name, page) for page in doc)
+		except Exception:
+			# unreadable sources are reported by the loader proper
+			continue
+	return align_signatures(signatures)
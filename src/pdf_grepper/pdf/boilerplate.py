@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from pdf_grepper.types import Page, TextSpan
+
+# Header/footer bands: this fraction of a source's text extent at the top and at the bottom
+BAND = 0.12
+# Vertical position is bucketed to this many points, so small drifts still match
+Y_BUCKET = 12.0
+# A block is boilerplate once it recurs on at least this share of a source's pages (and MIN_PAGES)
+MIN_SHARE = 0.5
+MIN_PAGES = 3
+
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+
+BlockKey = Tuple[str, str, int]  # (source, normalised text, y bucket)
+
+
+def normalise(text: str) -> str:
+	"""Case- and whitespace-folded text with digit runs collapsed, so "Page 3 of 40" == "Page 7 of 40"."""
+	return _SPACES.sub(" ", _DIGITS.sub("#", text)).strip().casefold()
+
+
+def _source(ts: TextSpan) -> Optional[str]:
+	return ts.span.source_path if ts.span else None
+
+
+class BoilerplateDetector:
+	"""
+	Marks running headers, footers, page numbers and banners: text blocks inside a source's top or
+	bottom band that recur at the same height on many of its pages.
+
+	Counts accumulate across mark() calls, so a streaming run can feed windows of pages; blocks are
+	judged against every page seen so far. Marking a whole document in one call is exact.
+	"""
+
+	def __init__(self, band: float = BAND, min_share: float = MIN_SHARE, min_pages: int = MIN_PAGES):
+		self.band = band
+		self.min_share = min_share
+		self.min_pages = min_pages
+		self._pages: Dict[str, int] = defaultdict(int)
+		self._seen: Dict[BlockKey, Set[int]] = defaultdict(set)
+		self._extent: Dict[str, Tuple[float, float]] = {}
+
+	def _update_extent(self, pages: List[Page]) -> None:
+		for page in pages:
+			for ts in page.text_blocks:
+				source = _source(ts)
+				if source is None or not ts.span.bbox or None in ts.span.bbox:
+					continue
+				y0, y1 = ts.span.bbox[1], ts.span.bbox[3]
+				lo, hi = self._extent.get(source, (y0, y1))
+				self._extent[source] = (min(lo, y0), max(hi, y1))
+
+	def _key(self, ts: TextSpan) -> Optional[BlockKey]:
+		source = _source(ts)
+		if source is None or not ts.span.bbox or None in ts.span.bbox or source not in self._extent:
+			return None
+		lo, hi = self._extent[source]
+		margin = self.band * (hi - lo)
+		y0, y1 = ts.span.bbox[1], ts.span.bbox[3]
+		if y1 > lo + margin and y0 < hi - margin:
+			return None
+		text = normalise(ts.text)
+		return (source, text, int(y0 // Y_BUCKET)) if text else None
+
+	def mark(self, pages: Iterable[Page]) -> int:
+		"""Flag boilerplate spans of pages (TextSpan.boilerplate); returns how many were flagged."""
+		pages = list(pages)
+		self._update_extent(pages)
+		keyed: List[Tuple[TextSpan, BlockKey]] = []
+		for page in pages:
+			for source in {_source(ts) for ts in page.text_blocks} - {None}:
+				self._pages[source] += 1
+			for ts in page.text_blocks:
+				key = self._key(ts)
+				if key is not None:
+					self._seen[key].add(page.index)
+					keyed.append((ts, key))
+		marked = 0
+		for ts, key in keyed:
+			needed = max(self.min_pages, self.min_share * self._pages[key[0]])
+			if len(self._seen[key]) >= needed:
+				ts.boilerplate = True
+				marked += 1
+		return marked
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from rapidfuzz import fuzz
+from rapidfuzz.utils import default_process
+
+from pdf_grepper.types import Page, TextSpan
+
+# Spans at least this similar (rapidfuzz ratio, 0-100) after normalisation are the same block
+FUSE_THRESHOLD = 92.0
+# Blocking: each span is indexed under the SKETCH_SIZE smallest hashes of its word SHINGLE-grams
+# (a bottom-k sketch), so near-duplicates share keys while unrelated spans rarely do
+SHINGLE = 3
+SKETCH_SIZE = 4
+# Spans shorter than this (normalised) are left alone: page numbers, labels, single words
+MIN_CHARS = 24
+
+
+def _sketch(norm: str) -> List[int]:
+	words = norm.split()
+	if len(words) < SHINGLE:
+		return [zlib.crc32(norm.encode())]
+	shingles = {zlib.crc32(" ".join(words[i : i + SHINGLE]).encode()) for i in range(len(words) - SHINGLE + 1)}
+	return sorted(shingles)[:SKETCH_SIZE]
+
+
+def _source(ts: TextSpan) -> Optional[str]:
+	return ts.span.source_path if ts.span else None
+
+
+def _is_ocr(ts: TextSpan) -> bool:
+	return bool(ts.span and ts.span.note == "ocr")
+
+
+class SpanFuser:
+	"""
+	Incremental cross-source fusion of near-identical TextSpans.
+
+	Pages are fed in source order. A span matching a canonical span from another source is removed
+	from its page and its provenance appended to the canonical span's alt_spans; each source
+	contributes at most one span per cluster. A native-text span matching an OCR canonical span
+	stays on its page instead and becomes the canonical span, while the OCR span leaves its
+	(earlier) page for the alt_spans - so pages already fed may still change until the last page
+	is. Candidates come from the blocking index only, so the cost grows with the number of spans
+	times the (small) block sizes rather than quadratically.
+	"""
+
+	def __init__(self, threshold: float = FUSE_THRESHOLD):
+		self.threshold = threshold
+		self._blocks: Dict[int, List[int]] = defaultdict(list)
+		self._canon: List[TextSpan] = []
+		self._pages: List[Page] = []
+		self._norm: List[str] = []
+		self._sources: List[set] = []
+		self.removed = 0
+
+	def _match(self, norm: str, keys: List[int], source: Optional[str]) -> Optional[int]:
+		seen = set()
+		for key in keys:
+			for cid in self._blocks.get(key, ()):
+				if cid in seen:
+					continue
+				seen.add(cid)
+				if source in self._sources[cid]:
+					continue
+				other = self._norm[cid]
+				# fuzz.ratio is at most 200 * shorter / (sum of lengths): skip pairs that cannot reach the threshold
+				la, lb = len(norm), len(other)
+				if 200 * min(la, lb) < self.threshold * (la + lb):
+					continue
+				if fuzz.ratio(norm, other, score_cutoff=self.threshold):
+					return cid
+		return None
+
+	def fuse_page(self, page: Page) -> Page:
+		kept: List[TextSpan] = []
+		for ts in page.text_blocks:
+			source = _source(ts)
+			norm = default_process(ts.text)
+			if source is None or len(norm) < MIN_CHARS:
+				kept.append(ts)
+				continue
+			keys = _sketch(norm)
+			cid = self._match(norm, keys, source)
+			if cid is None:
+				cid = len(self._canon)
+				self._canon.append(ts)
+				self._pages.append(page)
+				self._norm.append(norm)
+				self._sources.append({source})
+				for key in keys:
+					self._blocks[key].append(cid)
+				kept.append(ts)
+				continue
+			canon = self._canon[cid]
+			self._sources[cid].add(source)
+			self.removed += 1
+			if _is_ocr(canon) and not _is_ocr(ts):
+				# native text beats OCR: ts stays where it was found and the OCR reading becomes its alternate
+				owner = self._pages[cid]
+				owner.text_blocks = [b for b in owner.text_blocks if b is not canon]
+				ts.alt_spans = [canon.span, *canon.alt_spans, *ts.alt_spans]
+				self._canon[cid], self._pages[cid], self._norm[cid] = ts, page, norm
+				for key in keys:
+					if cid not in self._blocks[key]:
+						self._blocks[key].append(cid)
+				kept.append(ts)
+				continue
+			canon.alt_spans.append(ts.span)
+			canon.alt_spans.extend(ts.alt_spans)
+		page.text_blocks = kept
+		return page
+
+	def fuse(self, pages: Iterable[Page]) -> Iterator[Page]:
+		for page in pages:
+			yield self.fuse_page(page)
+
+
+def fuse_pages(pages: List[Page], threshold: float = FUSE_THRESHOLD) -> int:
+	"""Fuse near-duplicate spans across sources in place; returns the number of spans removed."""
+	fuser = SpanFuser(threshold)
+	for page in pages:
+		fuser.fuse_page(page)
+	return fuser.removed
@@ -7,11 +7,13 @@ from pdf_grepper.types import Page, TextSpan
 
 def consolidate_text(page: Page, min_block_len: int = 20) -> List[str]:
 	"""
-	Produce consolidated text strings per page by joining short blocks.
+	Produce consolidated text strings per page by joining short blocks (boilerplate is left out).
 	"""
 	buf: List[str] = []
 	current: List[str] = []
 	for ts in page.text_blocks:
+		if ts.boilerplate:
+			continue
 		if len(ts.text) < min_block_len:
 			current.append(ts.text)
 		else:
@@ -1,24 +1,86 @@
 from __future__ import annotations
 
-import os
-from typing import List, Tuple
+import hashlib
+import json
+import math
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, field, replace
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 import fitz  # PyMuPDF
 from docx import Document as DocxDocument
 from PIL import Image
 
+from pdf_grepper import cache as cache_mod
+from pdf_grepper import inputs as inputs_mod
 from pdf_grepper.types import DocumentModel, Page, SourceSpan, TextSpan
+from pdf_grepper.pdf import align as align_mod
+from pdf_grepper.pdf import fuse as fuse_mod
 from pdf_grepper.pdf import ocr as ocr_mod
+from pdf_grepper.pdf import preflight
+
+# A page-level stage runs against the already-open fitz page while the loader visits it,
+# e.g. diagram primitive extraction: stage(doc_path, page_obj, page). A stage may carry a
+# page_kinds attribute listing the pre-flight kinds it can produce output for; other pages skip it.
+PageStage = Callable[[str, fitz.Page, Page], None]
+
+
+@dataclass(frozen=True)
+class _VisitConfig:
+	"""Per-run page visit settings; picklable so worker processes receive the same configuration."""
+
+	ocr_mode: str = "auto"
+	ocr_engine: str = "pytesseract"
+	# OCR image placements lacking vector text instead of whole pages
+	ocr_regions: bool = False
+	page_stages: Tuple[PageStage, ...] = ()
+	page_cache_dir: Optional[str] = None
+	# > 0: pipelined OCR holding at most this many rendered bitmaps (does not change output)
+	ocr_prefetch: int = 0
+	# persistent OCR result cache keyed on rendered pixels (does not change output)
+	ocr_cache_dir: Optional[str] = None
+	# fixed render resolution, or "auto" to pick one per page/region (see _choose_ocr_dpi)
+	ocr_dpi: Union[int, str] = 300
+	# > 0: OCR targets rendering to more pixels are split into overlapping tiles of at most this size
+	ocr_tile_pixels: int = 0
+	# cross-source page links (see align.align_sources); aligned scans are not OCRed
+	alignment: Dict[align_mod.PageRef, List[align_mod.PageRef]] = field(default_factory=dict)
+
+	def cache_settings(self) -> str:
+		"""Everything besides page content that changes what a visit produces."""
+		stages = [f"{s.__module__}.{getattr(s, '__qualname__', repr(s))}" for s in self.page_stages]
+		return json.dumps(
+			{
+				"ocr": self.ocr_mode,
+				"engine": self.ocr_engine,
+				"regions": self.ocr_regions,
+				"dpi": self.ocr_dpi,
+				"tile_pixels": self.ocr_tile_pixels,
+				"stages": stages,
+			},
+			sort_keys=True,
+		)
 
 
 def _extract_text_blocks_from_page(
-	doc_path: str, page: fitz.Page, page_index: int, do_ocr: bool, force_ocr: bool = False
+	doc_path: str,
+	page: fitz.Page,
+	page_index: int,
+	do_ocr: bool,
+	force_ocr: bool = False,
+	textpage: Optional[fitz.TextPage] = None,
+	cfg: Optional[_VisitConfig] = None,
+	vector_text: bool = True,
 ) -> List[TextSpan]:
+	cfg = cfg or _VisitConfig()
 	blocks: List[TextSpan] = []
-	# Try vector text first: collect and sort by (y0, x0) for reading order
+	# Try vector text first (unless pre-flight found no text objects): collect and sort by (y0, x0) for reading order
 	raw_blocks: List[Tuple[float | None, float | None, float | None, float | None, str]] = []
 	try:
-		for b in page.get_text("blocks"):
+		for b in page.get_text("blocks", textpage=textpage) if vector_text else ():
 			x0, y0, x1, y1, text, *_ = list(b) + [None] * (6 - len(b))
 			if not text:
 				continue
@@ -35,67 +97,683 @@ def _extract_text_blocks_from_page(
 			)
 		)
 
-	# OCR: always in local mode (force_ocr), or on sparse text in auto mode
-	if do_ocr and (force_ocr or len(" ".join(tb.text for tb in blocks)) < 20):
+	# OCR: whole page (always in local mode, on sparse text in auto mode) or image regions, see _ocr_jobs
+	if do_ocr:
+		for job in _ocr_jobs(page, blocks, force_ocr, cfg):
+			try:
+				# one tile rendered at a time: peak memory is a single tile regardless of page size
+				texts = [ocr_mod.recognize(r(), engine=cfg.ocr_engine, cache_dir=cfg.ocr_cache_dir) for r in job.renders]
+				span = _ocr_span(job.stitch(texts), page_index, doc_path, job.bbox)
+				if span is not None:
+					blocks.append(span)
+			except Exception:
+				pass
+
+	return blocks
+
+
+BBox = Tuple[float, float, float, float]
+
+
+def _needs_ocr(blocks: List[TextSpan], force_ocr: bool) -> bool:
+	return force_ocr or len(" ".join(tb.text for tb in blocks)) < 20
+
+
+def _text_coverage(rect: fitz.Rect, blocks: List[TextSpan]) -> float:
+	"""
+	Fraction of rect covered by vector text block bboxes (overlaps between blocks are not merged).
+	"""
+	area = rect.get_area()
+	if area <= 0:
+		return 1.0
+	covered = 0.0
+	for tb in blocks:
+		if tb.span is None or not tb.span.bbox or None in tb.span.bbox:
+			continue
+		covered += (rect & fitz.Rect(tb.span.bbox)).get_area()
+	return min(1.0, covered / area)
+
+
+def _image_regions(page: fitz.Page, min_side: float = 24.0) -> List[fitz.Rect]:
+	"""
+	Distinct on-page image placements large enough to hold text, clipped to the page.
+	"""
+	regions: List[fitz.Rect] = []
+	try:
+		infos = page.get_image_info()
+	except Exception:
+		return regions
+	for info in infos:
+		rect = fitz.Rect(info["bbox"]) & page.rect
+		if rect.is_empty or rect.width < min_side or rect.height < min_side:
+			continue
+		if any(rect == r for r in regions):
+			continue
+		regions.append(rect)
+	return regions
+
+
+@dataclass
+class _OcrJob:
+	"""
+	One OCR target (bbox None = whole page), rendered as a single image or, when it exceeds the tile
+	pixel budget, as a row-major grid of overlapping tiles whose texts are stitched back together.
+	"""
+
+	bbox: Optional[BBox]
+	renders: List[Callable[[], Image.Image]]
+	columns: int = 1
+
+	def stitch(self, texts: Sequence[Optional[str]]) -> Optional[str]:
+		if len(texts) == 1:
+			return texts[0]
+		# Stitch each column top to bottom, dropping lines repeated across the seam; columns follow each other
+		out: List[str] = []
+		for col in range(self.columns):
+			lines: List[str] = []
+			for text in texts[col :: self.columns]:
+				lines = _join_at_seam(lines, [ln for ln in (text or "").splitlines() if ln.strip()])
+			out.extend(lines)
+		return "\n".join(out) or None
+
+
+def _join_at_seam(upper: List[str], lower: List[str], window: int = 8, max_cut: int = 2) -> List[str]:
+	"""
+	Join the lines of vertically adjacent tiles. Lines inside the overlap band are read by both tiles;
+	the longest run of lines shared by the tail of upper and the head of lower marks the seam. Lines
+	after it in upper and before it in lower (at most max_cut each) are glyphs cut by a tile edge
+	and are dropped.
+	"""
+	if not upper or not lower:
+		return upper + lower
+	tail, head = upper[-window:], lower[:window]
+	norm_tail = [" ".join(ln.split()).casefold() for ln in tail]
+	norm_head = [" ".join(ln.split()).casefold() for ln in head]
+	best = (0, 0, 0)  # (run length, start in tail, start in head)
+	for i in range(len(tail)):
+		for j in range(min(len(head), max_cut + 1)):
+			k = 0
+			while i + k < len(tail) and j + k < len(head) and norm_tail[i + k] == norm_head[j + k]:
+				k += 1
+			if k > best[0] and len(tail) - (i + k) <= max_cut:
+				best = (k, i, j)
+	k, i, j = best
+	if not k:
+		return upper + lower
+	return upper[: len(upper) - len(tail) + i + k] + lower[j + k :]
+
+
+# Tiles overlap by this much (points) so any text line shorter than the band is whole in one tile
+OCR_TILE_OVERLAP_PT = 36.0
+
+
+def _tile_clips(area: fitz.Rect, dpi: int, max_pixels: int) -> Tuple[List[fitz.Rect], int]:
+	"""
+	Split area into overlapping clips that each render to at most max_pixels at dpi, as a row-major
+	list plus the column count. Full-width strips are preferred so text lines are not cut sideways;
+	columns are only added when a strip a few overlaps tall would exceed the budget.
+	"""
+	scale = dpi / 72.0
+	if max_pixels <= 0 or area.width * area.height * scale * scale <= max_pixels:
+		return [area], 1
+	overlap = OCR_TILE_OVERLAP_PT
+	min_height = 4 * overlap
+	columns = 1
+	step_x = area.width
+	while step_x * min_height * scale * scale > max_pixels and step_x > min_height:
+		columns += 1
+		step_x = (area.width + (columns - 1) * overlap) / columns
+	tile_h = max(min_height, max_pixels / (step_x * scale * scale))
+	rows = max(1, math.ceil((area.height - overlap) / (tile_h - overlap)))
+	step_y = (area.height + (rows - 1) * overlap) / rows
+	clips = []
+	for r in range(rows):
+		y0 = area.y0 + r * (step_y - overlap)
+		for c in range(columns):
+			x0 = area.x0 + c * (step_x - overlap)
+			clips.append(fitz.Rect(x0, y0, min(area.x1, x0 + step_x), min(area.y1, y0 + step_y)))
+	return clips, columns
+
+
+def _ocr_jobs(page: fitz.Page, blocks: List[TextSpan], force_ocr: bool, cfg: _VisitConfig) -> List[_OcrJob]:
+	"""
+	What to recognise on a page, as _OcrJob targets.
+
+	Whole-page mode follows the OCR mode (always in local, sparse text in auto). Region mode only
+	renders image placements that vector text does not already cover, falling back to the whole
+	page when a page has sparse text and no images (e.g. outlined glyphs).
+	"""
+	if cfg.ocr_regions:
+		regions = _image_regions(page)
+		if regions:
+			return [_ocr_job(page, r, cfg) for r in regions if _text_coverage(r, blocks) < 0.5]
+		force_ocr = False
+	if not _needs_ocr(blocks, force_ocr):
+		return []
+	return [_ocr_job(page, None, cfg)]
+
+
+def _ocr_job(page: fitz.Page, clip: Optional[fitz.Rect], cfg: _VisitConfig) -> _OcrJob:
+	dpi = _choose_ocr_dpi(page, clip) if cfg.ocr_dpi == "auto" else int(cfg.ocr_dpi)
+	area = clip if clip is not None else page.rect
+	tiles, columns = _tile_clips(area, dpi, cfg.ocr_tile_pixels)
+	if len(tiles) == 1:
+		renders = [lambda: _render_for_ocr(page, clip=clip, dpi=dpi)]
+	else:
+		renders = [lambda t=t: _render_for_ocr(page, clip=t, dpi=dpi) for t in tiles]
+	return _OcrJob(bbox=tuple(clip) if clip is not None else None, renders=renders, columns=columns)
+
+
+# Adaptive OCR resolution: Tesseract is accurate once a text line (ascender to descender, about
+# one em) spans ~40 px; more pixels cost time without helping, fewer lose accuracy.
+OCR_DPI_MIN = 150
+OCR_DPI_MAX = 600
+OCR_DPI_DEFAULT = 300
+_OCR_TARGET_LINE_PX = 40.0
+# Probe height of 7pt type: only smaller text renders above OCR_DPI_DEFAULT
+_OCR_FINE_PRINT_PT = 6.0
+
+
+def _source_dpi(page: fitz.Page, clip: Optional[fitz.Rect] = None) -> Optional[float]:
+	"""
+	Effective resolution of the densest image placement in the area, in pixels per inch on the page.
+	"""
+	area = clip if clip is not None else page.rect
+	best: Optional[float] = None
+	try:
+		infos = page.get_image_info()
+	except Exception:
+		return None
+	for info in infos:
+		rect = fitz.Rect(info["bbox"])
+		if rect.is_empty or (rect & area).is_empty or not info.get("width") or not info.get("height"):
+			continue
+		dpi = max(info["width"] * 72.0 / rect.width, info["height"] * 72.0 / rect.height)
+		best = dpi if best is None else max(best, dpi)
+	return best
+
+
+def _text_height_pt(page: fitz.Page, clip: Optional[fitz.Rect] = None) -> Optional[float]:
+	"""
+	Median text line height in points, measured on a 72 dpi grayscale probe (one pixel per point)
+	from the runs of rows carrying ink. None when the area shows no line structure.
+	"""
+	try:
+		pix = page.get_pixmap(dpi=72, colorspace=fitz.csGRAY, alpha=False, clip=clip)
+	except Exception:
+		return None
+	if pix.width < 8 or pix.height < 8:
+		return None
+	dark = bytes(range(128))
+	table = bytes.maketrans(dark, b"\x00" * len(dark))
+	data = pix.samples
+	min_ink = max(1, pix.width // 200)
+	runs: List[int] = []
+	run = 0
+	for y in range(pix.height + 1):
+		row = data[y * pix.stride : y * pix.stride + pix.width] if y < pix.height else b""
+		if row and row.translate(table).count(0) >= min_ink:
+			run += 1
+			continue
+		# runs of a few points are rules or noise, tall ones figures or photos
+		if 3 <= run <= pix.height // 5:
+			runs.append(run)
+		run = 0
+	if not runs:
+		return None
+	runs.sort()
+	return float(runs[len(runs) // 2])
+
+
+def _choose_ocr_dpi(page: fitz.Page, clip: Optional[fitz.Rect] = None) -> int:
+	"""
+	Cheapest render resolution that keeps recognition quality for a page or region.
+
+	The estimated text height sets the DPI that brings lines to about _OCR_TARGET_LINE_PX; a nearby
+	embedded image resolution wins so scans render pixel-aligned rather than resampled (and the DPI
+	never exceeds twice the scan, where interpolation adds only cost). The result stays within
+	OCR_DPI_MIN..OCR_DPI_DEFAULT; only text smaller than 7pt goes higher, to the line height 7pt
+	type gets at the default. Without a text estimate the scan resolution is used, else
+	OCR_DPI_DEFAULT. Rounded to 25 dpi so the OCR cache still hits.
+	"""
+	source = _source_dpi(page, clip)
+	height = _text_height_pt(page, clip)
+	cap = float(OCR_DPI_DEFAULT)
+	if height is not None:
+		dpi = _OCR_TARGET_LINE_PX * 72.0 / height
+		if source is not None:
+			if abs(dpi - source) <= 0.2 * source:
+				dpi = source
+			dpi = min(dpi, 2 * source)
+		cap *= max(1.0, _OCR_FINE_PRINT_PT / height)
+	elif source is not None:
+		dpi = source
+	else:
+		dpi = OCR_DPI_DEFAULT
+	dpi = 25 * round(min(dpi, cap) / 25)
+	return int(min(OCR_DPI_MAX, max(OCR_DPI_MIN, dpi)))
+
+
+def _render_for_ocr(page: fitz.Page, clip: Optional[fitz.Rect] = None, dpi: int = OCR_DPI_DEFAULT) -> Image.Image:
+	"""
+	Rasterise for OCR straight into an 8-bit grayscale pixmap (a third of RGB; Tesseract works on
+	luminance anyway) and wrap its sample buffer as a PIL image without copying.
+	"""
+	pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False, clip=clip)
+	img = Image.frombuffer("L", (pix.width, pix.height), pix.samples_mv, "raw", "L", pix.stride, 1)
+	# The image maps the pixmap's memory: keep the pixmap alive for as long as the image
+	img._pixmap = pix  # type: ignore[attr-defined]
+	img.info["dpi"] = (dpi, dpi)
+	return img
+
+
+def _ocr_span(text: Optional[str], page_index: int, doc_path: str, bbox: Optional[BBox] = None) -> Optional[TextSpan]:
+	if not text or not text.strip():
+		return None
+	return TextSpan(
+		text=text.strip(),
+		span=SourceSpan(page_index=page_index, bbox=bbox, source_path=doc_path, note="ocr"),
+		confidence=0.6,
+	)
+
+
+# Indirect references: object numbers change when a file is re-saved, so fingerprints drop them
+_OBJ_REF = re.compile(r"\d+ \d+ R")
+# Font keys holding streams that change what text extraction returns
+_FONT_STREAM_KEYS = (
+	"ToUnicode",
+	"Encoding",
+	"FontDescriptor/FontFile",
+	"FontDescriptor/FontFile2",
+	"FontDescriptor/FontFile3",
+)
+
+
+def _object_refs(doc: fitz.Document, xref: int, key: str) -> List[int]:
+	kind, value = doc.xref_get_key(xref, key)
+	return [int(ref.split()[0]) for ref in _OBJ_REF.findall(value)] if kind in ("xref", "array", "dict") else []
+
+
+def _font_digest(doc: fitz.Document, xref: int) -> bytes:
+	"""
+	Digest of a font as text extraction sees it: its dictionaries (widths, encoding differences)
+	without object numbers, plus the decoded font programs, ToUnicode CMaps and Type3 glyph procedures
+	of the font and its descendants. Memoised per document, as fonts are shared across pages.
+	"""
+	memo: Dict[int, bytes] = doc.__dict__.setdefault("_pg_font_digests", {})
+	if xref not in memo:
+		h = hashlib.sha256()
+		for font in [xref] + _object_refs(doc, xref, "DescendantFonts"):
+			h.update(_OBJ_REF.sub("R", doc.xref_object(font, compressed=True)).encode())
+			streams = [ref for key in _FONT_STREAM_KEYS for ref in _object_refs(doc, font, key)]
+			for ref in streams + _object_refs(doc, font, "CharProcs"):
+				h.update(doc.xref_stream(ref) or b"")
+		memo[xref] = h.digest()
+	return memo[xref]
+
+
+def _page_fingerprint(page_obj: fitz.Page, settings: str) -> str:
+	"""
+	Content address of a page: decoded content and form streams, encoded image streams (hashing
+	compressed image bytes avoids decoding them) with their geometry and colour space, fonts (see
+	_font_digest), annotations and form widgets (dictionary, field value and appearance streams),
+	page geometry, plus visit settings. Object numbers, resource names and stream filters are left
+	out so re-saving a file (new xref table, trailer or compression) keeps unchanged pages addressable.
+	"""
+	doc = page_obj.parent
+	h = hashlib.sha256()
+	h.update(settings.encode())
+	h.update(repr((tuple(page_obj.mediabox), page_obj.rotation)).encode())
+	for xref in page_obj.get_contents():
+		h.update(doc.xref_stream(xref) or b"")
+	for img in page_obj.get_images(full=True):
+		# width, height, bits per component, colour space and its alternate
+		h.update(repr(img[2:7]).encode())
+		h.update(doc.xref_stream_raw(img[0]) or b"")
+		if img[1]:
+			h.update(doc.xref_stream_raw(img[1]) or b"")  # soft mask
+	for xobj in page_obj.get_xobjects():
+		h.update(doc.xref_stream(xobj[0]) or b"")
+	for font in page_obj.get_fonts(full=True):
+		# extension, type, base font and encoding; not the xref or the resource name
+		h.update(repr((font[1], font[2], font[3], font[5])).encode())
+		h.update(_font_digest(doc, font[0]))
+	annots = preflight.appearance_xrefs(page_obj)
+	# field values may be inherited from a parent field: ask the widgets rather than their dictionaries
+	values = {w.xref: w.field_value for w in page_obj.widgets()} if page_obj.first_widget is not None else {}
+	for xref, _, aps in annots:
+		h.update(_OBJ_REF.sub("R", doc.xref_object(xref, compressed=True)).encode())
+		h.update(repr(values.get(xref)).encode())
+		for ap in aps:
+			h.update(doc.xref_stream(ap) or b"")
+	return h.hexdigest()
+
+
+def _restamp(page: Page, path: str, page_index: int, index: int) -> Page:
+	"""
+	Re-point a cached page at its position in this run (spans carry per-run provenance).
+	"""
+	page.index = index
+	spans = [ts.span for ts in page.text_blocks]
+	spans += [n.span for n in page.diagram_nodes] + [e.span for e in page.diagram_edges]
+	for span in spans:
+		if span is not None:
+			span.page_index = page_index
+			span.source_path = path
+	return page
+
+
+def _visit_pdf_page(
+	path: str,
+	page_obj: fitz.Page,
+	page_index: int,
+	index: int,
+	cfg: _VisitConfig,
+	ocr_pipe: Optional[ocr_mod.OcrPipeline] = None,
+) -> "Future[Page]":
+	"""
+	Decode one PDF page once: text extraction and the OCR decision share a single TextPage,
+	then every page-level stage runs against the same fitz page. With a page cache, pages whose
+	content fingerprint was seen before are spliced from the cache instead.
+
+	A pre-flight profile (see preflight.profile_page) sets Page.kind and skips what cannot produce
+	output: text extraction without text objects, OCR on blank pages, stages not listing the kind.
+	Pages aligned with another source record the links in Page.aligned; aligned scans skip OCR.
+
+	Returns a future: already resolved, or - with an OCR pipeline - resolved by an OCR consumer
+	once the page's rendered image has been recognised.
+	"""
+	done: "Future[Page]" = Future()
+	links = cfg.alignment.get((path, page_index), [])
+	key = None
+	if cfg.page_cache_dir:
+		key = _page_fingerprint(page_obj, cfg.cache_settings() + (json.dumps(links) if links else ""))
+		cached = cache_mod.read_page(cfg.page_cache_dir, key)
+		if cached is not None:
+			done.set_result(_restamp(cached, path, page_index, index))
+			return done
+	profile = preflight.profile_page(page_obj)
+	textpage = page_obj.get_textpage() if profile.has_text else None
+	do_ocr = cfg.ocr_mode in {"local", "auto"} and profile.kind != "blank"
+	if links and profile.kind == "scanned":
+		do_ocr = False  # the aligned native page carries the text
+	force_ocr = cfg.ocr_mode == "local"
+	blocks = _extract_text_blocks_from_page(
+		path,
+		page_obj,
+		page_index,
+		do_ocr=do_ocr and ocr_pipe is None,
+		force_ocr=force_ocr,
+		textpage=textpage,
+		cfg=cfg,
+		vector_text=profile.has_text,
+	)
+	page = Page(index=index, text_blocks=blocks, kind=profile.kind)
+	page.aligned = [SourceSpan(page_index=i, source_path=p, note="aligned") for p, i in links]
+	for stage in cfg.page_stages:
+		if profile.kind in getattr(stage, "page_kinds", preflight.PAGE_KINDS):
+			stage(path, page_obj, page)
+
+	def _finish(results: Sequence[Tuple[_OcrJob, List[Optional[str]]]] = ()) -> None:
 		try:
-			pix = page.get_pixmap(dpi=300, alpha=False)
-			img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-			text = ocr_mod.ocr_image_to_text(img)
-			if text and text.strip():
-						blocks.append(
-					TextSpan(
-						text=text.strip(),
-						span=SourceSpan(page_index=page_index, bbox=None, source_path=doc_path, note="ocr"),
-						confidence=0.6,
-					)
-				)
+			for job, texts in results:
+				span = _ocr_span(job.stitch(texts), page_index, path, job.bbox)
+				if span is not None:
+					page.text_blocks.append(span)
+			if key is not None:
+				cache_mod.write_page(cfg.page_cache_dir, key, page)
 		except Exception:
 			pass
+		finally:
+			done.set_result(page)
 
-	return blocks
+	jobs = _ocr_jobs(page_obj, blocks, force_ocr, cfg) if ocr_pipe is not None and do_ocr else []
+	if not jobs:
+		_finish()
+		return done
+	futures = [[ocr_pipe.submit(render) for render in job.renders] for job in jobs]
+	remaining = [sum(len(fs) for fs in futures)]
+	lock = threading.Lock()
+
+	def _on_done(_: Future) -> None:
+		with lock:
+			remaining[0] -= 1
+			if remaining[0]:
+				return
+		_finish([(job, [f.result() for f in fs]) for job, fs in zip(jobs, futures)])
+
+	# Callbacks are attached only after every job is submitted so the last one sees all results
+	for fs in futures:
+		for f in fs:
+			f.add_done_callback(_on_done)
+	return done
 
 
-def load_pdf_or_docx(paths: List[str], ocr_mode: str = "auto") -> DocumentModel:
+def _iter_pdf_pages(
+	path: str, doc: fitz.Document, start: int, stop: int, base_index: int, cfg: _VisitConfig
+) -> Iterator[Page]:
 	"""
-	Load one or more sources (PDF/DOCX), returning a single fused DocumentModel with per-page text spans.
+	Visit pages [start, stop) of an open PDF in order; Page.index continues from base_index.
+	With cfg.ocr_prefetch, rendering runs ahead of recognition and pages are yielded, still in
+	order, as their OCR completes.
+	"""
+	if cfg.ocr_prefetch <= 0 or cfg.ocr_mode not in {"local", "auto"}:
+		for i in range(start, stop):
+			yield _visit_pdf_page(path, doc[i], i, base_index + i - start, cfg).result()
+		return
+	pipe = ocr_mod.OcrPipeline(depth=cfg.ocr_prefetch, engine=cfg.ocr_engine, cache_dir=cfg.ocr_cache_dir)
+	try:
+		pending: "Deque[Future[Page]]" = deque()
+		for i in range(start, stop):
+			pending.append(_visit_pdf_page(path, doc[i], i, base_index + i - start, cfg, ocr_pipe=pipe))
+			while pending and pending[0].done():
+				yield pending.popleft().result()
+		while pending:
+			yield pending.popleft().result()
+	finally:
+		pipe.close()
+
+
+def _extract_pdf_page_range(path: str, start: int, stop: int, base_index: int, cfg: _VisitConfig) -> List[Page]:
+	"""
+	Worker entry point: open a private fitz handle and extract pages [start, stop) of one PDF.
+	"""
+	with fitz.open(path) as doc:
+		return list(_iter_pdf_pages(path, doc, start, stop, base_index, cfg))
+
+
+def _shard_ranges(page_count: int, workers: int) -> List[Tuple[int, int]]:
+	"""
+	Split [0, page_count) into contiguous ranges, a few per worker so slow (OCR-heavy) shards balance out.
+	"""
+	size = max(1, -(-page_count // (workers * 4)))
+	return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def iter_pages(
+	paths: Iterable[inputs_mod.InputLike],
+	ocr_mode: str = "auto",
+	workers: int = 1,
+	page_stages: Sequence[PageStage] = (),
+	page_cache_dir: Optional[str] = None,
+	ocr_engine: str = "pytesseract",
+	ocr_prefetch: int = 0,
+	ocr_regions: bool = False,
+	ocr_cache_dir: Optional[str] = None,
+	ocr_dpi: Union[int, str] = 300,
+	ocr_tile_pixels: int = 0,
+	align_sources: bool = False,
+	fuse_sources: bool = False,
+) -> Iterator[Page]:
+	"""
+	Stream pages from one or more sources (PDF/DOCX) in source order without materialising the document.
+	paths: file paths, or in-memory inputs - bytes, file-like objects, mmaps or InputDocuments
+	(see pdf_grepper.inputs); each is read once. In-memory inputs without a path load in-process.
 	ocr_mode: "none" | "local" | "auto"
+	workers: when > 1, PDF pages are sharded across a process pool; pages are reassembled in
+	source order so the result matches the serial path. At most 2 * workers shards are in flight.
+	page_stages: extra per-page stages (see PageStage) run while each PDF page is open, so
+	every page is decoded exactly once. Stages must be picklable when workers > 1.
+	page_cache_dir: content-addressed page cache; only pages whose content (or OCR/stage
+	settings) changed are re-extracted and re-OCRed, the rest are spliced from the cache.
+	ocr_engine: "pytesseract" (subprocess per page) | "tesserocr" (persistent worker pool).
+	ocr_prefetch: when > 0, page rendering and OCR are pipelined through a bounded queue holding at
+	most this many rendered bitmaps; output is unchanged.
+	ocr_regions: OCR only image placements that lack vector text (spans carry the region bbox)
+	instead of whole pages, so mixed native/scanned pages cost a fraction of full-page OCR.
+	ocr_cache_dir: persistent, size-capped OCR result cache keyed on the rendered image, shared
+	across runs and documents.
+	ocr_dpi: OCR render resolution, or "auto" to choose per page/region from the estimated text
+	height and embedded image resolution.
+	ocr_tile_pixels: when > 0, OCR targets rendering to more pixels (e.g. A0 sheets) are recognised
+	as overlapping tiles of at most this many pixels and stitched, bounding memory per bitmap.
+	align_sources: before loading, align pages across PDF sources by size and a tiny-render hash;
+	scanned pages matching a native-text page of another source are not OCRed, and both pages
+	link each other in Page.aligned.
+	fuse_sources: drop text spans that near-duplicate a span of an earlier source; the kept
+	(canonical) span lists the others in TextSpan.alt_spans (see fuse.SpanFuser). A native span
+	replacing an OCR one removes the OCR span from its earlier page, so pages are final only once
+	the iterator is exhausted; the fusion index grows with the number of distinct spans.
 	"""
-	pages: List[Page] = []
-	collected_sources: List[str] = []
-	for path in paths:
-		collected_sources.append(path)
-		ext = os.path.splitext(path)[1].lower()
-		if ext == ".pdf":
-			# Ensure Tesseract presence when local OCR is requested (do not wrap into ValueError)
-			if ocr_mode == "local" and not ocr_mod.tesseract_available():
-				raise RuntimeError("Tesseract is not available but ocr_mode='local' was requested")
-			try:
-				with fitz.open(path) as doc:
-					for i, page in enumerate(doc):
-						do_ocr = ocr_mode in {"local", "auto"}
-						force_ocr = ocr_mode == "local"
-						blocks = _extract_text_blocks_from_page(
-							path, page, i, do_ocr=do_ocr, force_ocr=force_ocr
-						)
-						pages.append(Page(index=len(pages), text_blocks=blocks))
-			except Exception as e:
-				raise ValueError(f"Failed to open PDF: {path}: {e}") from e
-		elif ext == ".docx":
+	if ocr_engine not in ocr_mod.OCR_ENGINES:
+		raise ValueError(f"Unsupported OCR engine: {ocr_engine}")
+	if ocr_dpi != "auto" and not (isinstance(ocr_dpi, int) and ocr_dpi > 0):
+		raise ValueError(f"Unsupported OCR DPI: {ocr_dpi}")
+	cfg = _VisitConfig(
+		ocr_mode=ocr_mode,
+		ocr_engine=ocr_engine,
+		page_stages=tuple(page_stages),
+		page_cache_dir=page_cache_dir,
+		ocr_prefetch=ocr_prefetch,
+		ocr_regions=ocr_regions,
+		ocr_cache_dir=ocr_cache_dir,
+		ocr_dpi=ocr_dpi,
+		ocr_tile_pixels=ocr_tile_pixels,
+	)
+	owned: List[inputs_mod.InputDocument] = []
+	try:
+		if align_sources:
+			# the pre-pass and the load share one buffer per input
+			srcs = list(paths)
+			paths = inputs_mod.as_inputs(srcs)
+			owned = [doc for doc, src in zip(paths, srcs) if doc is not src]
+			cfg = replace(cfg, alignment=align_mod.align_sources(paths))
+		pages = _iter_source_pages(paths, cfg, workers)
+		if fuse_sources:
+			pages = fuse_mod.SpanFuser().fuse(pages)
+		yield from pages
+	finally:
+		for doc in owned:
+			doc.close()
+
+
+def _iter_source_pages(paths: Iterable[inputs_mod.InputLike], cfg: _VisitConfig, workers: int) -> Iterator[Page]:
+	"""
+	The page stream of iter_pages: every source in order, PDFs sharded across workers when > 1.
+	"""
+	next_index = 0
+	executor: Optional[ProcessPoolExecutor] = None
+	try:
+		for i, src in enumerate(paths):
+			source = inputs_mod.open_input(src, i)
+			path = source.name
 			try:
-				docx = DocxDocument(path)
-			except Exception as e:
-				raise ValueError(f"Failed to open DOCX: {path}: {e}") from e
-			texts = []
-			for para in docx.paragraphs:
-				txt = para.text.strip()
-				if txt:
-					texts.append(txt)
-			blocks = [TextSpan(text=t, span=SourceSpan(page_index=None, source_path=path)) for t in texts]
-			# Pack all DOCX content into a synthetic page
-			pages.append(Page(index=len(pages), text_blocks=blocks))
-		else:
-			raise ValueError(f"Unsupported file type: {ext}")
-
-	return DocumentModel(sources=collected_sources, pages=pages)
+				if source.ext == ".pdf":
+					# Ensure Tesseract presence when local OCR is requested (do not wrap into ValueError)
+					if cfg.ocr_mode == "local":
+						if cfg.ocr_engine == "tesserocr" and not ocr_mod.tesserocr_available():
+							raise RuntimeError(
+								"tesserocr or its 'eng' language data is not available but ocr_engine='tesserocr' was requested"
+							)
+						if cfg.ocr_engine == "pytesseract" and not ocr_mod.tesseract_available():
+							raise RuntimeError("Tesseract is not available but ocr_mode='local' was requested")
+					try:
+						with source.open_pdf() as doc:
+							page_count = doc.page_count
+							# in-memory inputs have no path for workers to open: they load in-process
+							if workers <= 1 or page_count < 2 or source.path is None:
+								for page in _iter_pdf_pages(path, doc, 0, page_count, next_index, cfg):
+									yield page
+									next_index += 1
+								continue
+						if executor is None:
+							executor = ProcessPoolExecutor(max_workers=workers)
+						pending: Deque[Future] = deque()
+						for start, stop in _shard_ranges(page_count, workers):
+							pending.append(
+								executor.submit(_extract_pdf_page_range, path, start, stop, next_index + start, cfg)
+							)
+							if len(pending) >= workers * 2:
+								yield from pending.popleft().result()
+						while pending:
+							yield from pending.popleft().result()
+						next_index += page_count
+					except Exception as e:
+						raise ValueError(f"Failed to open PDF: {path}: {e}") from e
+				elif source.ext == ".docx":
+					try:
+						docx = DocxDocument(source.open_stream())
+					except Exception as e:
+						raise ValueError(f"Failed to open DOCX: {path}: {e}") from e
+					texts = []
+					for para in docx.paragraphs:
+						txt = para.text.strip()
+						if txt:
+							texts.append(txt)
+					blocks = [TextSpan(text=t, span=SourceSpan(page_index=None, source_path=path)) for t in texts]
+					# Pack all DOCX content into a synthetic page
+					yield Page(index=next_index, text_blocks=blocks, kind="native")
+					next_index += 1
+				else:
+					raise ValueError(f"Unsupported file type: {source.ext}")
+			finally:
+				if source is not src:
+					source.close()
+	finally:
+		if executor is not None:
+			executor.shutdown(cancel_futures=True)
 
 
+def load_pdf_or_docx(
+	paths: Sequence[inputs_mod.InputLike],
+	ocr_mode: str = "auto",
+	workers: int = 1,
+	page_stages: Sequence[PageStage] = (),
+	page_cache_dir: Optional[str] = None,
+	ocr_engine: str = "pytesseract",
+	ocr_prefetch: int = 0,
+	ocr_regions: bool = False,
+	ocr_cache_dir: Optional[str] = None,
+	ocr_dpi: Union[int, str] = 300,
+	ocr_tile_pixels: int = 0,
+	align_sources: bool = False,
+	fuse_sources: bool = False,
+) -> DocumentModel:
+	"""
+	Load one or more sources (PDF/DOCX), returning a single fused DocumentModel with per-page text spans.
+	See iter_pages for the arguments; this collects every page into memory.
+	"""
+	sources = inputs_mod.as_inputs(paths)
+	try:
+		pages = list(
+			iter_pages(
+				sources,
+				ocr_mode=ocr_mode,
+				workers=workers,
+				page_stages=page_stages,
+				page_cache_dir=page_cache_dir,
+				ocr_engine=ocr_engine,
+				ocr_prefetch=ocr_prefetch,
+				ocr_regions=ocr_regions,
+				ocr_cache_dir=ocr_cache_dir,
+				ocr_dpi=ocr_dpi,
+				ocr_tile_pixels=ocr_tile_pixels,
+				align_sources=align_sources,
+				fuse_sources=fuse_sources,
+			)
+		)
+	finally:
+		for src, doc in zip(paths, sources):
+			if doc is not src:
+				doc.close()
+	return DocumentModel(sources=[doc.name for doc in sources], pages=pages)
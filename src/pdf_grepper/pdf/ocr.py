@@ -1,19 +1,39 @@
 from __future__ import annotations
 
+import atexit
+import functools
+import hashlib
+import multiprocessing
 import os
-from typing import Optional
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple, Union
 
 import pytesseract
 from PIL import Image
 
+from pdf_grepper import cache as cache_mod
+
+try:
+	import tesserocr  # type: ignore
+except Exception:  # pragma: no cover - optional
+	tesserocr = None  # type: ignore
+
+# "pytesseract": one tesseract subprocess per image (default).
+# "tesserocr": persistent in-memory Tesseract workers, see TesseractPool.
+OCR_ENGINES = ("pytesseract", "tesserocr")
+
+TESSERACT_CONFIG = "--oem 1 --psm 3"
+OCR_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
 
 def ocr_image_to_text(image: Image.Image, lang: str = "eng") -> Optional[str]:
 	"""
 	Run local Tesseract OCR on a PIL image. Requires tesseract in PATH.
 	"""
 	try:
-		config = "--oem 1 --psm 3"
-		text = pytesseract.image_to_string(image, lang=lang, config=config)
+		text = pytesseract.image_to_string(image, lang=lang, config=TESSERACT_CONFIG)
 		return text
 	except Exception:
 		return None
@@ -30,3 +50,251 @@ def tesseract_available() -> bool:
 		return False
 
 
+def tesserocr_available(lang: str = "eng") -> bool:
+	"""
+	Check if the tesserocr bindings (libtesseract) are importable and find language data for lang,
+	so a pool whose workers could not initialise is never started.
+	"""
+	return tesserocr is not None and lang in _tesserocr_languages()
+
+
+@functools.lru_cache(maxsize=None)
+def _tesserocr_languages() -> Tuple[str, ...]:
+	try:
+		return tuple(tesserocr.get_languages()[1])
+	except Exception:
+		return ()
+
+
+# Per-process Tesseract handle of a pool worker; created once by the pool initializer.
+_worker_api = None
+
+
+def _init_pool_worker(lang: str) -> None:
+	global _worker_api
+	# Same settings as the pytesseract path: LSTM engine (--oem 1), automatic segmentation (--psm 3)
+	_worker_api = tesserocr.PyTessBaseAPI(lang=lang, oem=tesserocr.OEM.LSTM_ONLY, psm=tesserocr.PSM.AUTO)
+
+
+def _pool_recognize(mode: str, size: Tuple[int, int], data: bytes, dpi: Optional[int] = None) -> Optional[str]:
+	"""
+	Worker task: rebuild the image from its raw pixel buffer (no temp file) and recognise it with
+	the worker's already-initialised Tesseract handle. dpi is the render resolution, which the
+	pytesseract path passes along in the image file it writes.
+	"""
+	try:
+		_worker_api.SetImage(Image.frombytes(mode, size, data))
+		if dpi:
+			_worker_api.SetSourceResolution(dpi)
+		return _worker_api.GetUTF8Text()
+	except Exception:
+		return None
+
+
+class TesseractPool:
+	"""
+	Long-lived Tesseract workers (one per core by default) fed through the executor's call queue.
+
+	Each worker loads the language data once; images are handed over as raw pixel buffers, so there
+	is no per-page process spawn, temp image or traineddata reload as with pytesseract.
+	"""
+
+	def __init__(self, lang: str = "eng", workers: Optional[int] = None):
+		if tesserocr is None:
+			raise RuntimeError("tesserocr is not installed; install pdf-grepper[tesserocr] or use the pytesseract engine")
+		self.lang = lang
+		self.workers = workers or os.cpu_count() or 1
+		self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_pool_worker, initargs=(lang,))
+
+	def submit(self, image: Image.Image) -> "Future[Optional[str]]":
+		dpi = image.info.get("dpi")
+		return self._executor.submit(
+			_pool_recognize, image.mode, image.size, image.tobytes(), int(round(dpi[0])) if dpi else None
+		)
+
+	def recognize(self, image: Image.Image) -> Optional[str]:
+		return self.submit(image).result()
+
+	def shutdown(self) -> None:
+		self._executor.shutdown(cancel_futures=True)
+
+
+_pool: Optional[TesseractPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(lang: str = "eng") -> TesseractPool:
+	"""
+	Process-wide TesseractPool, started on first use. Inside a worker process (e.g. page-parallel
+	ingestion) the pool is a single worker so the machine is not oversubscribed.
+	"""
+	global _pool
+	with _pool_lock:
+		if _pool is None or _pool.lang != lang:
+			if _pool is not None:
+				_pool.shutdown()
+				atexit.unregister(_pool.shutdown)
+			workers = 1 if multiprocessing.parent_process() is not None else None
+			_pool = TesseractPool(lang=lang, workers=workers)
+			atexit.register(_pool.shutdown)
+		return _pool
+
+
+# Rows per chunk when hashing an image without a shared pixel buffer
+_HASH_BAND_ROWS = 256
+
+
+def _pixel_chunks(image: Image.Image) -> Iterator[Union[bytes, memoryview]]:
+	"""
+	The image's pixel bytes, row-major and unpadded, without copying the whole bitmap: images
+	rendered by the loader expose their pixmap's sample buffer (see loader._render_for_ocr), others
+	are read a band of rows at a time.
+	"""
+	pix = getattr(image, "_pixmap", None)
+	if pix is not None and pix.stride == pix.width * pix.n and image.size == (pix.width, pix.height):
+		yield pix.samples_mv
+		return
+	width, height = image.size
+	for top in range(0, height, _HASH_BAND_ROWS):
+		yield image.crop((0, top, width, min(height, top + _HASH_BAND_ROWS))).tobytes()
+
+
+class OcrCache:
+	"""
+	Persistent OCR results keyed on the rendered pixel buffer plus DPI, language, Tesseract config
+	and engine, so identical page images (re-runs, cover pages, standard forms shared across documents)
+	are recognised once. Size-capped: entries are evicted least recently used first.
+	"""
+
+	def __init__(self, directory: str, max_bytes: int = OCR_CACHE_MAX_BYTES):
+		self.directory = directory
+		self.max_bytes = max_bytes
+		self._lock = threading.Lock()
+		os.makedirs(directory, exist_ok=True)
+		self._size = cache_mod.directory_size(directory)
+
+	@staticmethod
+	def key(image: Image.Image, lang: str = "eng", config: str = TESSERACT_CONFIG, engine: str = "pytesseract") -> str:
+		# engines differ in whitespace and trailing form feeds: their results are not interchangeable
+		h = hashlib.sha256()
+		h.update(repr((image.mode, image.size, image.info.get("dpi"), lang, config, engine)).encode())
+		for chunk in _pixel_chunks(image):
+			h.update(chunk)
+		return h.hexdigest()
+
+	def _path(self, key: str) -> str:
+		return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+	def get(self, key: str) -> Optional[str]:
+		path = self._path(key)
+		try:
+			with open(path, "r", encoding="utf-8") as f:
+				text = f.read()
+		except OSError:
+			return None
+		cache_mod.touch(path)
+		return text
+
+	def put(self, key: str, text: str) -> None:
+		path = self._path(key)
+		payload = text.encode("utf-8")
+		try:
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+			cache_mod.write_atomic(path, text)
+		except OSError:
+			return
+		with self._lock:
+			self._size += len(payload)
+			if self._size > self.max_bytes:
+				self._size = cache_mod.evict_lru(self.directory, self.max_bytes)
+
+
+_ocr_caches: dict = {}
+_ocr_caches_lock = threading.Lock()
+
+
+def get_ocr_cache(directory: str) -> OcrCache:
+	"""
+	Per-process OcrCache for a directory (keeps its running size between calls).
+	"""
+	with _ocr_caches_lock:
+		if directory not in _ocr_caches:
+			_ocr_caches[directory] = OcrCache(directory)
+		return _ocr_caches[directory]
+
+
+def recognize(image: Image.Image, engine: str = "pytesseract", cache_dir: Optional[str] = None) -> Optional[str]:
+	"""
+	OCR one image with the selected engine (see OCR_ENGINES), consulting the OCR result cache
+	under cache_dir first when one is given.
+	"""
+	# Without the bindings tesserocr falls back to pytesseract (local mode refuses to start instead)
+	if engine == "tesserocr" and not tesserocr_available():
+		engine = "pytesseract"
+	cache = get_ocr_cache(cache_dir) if cache_dir else None
+	key = cache.key(image, engine=engine) if cache is not None else None
+	if cache is not None:
+		text = cache.get(key)
+		if text is not None:
+			return text
+	if engine == "tesserocr":
+		text = get_pool().recognize(image)
+	else:
+		text = ocr_image_to_text(image)
+	# Failures (None) are not cached so they are retried on the next run
+	if cache is not None and text is not None:
+		cache.put(key, text)
+	return text
+
+
+class OcrPipeline:
+	"""
+	Overlaps page rasterisation with recognition: the caller's thread renders images (MuPDF is not
+	thread-safe) into a queue drained by OCR consumer threads. A semaphore bounds how many rendered
+	bitmaps exist at once (queued or being recognised); submit() blocks when the bound is reached.
+	"""
+
+	def __init__(
+		self, depth: int, engine: str = "pytesseract", consumers: Optional[int] = None, cache_dir: Optional[str] = None
+	):
+		self.engine = engine
+		self.cache_dir = cache_dir
+		self._slots = threading.BoundedSemaphore(max(1, depth))
+		self._queue: "queue.Queue[Optional[Tuple[Image.Image, Future]]]" = queue.Queue()
+		self._threads: List[threading.Thread] = []
+		for _ in range(consumers or os.cpu_count() or 1):
+			t = threading.Thread(target=self._consume, name="pdf-grepper-ocr", daemon=True)
+			t.start()
+			self._threads.append(t)
+
+	def submit(self, render: Callable[[], Image.Image]) -> "Future[Optional[str]]":
+		fut: "Future[Optional[str]]" = Future()
+		self._slots.acquire()
+		try:
+			image = render()
+		except Exception:
+			self._slots.release()
+			fut.set_result(None)
+			return fut
+		self._queue.put((image, fut))
+		return fut
+
+	def _consume(self) -> None:
+		while True:
+			item = self._queue.get()
+			if item is None:
+				return
+			image, fut = item
+			try:
+				text = recognize(image, engine=self.engine, cache_dir=self.cache_dir)
+			except Exception:
+				text = None
+			del image, item
+			self._slots.release()
+			fut.set_result(text)
+
+	def close(self) -> None:
+		for _ in self._threads:
+			self._queue.put(None)
+		for t in self._threads:
+			t.join()
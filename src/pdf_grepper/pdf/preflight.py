@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import fitz  # PyMuPDF
+
+# Page kinds, from cheapest to most expensive to process
+PAGE_KINDS = ("blank", "native", "scanned", "vector", "mixed")
+
+# Content-stream operator tokens: BT opens a text object; S/s/f/F/f*/B/B*/b/b* paint a path
+# (clip-only paths end in "n" and paint nothing). Operators are delimited by whitespace or delimiters.
+_TEXT_OP = re.compile(rb"(?<![^\s)>\]}])BT(?![^\s(<\[{/%])")
+_PAINT_OP = re.compile(rb"(?<![^\s)>\]}])(?:[SsfFBb]\*?)(?![^\s(<\[{/%])")
+
+# Images covering at least this fraction of the page make an image-only page a scan
+SCAN_COVERAGE = 0.5
+
+_REF = re.compile(r"(\d+) 0 R")
+
+
+@dataclass(frozen=True)
+class PageProfile:
+	"""Cheap pre-flight signals for one page and the resulting kind (see classify)."""
+
+	kind: str
+	content_bytes: int
+	has_text: bool
+	painted_paths: int
+	image_count: int
+	image_coverage: float
+
+
+def appearance_xrefs(page: fitz.Page) -> List[Tuple[int, int, List[int]]]:
+	"""
+	(xref, annotation type, normal appearance stream xrefs) of every annotation and form widget
+	on the page; a widget with on/off states (check box, radio button) has one stream per state.
+	"""
+	if page.first_annot is None and page.first_widget is None:
+		return []
+	doc = page.parent
+	found = []
+	for xref, annot_type, _ in page.annot_xrefs():
+		kind, value = doc.xref_get_key(xref, "AP/N")
+		streams = [int(n) for n in _REF.findall(value)] if kind in ("xref", "dict") else []
+		found.append((xref, annot_type, streams))
+	return found
+
+
+def profile_page(page: fitz.Page) -> PageProfile:
+	"""
+	Profile a page from its decoded content and form streams, annotation and widget appearance
+	streams plus image placements, without extracting text, rendering or building drawings.
+	"""
+	doc = page.parent
+	streams = [doc.xref_stream(xref) or b"" for xref in page.get_contents()]
+	streams.extend(doc.xref_stream(xobj[0]) or b"" for xobj in page.get_xobjects())
+	# Annotation and widget text (notes, filled form fields) lives in their appearance streams;
+	# a widget without one (viewer-generated appearance) still counts as text
+	has_text = False
+	for _, annot_type, aps in appearance_xrefs(page):
+		streams.extend(doc.xref_stream(xref) or b"" for xref in aps)
+		has_text = has_text or (not aps and annot_type == fitz.PDF_ANNOT_WIDGET)
+	has_text = has_text or any(_TEXT_OP.search(s) for s in streams)
+	painted = sum(len(_PAINT_OP.findall(s)) for s in streams)
+	images = 0
+	covered = 0.0
+	if page.get_images() or any(b"BI" in s for s in streams):
+		try:
+			for info in page.get_image_info():
+				rect = fitz.Rect(info["bbox"]) & page.rect
+				if not rect.is_empty:
+					images += 1
+					covered += rect.get_area()
+		except Exception:
+			pass
+	area = page.rect.get_area()
+	coverage = min(1.0, covered / area) if area > 0 else 0.0
+	return PageProfile(
+		kind=classify(has_text, painted, images, coverage),
+		content_bytes=sum(len(s) for s in streams),
+		has_text=has_text,
+		painted_paths=painted,
+		image_count=images,
+		image_coverage=coverage,
+	)
+
+
+def classify(has_text: bool, painted_paths: int, image_count: int, image_coverage: float) -> str:
+	"""
+	blank: nothing painted; native: text only; scanned: images covering most of the page and
+	nothing else; vector: painted paths (rules, boxes, diagrams), possibly with text, no images;
+	mixed: everything else.
+	"""
+	if not image_count:
+		if painted_paths:
+			return "vector"
+		return "native" if has_text else "blank"
+	if not has_text and not painted_paths and image_coverage >= SCAN_COVERAGE:
+		return "scanned"
+	return "mixed"
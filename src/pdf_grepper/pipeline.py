@@ -1,35 +1,38 @@
 from __future__ import annotations
 
-from dataclasses import asdict, replace
-from typing import Iterable, List, Optional, Tuple
+from dataclasses import asdict
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 import hashlib
 import json
 import logging
+import math
 import os
 import random
+import shutil
 
 from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
 
+from pdf_grepper import inputs as inputs_mod
+from pdf_grepper import cache as cache_mod
+from pdf_grepper.cache import NER_MEMO_FILE, FingerprintIndex, layer_path, model_from_dict, read_layer, write_layer
 from pdf_grepper.dimensions.discover import discover_dimensions
 from pdf_grepper.diagrams.extract import extract_diagram_primitives
 from pdf_grepper.diagrams.interpret import interpret_diagram
 from pdf_grepper.ie.entities import extract_entities
+from pdf_grepper.ie.gazetteer import Gazetteer
+from pdf_grepper.ie.memo import NerMemo
 from pdf_grepper.ie.relations import extract_relations
 from pdf_grepper.ie.stakeholders import extract_stakeholders
-from pdf_grepper.ontology.export_ttl import export_turtle
+from pdf_grepper.ontology.export_ttl import TurtleStreamWriter, export_turtle
+from pdf_grepper.pdf.boilerplate import BoilerplateDetector
 from pdf_grepper.pdf.layout import consolidate_text
-from pdf_grepper.pdf.loader import load_pdf_or_docx
+from pdf_grepper.pdf.loader import iter_pages, load_pdf_or_docx
 from pdf_grepper.types import (
 	DocumentModel,
 	Page,
 	SourceSpan,
-	TextSpan,
 	Entity,
-	Relation,
-	StakeholderPerspective,
-	Dimension,
-	DiagramNode,
-	DiagramEdge,
 )
 
 try:
@@ -44,11 +47,46 @@ def _collect_text_spans(pages: List[Page]) -> List[Tuple[str, Optional[SourceSpa
 	texts: List[Tuple[str, Optional[SourceSpan]]] = []
 	for p in pages:
 		for ts in p.text_blocks:
-			if ts.text and ts.text.strip():
+			if ts.text and ts.text.strip() and not ts.boilerplate:
 				texts.append((ts.text.strip(), ts.span))
 	return texts
 
 
+def _with_gazetteer(
+	gazetteer: Optional[Gazetteer], texts: List[Tuple[str, Optional[SourceSpan]]], entities: List[Entity]
+) -> List[Entity]:
+	"""Dictionary entities first, then the extracted ones whose text no dictionary entity has."""
+	if gazetteer is None:
+		return entities
+	found = gazetteer.extract(texts)
+	seen = {e.text.lower().strip() for e in found}
+	return found + [e for e in entities if e.text.lower().strip() not in seen]
+
+
+def _diagram_stage(doc_path: str, page_obj, page: Page) -> None:
+	"""
+	Loader page stage: diagram primitives (best-effort) from the page already open for text extraction.
+	"""
+	try:
+		extract_diagram_primitives(doc_path, page_obj, page)
+		interpret_diagram(page)
+	except Exception:
+		logger.warning("diagram_processing_error", exc_info=True)
+
+
+# Pages without painted paths yield no diagram primitives
+_diagram_stage.page_kinds = ("vector", "mixed")  # type: ignore[attr-defined]
+
+
+def _domain_vectorizer(**kwargs) -> TfidfVectorizer:
+	return TfidfVectorizer(
+		stop_words="english",
+		ngram_range=(1, 2),
+		token_pattern=r"(?u)\b[a-zA-Z][a-zA-Z0-9\-]+\b",
+		**kwargs,
+	)
+
+
 def _infer_domain_labels(pages: List[Page], top_k: int = 8) -> List[str]:
 	docs = []
 	for p in pages:
@@ -56,12 +94,7 @@ def _infer_domain_labels(pages: List[Page], top_k: int = 8) -> List[str]:
 	if not docs:
 		return []
 	try:
-		tf = TfidfVectorizer(
-			max_features=256,
-			stop_words="english",
-			ngram_range=(1, 2),
-			token_pattern=r"(?u)\b[a-zA-Z][a-zA-Z0-9\-]+\b",
-		)
+		tf = _domain_vectorizer(max_features=256)
 		X = tf.fit_transform(docs)
 		terms = tf.get_feature_names_out()
 		scores = X.sum(axis=0).A1
@@ -71,118 +104,107 @@ def _infer_domain_labels(pages: List[Page], top_k: int = 8) -> List[str]:
 		return []
 
 
-def _hash_file(path: str) -> str:
-	h = hashlib.sha256()
-	with open(path, "rb") as f:
-		for chunk in iter(lambda: f.read(65536), b""):
-			h.update(chunk)
-	return h.hexdigest()
-
-
-def _cache_key(
-	input_paths: List[str], ocr_mode: str, use_cloud: List[str], enrich_web: bool, offline: bool, base_uri: str
+class _StreamingDomainScores:
+	"""
+	Incremental approximation of _infer_domain_labels for streaming runs.
+
+	Keeps per-term statistics (memory proportional to the vocabulary, not the document):
+	summed L2-normalised term frequencies, document frequency and raw counts. idf is applied
+	at the end; the only deviation from the batch TF-IDF is that per-document norms ignore idf.
+	"""
+
+	def __init__(self, max_features: int = 256):
+		self.max_features = max_features
+		self._analyze = _domain_vectorizer().build_analyzer()
+		self._n_docs = 0
+		self._tf_sum: Counter = Counter()
+		self._df: Counter = Counter()
+		self._count: Counter = Counter()
+
+	def update(self, pages: Iterable[Page]) -> None:
+		for p in pages:
+			for doc in consolidate_text(p):
+				counts = Counter(self._analyze(doc))
+				self._n_docs += 1
+				if not counts:
+					continue
+				norm = math.sqrt(sum(c * c for c in counts.values()))
+				for term, c in counts.items():
+					self._tf_sum[term] += c / norm
+					self._df[term] += 1
+					self._count[term] += c
+
+	def top(self, top_k: int = 8) -> List[str]:
+		vocab = sorted(self._count.items(), key=lambda x: (-x[1], x[0]))[: self.max_features]
+		n = self._n_docs
+		scored = [
+			(term, self._tf_sum[term] * (math.log((1 + n) / (1 + self._df[term])) + 1.0)) for term, _ in vocab
+		]
+		scored.sort(key=lambda x: x[1], reverse=True)
+		return [w for w, _ in scored[:top_k]]
+
+
+def _windows(pages: Iterable[Page], size: int) -> Iterator[List[Page]]:
+	window: List[Page] = []
+	for p in pages:
+		window.append(p)
+		if len(window) >= size:
+			yield window
+			window = []
+	if window:
+		yield window
+
+
+def _inputs_digest(
+	sources: List[inputs_mod.InputDocument],
+	hash_algo: str = "sha256",
+	index: Optional[FingerprintIndex] = None,
 ) -> str:
+	"""
+	Digest of all input contents. With an index, files whose (size, mtime, inode) are unchanged
+	since they were last hashed reuse the recorded digest instead of being read again.
+	"""
 	h = hashlib.sha256()
-	for p in sorted(input_paths):
-		h.update(_hash_file(p).encode())
-	cfg = json.dumps(
-		{"ocr": ocr_mode, "cloud": sorted(use_cloud), "enrich": enrich_web, "offline": offline, "base_uri": base_uri},
-		sort_keys=True,
-	).encode()
-	h.update(cfg)
+	for doc in sorted(sources, key=lambda d: d.name):
+		digest = None
+		if index is not None and doc.path and doc.stat:
+			digest = index.lookup(doc.path, doc.stat, hash_algo)
+		if digest is None:
+			digest = doc.digest(hash_algo)
+			if index is not None and doc.path and doc.stat:
+				index.record(doc.path, doc.stat, hash_algo, digest)
+		h.update(f"{hash_algo}:{digest}".encode())
 	return h.hexdigest()
 
 
-def _span_from_dict(d: Optional[dict]) -> Optional[SourceSpan]:
-	if not d:
-		return None
-	return SourceSpan(
-		page_index=d.get("page_index"),
-		bbox=tuple(d["bbox"]) if d.get("bbox") else None,
-		source_path=d.get("source_path"),
-		note=d.get("note"),
-	)
-
+def _layer_key(*parts) -> str:
+	return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def _stage_keys(
+	inputs_digest: str,
+	ingest_settings: Dict[str, object],
+	use_cloud: List[str],
+	enrich_web: bool,
+	offline: bool,
+	base_uri: str,
+	gazetteer: str = "",
+) -> Dict[str, str]:
+	"""
+	One cache key per pipeline layer, each derived only from the inputs that layer depends on:
+	ingest (incl. diagram primitives, extracted in the same page pass) <- files + OCR settings;
+	ie (entities, relations, stakeholders, dimensions) <- ingest + active cloud adapters + gazetteer;
+	domain <- ingest + web enrichment; export <- ie + domain + base_uri.
+	"""
+	ingest = _layer_key("ingest", inputs_digest, ingest_settings, ["diagrams"])
+	ie = _layer_key("ie", ingest, [] if offline else sorted(use_cloud), gazetteer)
+	domain = _layer_key("domain", ingest, enrich_web and not offline)
+	export = _layer_key("export", ie, domain, base_uri)
+	return {"ingest": ingest, "ie": ie, "domain": domain, "export": export}
 
-def _page_from_dict(d: dict) -> Page:
-	page = Page(index=d["index"])
-	for ts in d.get("text_blocks", []):
-		page.text_blocks.append(
-			TextSpan(text=ts["text"], span=_span_from_dict(ts.get("span")), confidence=ts.get("confidence"))
-		)
-	for n in d.get("diagram_nodes", []):
-		page.diagram_nodes.append(
-			DiagramNode(id=n["id"], label=n.get("label"), span=_span_from_dict(n.get("span")), kind=n.get("kind"))
-		)
-	for e in d.get("diagram_edges", []):
-		page.diagram_edges.append(
-			DiagramEdge(
-				id=e["id"],
-				source=e["source"],
-				target=e["target"],
-				label=e.get("label"),
-				span=_span_from_dict(e.get("span")),
-				directed=bool(e.get("directed", True)),
-			)
-		)
-	return page
-
-
-def _model_from_dict(d: dict) -> DocumentModel:
-	model = DocumentModel(
-		sources=list(d.get("sources", [])),
-		title=d.get("title"),
-		pages=[_page_from_dict(p) for p in d.get("pages", [])],
-		entities=[
-			Entity(
-				id=e["id"],
-				text=e["text"],
-				label=e["label"],
-				span=_span_from_dict(e.get("span")),
-				confidence=e.get("confidence"),
-				domain_type=e.get("domain_type"),
-			)
-			for e in d.get("entities", [])
-		],
-		relations=[
-			Relation(
-				id=r["id"],
-				subject_id=r["subject_id"],
-				predicate=r["predicate"],
-				object_id=r["object_id"],
-				span=_span_from_dict(r.get("span")),
-				confidence=r.get("confidence"),
-			)
-			for r in d.get("relations", [])
-		],
-		stakeholders=[
-			StakeholderPerspective(
-				id=s["id"],
-				actor=s["actor"],
-				claim=s["claim"],
-				span=_span_from_dict(s.get("span")),
-				confidence=s.get("confidence"),
-			)
-			for s in d.get("stakeholders", [])
-		],
-		dimensions=[
-			Dimension(
-				id=dm["id"],
-				name=dm["name"],
-				value=dm.get("value"),
-				unit=dm.get("unit"),
-				span=_span_from_dict(dm.get("span")),
-				confidence=dm.get("confidence"),
-			)
-			for dm in d.get("dimensions", [])
-		],
-		domain_labels=list(d.get("domain_labels", [])),
-		extra_metadata=dict(d.get("extra_metadata", {})),
-	)
-	return model
 
 def run_pipeline(
-	input_paths: List[str],
+	input_paths: Sequence[inputs_mod.InputLike],
 	ttl_out: str,
 	json_out: Optional[str] = None,
 	ocr_mode: str = "auto",
@@ -191,120 +213,376 @@ def run_pipeline(
 	offline: bool = False,
 	base_uri: str = "http://example.org/pdf-grepper/",
 	cache_dir: Optional[str] = None,
+	workers: int = 1,
+	stream_window: int = 0,
+	ocr_engine: str = "pytesseract",
+	ocr_prefetch: int = 0,
+	ocr_regions: bool = False,
+	ocr_dpi: Union[int, str] = 300,
+	ocr_tile_pixels: int = 0,
+	align_sources: bool = False,
+	fuse_sources: bool = False,
+	skip_boilerplate: bool = False,
+	hash_algo: str = "sha256",
+	cache_max_bytes: int = cache_mod.CACHE_MAX_BYTES,
+	cache_max_age_days: float = cache_mod.CACHE_MAX_AGE_DAYS,
+	ner_processes: int = 1,
+	gazetteers: Sequence[str] = (),
 ) -> DocumentModel:
-	use_cloud = use_cloud or []
-	# Determinism in offline mode
-	if offline:
-		try:
-			os.environ["PYTHONHASHSEED"] = "0"
-		except Exception:
-			pass
-		random.seed(0)
-		if _np is not None:
+	"""
+	Ingest -> diagrams -> IE -> dimensions -> domain inference -> export.
+
+	input_paths: file paths, bytes, binary file objects or InputDocuments; each is read once and the
+	same buffer is hashed for the cache key and parsed.
+	stream_window: when > 0, pages flow through the stages as a generator in windows of this many
+	pages and are dropped once exported (see _run_streaming), so peak memory follows the window,
+	not the document. The returned model then carries no pages; only the page cache is used.
+	ocr_engine: "pytesseract" | "tesserocr" (persistent Tesseract worker pool).
+	ocr_prefetch: when > 0, overlap page rendering and OCR, holding at most this many rendered pages.
+	ocr_regions: OCR only image regions lacking vector text instead of whole pages.
+	ocr_dpi: OCR render resolution, or "auto" to pick one per page from text height and scan resolution.
+	ocr_tile_pixels: when > 0, OCR oversized pages as overlapping tiles of at most this many pixels.
+	align_sources: align pages across PDF sources and skip OCR of scans matching a native-text page.
+	fuse_sources: keep one canonical span per block repeated across sources (alt_spans hold the rest).
+	Not supported with stream_window: fusion can still change pages that were already exported.
+	skip_boilerplate: flag running headers/footers/page numbers (see BoilerplateDetector); IE and
+	domain inference skip them and the Turtle export keeps their first occurrence only.
+	hash_algo: content digest behind the cache keys, "sha256" or "xxh3_128" (see HASH_ALGOS). Digests of
+	unchanged files are kept in <cache_dir>/fingerprints.json, so they are hashed once.
+	cache_max_bytes / cache_max_age_days: cache policy enforced after the run writes (see
+	cache.prune; 0 = unlimited). Hit/miss/byte counters accumulate in <cache_dir>/stats.json.
+	ner_processes: processes for spaCy NER (nlp.pipe n_process); does not change the output.
+	With cache_dir, spaCy NER results are memoised per chunk in <cache_dir>/ner.sqlite (see NerMemo).
+	gazetteers: dictionary files (name[<TAB>label] per line) matched with an Aho-Corasick automaton;
+	their entities take precedence over NER/heuristic ones. The compiled automaton is kept in
+	<cache_dir>/gazetteer.
+	"""
+	if hash_algo not in inputs_mod.HASH_ALGOS:
+		raise ValueError(f"Unsupported hash algorithm: {hash_algo}")
+	if not inputs_mod.hash_available(hash_algo):
+		raise RuntimeError(f"{hash_algo} is not installed; install pdf-grepper[xxhash] or use sha256")
+	if fuse_sources and stream_window > 0:
+		raise ValueError("fuse_sources cannot be combined with stream_window")
+	sources = inputs_mod.as_inputs(input_paths)
+	stats = cache_mod.CacheStats()
+	ner_memo: Optional[NerMemo] = None
+	try:
+		use_cloud = use_cloud or []
+		gazetteer = (
+			Gazetteer.from_files(list(gazetteers), os.path.join(cache_dir, "gazetteer") if cache_dir else None)
+			if gazetteers
+			else None
+		)
+		# Loader options that change what ingestion produces (and so key the ingest cache layer)
+		ingest_settings: Dict[str, object] = {
+			"ocr_mode": ocr_mode,
+			"ocr_engine": ocr_engine,
+			"ocr_regions": ocr_regions,
+			"ocr_dpi": ocr_dpi,
+			"ocr_tile_pixels": ocr_tile_pixels,
+			"align_sources": align_sources,
+			"fuse_sources": fuse_sources,
+		}
+		ingest_kwargs = dict(ingest_settings, workers=workers, ocr_prefetch=ocr_prefetch, page_stages=[_diagram_stage])
+		if cache_dir:
+			ingest_kwargs["page_cache_dir"] = os.path.join(cache_dir, "pages")
+			ingest_kwargs["ocr_cache_dir"] = os.path.join(cache_dir, "ocr")
+			try:
+				ner_memo = NerMemo(os.path.join(cache_dir, NER_MEMO_FILE))
+			except Exception:
+				logger.warning("cache_error", exc_info=True)
+		# Determinism in offline mode
+		if offline:
 			try:
-				_np.random.seed(0)  # type: ignore
+				os.environ["PYTHONHASHSEED"] = "0"
 			except Exception:
 				pass
-	# Cache read
-	if cache_dir:
-		try:
-			os.makedirs(cache_dir, exist_ok=True)
-			key = _cache_key(input_paths, ocr_mode, use_cloud, enrich_web, offline, base_uri)
-			cache_path = os.path.join(cache_dir, f"{key}.json")
-			if os.path.exists(cache_path):
-				with open(cache_path, "r", encoding="utf-8") as f:
-					data = json.load(f)
-				model = _model_from_dict(data)
-				model.extra_metadata["cache"] = "true"
-				# annotate first available span with cache note
-				for p in model.pages:
-					for ts in p.text_blocks:
-						if ts.span:
-							ts.span.note = "cache"
-							break
-					break
-				logger.info("cache_hit key=%s path=%s", key, cache_path)
-				return model
-		except Exception:
-			logger.warning("cache_error", exc_info=True)
-	# 1) Ingest
-	model = load_pdf_or_docx(input_paths, ocr_mode=ocr_mode)
-	logger.info("ingest_done sources=%s pages=%d", input_paths, len(model.pages))
-
-	# 2) Diagram primitives from PDF pages (best-effort)
+			random.seed(0)
+			if _np is not None:
+				try:
+					_np.random.seed(0)  # type: ignore
+				except Exception:
+					pass
+		if stream_window > 0:
+			return _run_streaming(
+				sources,
+				ttl_out,
+				json_out,
+				use_cloud,
+				enrich_web,
+				offline,
+				base_uri,
+				stream_window,
+				ingest_kwargs,
+				skip_boilerplate,
+				ner_processes,
+				ner_memo,
+				gazetteer,
+			)
+		keys: Dict[str, str] = {}
+		if cache_dir:
+			try:
+				os.makedirs(cache_dir, exist_ok=True)
+				fingerprints = FingerprintIndex(os.path.join(cache_dir, cache_mod.FINGERPRINTS_FILE))
+				inputs_digest = _inputs_digest(sources, hash_algo, fingerprints)
+				fingerprints.save()
+				keys = _stage_keys(
+					inputs_digest,
+					dict(ingest_settings, skip_boilerplate=skip_boilerplate),
+					use_cloud,
+					enrich_web,
+					offline,
+					base_uri,
+					gazetteer.digest if gazetteer else "",
+				)
+			except Exception:
+				logger.warning("cache_error", exc_info=True)
+
+		def _cached(layer: str) -> Optional[dict]:
+			if layer not in keys:
+				return None
+			data = read_layer(cache_dir, layer, keys[layer])
+			if data is not None:
+				stats.hits += 1
+				stats.bytes_read += data.nbytes
+			else:
+				stats.misses += 1
+			logger.info("cache_%s layer=%s key=%s", "hit" if data is not None else "miss", layer, keys[layer])
+			return data
+
+		def _store(layer: str, data: dict) -> None:
+			if layer not in keys:
+				return
+			try:
+				stats.bytes_written += write_layer(cache_dir, layer, keys[layer], data)
+				logger.info("cache_write layer=%s key=%s", layer, keys[layer])
+			except Exception:
+				logger.warning("cache_write_error layer=%s", layer, exc_info=True)
+
+		# Export layer: the whole run is reusable, including the serialized Turtle
+		data = _cached("export")
+		ttl_cached = layer_path(cache_dir, "export", keys["export"], ".ttl") if "export" in keys else None
+		if data is not None and ttl_cached and os.path.exists(ttl_cached):
+			cache_mod.touch(ttl_cached)
+			model = model_from_dict(data)
+			model.extra_metadata["cache"] = "true"
+			# annotate first available span with cache note
+			for p in model.pages:
+				for ts in p.text_blocks:
+					if ts.span:
+						ts.span.note = "cache"
+						break
+				break
+			shutil.copyfile(ttl_cached, ttl_out)
+			if json_out:
+				with open(json_out, "w", encoding="utf-8") as f:
+					json.dump(asdict(model), f, ensure_ascii=False, indent=2)
+			logger.info("export_done ttl=%s json=%s", ttl_out, json_out or "")
+			return model
+
+		reused: List[str] = []
+		# 1) Ingest + 2) diagram primitives, in a single pass over each PDF page
+		data = _cached("ingest")
+		if data is not None:
+			model = model_from_dict(data)
+			reused.append("ingest")
+		else:
+			model = load_pdf_or_docx(sources, **ingest_kwargs)
+			if skip_boilerplate:
+				marked = BoilerplateDetector().mark(model.pages)
+				logger.info("boilerplate_done spans=%d", marked)
+			_store("ingest", asdict(model))
+		logger.info("ingest_done sources=%s pages=%d", [doc.name for doc in sources], len(model.pages))
+
+		# 3) Information Extraction + 4) Dimensions discovery
+		data = _cached("ie")
+		if data is not None:
+			ie = model_from_dict(data)
+			entities, relations, stakeholders, dimensions = ie.entities, ie.relations, ie.stakeholders, ie.dimensions
+			reused.append("ie")
+		else:
+			text_spans = _collect_text_spans(model.pages)
+			entities = _with_gazetteer(
+				gazetteer, text_spans, extract_entities(text_spans, n_process=ner_processes, memo=ner_memo)
+			)
+			relations = extract_relations(entities, text_spans)
+			stakeholders = extract_stakeholders(text_spans)
+
+			# Optional cloud refinement (stubs return unchanged)
+			if "openai" in use_cloud and not offline:
+				try:
+					from pdf_grepper.cloud.openai_ie import refine_entities_relations
+
+					entities, rel_refined = refine_entities_relations(entities, text_spans)
+					if rel_refined:
+						relations.extend(rel_refined)
+				except Exception:
+					# Keep local results
+					logger.warning("cloud_refine_error adapter=openai", exc_info=True)
+
+			dimensions = discover_dimensions(text_spans)
+			_store(
+				"ie",
+				{
+					"entities": [asdict(e) for e in entities],
+					"relations": [asdict(r) for r in relations],
+					"stakeholders": [asdict(s) for s in stakeholders],
+					"dimensions": [asdict(d) for d in dimensions],
+				},
+			)
+		logger.info("ie_done entities=%d relations=%d stakeholders=%d", len(entities), len(relations), len(stakeholders))
+
+		# 5) Domain inference (+ optional web enrichment)
+		data = _cached("domain")
+		if data is not None:
+			domain_labels = list(data.get("domain_labels", []))
+			model.extra_metadata.update(data.get("extra_metadata", {}))
+			reused.append("domain")
+		else:
+			domain_labels = _infer_domain_labels(model.pages)
+			domain_meta: Dict[str, str] = {}
+			if enrich_web and not offline and domain_labels:
+				try:
+					from pdf_grepper.enrich.web_search import enrich_terms
+
+					enrichment = enrich_terms(domain_labels, offline=False)
+					# Attach simple counts as metadata
+					domain_meta["enrichment_counts"] = str({k: len(v) for k, v in enrichment.items()})
+					logger.info("enrich_done terms=%d", len(domain_labels))
+				except Exception:
+					logger.warning("enrich_error", exc_info=True)
+			model.extra_metadata.update(domain_meta)
+			_store("domain", {"domain_labels": domain_labels, "extra_metadata": domain_meta})
+
+		# 6) Assemble model
+		model.entities = entities
+		model.relations = relations
+		model.stakeholders = stakeholders
+		model.dimensions = dimensions
+		model.domain_labels = domain_labels
+		if reused:
+			model.extra_metadata["cache_layers"] = ",".join(reused)
+
+		# 7) Export
+		export_turtle(model, ttl_path=ttl_out, base_uri=base_uri)
+		if json_out:
+			with open(json_out, "w", encoding="utf-8") as f:
+				json.dump(asdict(model), f, ensure_ascii=False, indent=2)
+		logger.info("export_done ttl=%s json=%s", ttl_out, json_out or "")
+		if ttl_cached:
+			try:
+				_store("export", asdict(model))
+				shutil.copyfile(ttl_out, ttl_cached)
+				stats.bytes_written += os.path.getsize(ttl_cached)
+			except Exception:
+				logger.warning("cache_write_error layer=export", exc_info=True)
+
+		return model
+	finally:
+		for src, doc in zip(input_paths, sources):
+			if doc is not src:
+				doc.close()
+		if ner_memo is not None:
+			logger.info("ner_memo hits=%d misses=%d", ner_memo.hits, ner_memo.misses)
+			ner_memo.close()
+		if cache_dir:
+			_finish_cache(cache_dir, stats, cache_max_bytes, cache_max_age_days)
+
+
+def _finish_cache(cache_dir: str, stats: cache_mod.CacheStats, max_bytes: int, max_age_days: float) -> None:
+	"""Enforce the size/age policy (the run may have written layers, pages and OCR results) and record stats."""
 	try:
-		import fitz
-
-		for src in input_paths:
-			if not src.lower().endswith(".pdf"):
-				continue
-			with fitz.open(src) as doc:
-				for i, page_obj in enumerate(doc):
-					if i < len(model.pages):
-						extract_diagram_primitives(src, page_obj, model.pages[i])
-						interpret_diagram(model.pages[i])
+		remaining, stats.evicted = cache_mod.prune(cache_dir, max_bytes, max_age_days)
+		cache_mod.record_stats(cache_dir, stats)
+		logger.info(
+			"cache_done hits=%d misses=%d bytes_written=%d evicted=%d size=%d",
+			stats.hits,
+			stats.misses,
+			stats.bytes_written,
+			stats.evicted,
+			remaining,
+		)
 	except Exception:
-		logger.warning("diagram_processing_error", exc_info=True)
+		logger.warning("cache_error", exc_info=True)
+
+
+def _run_streaming(
+	sources: List[inputs_mod.InputDocument],
+	ttl_out: str,
+	json_out: Optional[str],
+	use_cloud: List[str],
+	enrich_web: bool,
+	offline: bool,
+	base_uri: str,
+	window: int,
+	ingest_kwargs: dict,
+	skip_boilerplate: bool = False,
+	ner_processes: int = 1,
+	ner_memo: Optional[NerMemo] = None,
+	gazetteer: Optional[Gazetteer] = None,
+) -> DocumentModel:
+	"""
+	Windowed variant of run_pipeline: only findings (entities, relations, ...) and domain term
+	statistics outlive a window. Relations are mined against the entities seen so far, and
+	boilerplate is judged against the pages seen so far.
+	"""
+	model = DocumentModel(sources=[doc.name for doc in sources])
+	entity_index: Dict[str, Entity] = {}
+	domain = _StreamingDomainScores()
+	writer = TurtleStreamWriter(ttl_out, base_uri=base_uri)
+	boilerplate = BoilerplateDetector() if skip_boilerplate else None
+	page_count = 0
+	try:
+		pages = iter_pages(sources, **ingest_kwargs)
+		for batch in _windows(pages, window):
+			if boilerplate is not None:
+				boilerplate.mark(batch)
+			text_spans = _collect_text_spans(batch)
+			entities = _with_gazetteer(
+				gazetteer, text_spans, extract_entities(text_spans, n_process=ner_processes, memo=ner_memo)
+			)
+			if "openai" in use_cloud and not offline:
+				try:
+					from pdf_grepper.cloud.openai_ie import refine_entities_relations
+
+					entities, rel_refined = refine_entities_relations(entities, text_spans)
+					model.relations.extend(rel_refined or [])
+				except Exception:
+					logger.warning("cloud_refine_error adapter=openai", exc_info=True)
+			for e in entities:
+				entity_index.setdefault(e.text.lower().strip(), e)
+			model.relations.extend(extract_relations(list(entity_index.values()), text_spans))
+			model.stakeholders.extend(extract_stakeholders(text_spans))
+			model.dimensions.extend(discover_dimensions(text_spans))
+			domain.update(batch)
+			writer.write_pages(batch)
+			page_count += len(batch)
+			logger.info("window_done pages=%d entities=%d", page_count, len(entity_index))
+		logger.info("ingest_done sources=%s pages=%d", model.sources, page_count)
+
+		model.entities = list(entity_index.values())
+		model.domain_labels = domain.top()
+		logger.info(
+			"ie_done entities=%d relations=%d stakeholders=%d",
+			len(model.entities),
+			len(model.relations),
+			len(model.stakeholders),
+		)
+		if enrich_web and not offline and model.domain_labels:
+			try:
+				from pdf_grepper.enrich.web_search import enrich_terms
 
-	# 3) Information Extraction
-	text_spans = _collect_text_spans(model.pages)
-	entities = extract_entities(text_spans)
-	relations = extract_relations(entities, text_spans)
-	stakeholders = extract_stakeholders(text_spans)
-	logger.info("ie_done entities=%d relations=%d stakeholders=%d", len(entities), len(relations), len(stakeholders))
-
-	# Optional cloud refinement (stubs return unchanged)
-	if "openai" in use_cloud and not offline:
-		try:
-			from pdf_grepper.cloud.openai_ie import refine_entities_relations
-
-			entities, rel_refined = refine_entities_relations(entities, text_spans)
-			if rel_refined:
-				relations.extend(rel_refined)
-		except Exception:
-			# Keep local results
-			logger.warning("cloud_refine_error adapter=openai", exc_info=True)
-
-	# 4) Dimensions discovery
-	dimensions = discover_dimensions(text_spans)
-
-	# 5) Domain inference (+ optional web enrichment)
-	domain_labels = _infer_domain_labels(model.pages)
-	if enrich_web and not offline and domain_labels:
-		try:
-			from pdf_grepper.enrich.web_search import enrich_terms
-
-			enrichment = enrich_terms(domain_labels, offline=False)
-			# Attach simple counts as metadata
-			model.extra_metadata["enrichment_counts"] = str({k: len(v) for k, v in enrichment.items()})
-			logger.info("enrich_done terms=%d", len(domain_labels))
-		except Exception:
-			logger.warning("enrich_error", exc_info=True)
-
-	# 6) Assemble model
-	model.entities = entities
-	model.relations = relations
-	model.stakeholders = stakeholders
-	model.dimensions = dimensions
-	model.domain_labels = domain_labels
-
-	# 7) Export
-	export_turtle(model, ttl_path=ttl_out, base_uri=base_uri)
+				enrichment = enrich_terms(model.domain_labels, offline=False)
+				model.extra_metadata["enrichment_counts"] = str({k: len(v) for k, v in enrichment.items()})
+				logger.info("enrich_done terms=%d", len(model.domain_labels))
+			except Exception:
+				logger.warning("enrich_error", exc_info=True)
+		model.extra_metadata["stream_window"] = str(window)
+		model.extra_metadata["page_count"] = str(page_count)
+	finally:
+		writer.close(model)
 	if json_out:
 		with open(json_out, "w", encoding="utf-8") as f:
 			json.dump(asdict(model), f, ensure_ascii=False, indent=2)
 	logger.info("export_done ttl=%s json=%s", ttl_out, json_out or "")
-	# Cache write
-	if cache_dir:
-		try:
-			key = _cache_key(input_paths, ocr_mode, use_cloud, enrich_web, offline, base_uri)
-			cache_path = os.path.join(cache_dir, f"{key}.json")
-			with open(cache_path, "w", encoding="utf-8") as f:
-				json.dump(asdict(model), f, ensure_ascii=False, indent=2)
-			logger.info("cache_write key=%s path=%s", key, cache_path)
-		except Exception:
-			logger.warning("cache_write_error", exc_info=True)
-
 	return model
-
-
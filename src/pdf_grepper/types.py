@@ -19,6 +19,8 @@ class TextSpan:
 	text: str
 	span: Optional[SourceSpan] = None
 	confidence: Optional[float] = None
+	alt_spans: List[SourceSpan] = field(default_factory=list)  # near-duplicates fused from other sources
+	boilerplate: bool = False  # running header/footer/page number, skipped by IE and exported once
 
 
 @dataclass
@@ -62,6 +64,8 @@ class Page:
 	figures: List[Figure] = field(default_factory=list)
 	diagram_nodes: List[DiagramNode] = field(default_factory=list)
 	diagram_edges: List[DiagramEdge] = field(default_factory=list)
+	kind: Optional[str] = None  # pre-flight class: blank|native|scanned|vector|mixed
+	aligned: List[SourceSpan] = field(default_factory=list)  # same page in other sources
 
 
 @dataclass
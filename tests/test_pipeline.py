@@ -67,7 +67,7 @@ def _document_with_diagrams(source: str, lines: List[str]) -> DocumentModel:
 
 
 def test_pipeline_processes_pdf_fixture(monkeypatch, sample_pdf_path: Path, tmp_path: Path):
-    def fake_loader(paths, ocr_mode="auto"):
+    def fake_loader(paths, ocr_mode="auto", **kwargs):
         return _document_with_diagrams(
             str(sample_pdf_path), ["Acme Rocket uses Booster Engine"]
         )
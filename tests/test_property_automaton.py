@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import pickle
+import random
+import re
+
+from pdf_grepper.ie.automaton import Automaton, word_bounded
+
+
+def _build(keys):
+    automaton = Automaton()
+    for k in keys:
+        automaton.add(k, k)
+    return automaton.build()
+
+
+def test_finditer_matches_naive_search():
+    rng = random.Random(7)
+    keys = {"".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(40)}
+    automaton = _build(keys)
+    assert len(automaton) == len(keys)
+    for _ in range(20):
+        text = "".join(rng.choice("abcd") for _ in range(60))
+        expected = sorted((m.start(), m.start() + len(k), k) for k in keys for m in re.finditer(f"(?={k})", text))
+        assert sorted(automaton.finditer(text)) == expected
+
+
+def test_longest_is_leftmost_longest_and_word_bounded():
+    automaton = _build(["acme", "acme corp", "corp", "me"])
+    text = "acme corp and acmexyz corp"
+    assert [(s, e, v) for s, e, v in automaton.longest(text)] == [(0, 9, "acme corp"), (14, 18, "acme"), (22, 26, "corp")]
+    assert [v for _, _, v in automaton.longest(text, word_bounded)] == ["acme corp", "corp"]
+    assert [v for _, _, v in pickle.loads(pickle.dumps(automaton)).longest(text, word_bounded)] == ["acme corp", "corp"]
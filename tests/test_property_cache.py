@@ -4,7 +4,9 @@ import tempfile
 from pathlib import Path
 
 import fitz  # PyMuPDF
+import pytest
 
+from pdf_grepper.inputs import InputDocument, hash_available
 from pdf_grepper.pipeline import run_pipeline
 
 
@@ -94,3 +96,301 @@ def test_cache_provenance_metadata(tmp_path):
         Path(pdf_path).unlink(missing_ok=True)
         Path(ttl1).unlink(missing_ok=True)
 
+
+
+def _make_multipage_pdf(texts) -> str:
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    doc = fitz.open()
+    for text in texts:
+        page = doc.new_page()
+        page.insert_text((72, 100), text, fontsize=14)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def test_page_cache_reextracts_only_changed_pages(tmp_path, monkeypatch):
+    from pdf_grepper.pdf import loader
+
+    calls = []
+    real_extract = loader._extract_text_blocks_from_page
+
+    def counting_extract(doc_path, page, page_index, *args, **kwargs):
+        calls.append(page_index)
+        return real_extract(doc_path, page, page_index, *args, **kwargs)
+
+    monkeypatch.setattr(loader, "_extract_text_blocks_from_page", counting_extract)
+    page_cache = str(tmp_path / "pages")
+    original = _make_multipage_pdf(["Page one", "Page two", "Page three"])
+    edited = _make_multipage_pdf(["Page one", "Page 2 revised", "Page three"])
+    try:
+        first = loader.load_pdf_or_docx([original], ocr_mode="none", page_cache_dir=page_cache)
+        assert calls == [0, 1, 2]
+
+        # Re-saving rewrites the xref table and trailer but not page content
+        resaved = str(tmp_path / "resaved.pdf")
+        with fitz.open(original) as doc:
+            doc.save(resaved, garbage=4, deflate=True)
+        calls.clear()
+        again = loader.load_pdf_or_docx([resaved], ocr_mode="none", page_cache_dir=page_cache)
+        assert calls == []
+        assert [p.text_blocks[0].text for p in again.pages] == [p.text_blocks[0].text for p in first.pages]
+        assert all(ts.span.source_path == resaved for p in again.pages for ts in p.text_blocks)
+
+        calls.clear()
+        changed = loader.load_pdf_or_docx([edited], ocr_mode="none", page_cache_dir=page_cache)
+        assert calls == [1]
+        assert changed.pages[1].text_blocks[0].text == "Page 2 revised"
+    finally:
+        Path(original).unlink(missing_ok=True)
+        Path(edited).unlink(missing_ok=True)
+
+
+def _make_form_pdf(path: str, value: str) -> None:
+    doc = fitz.open()
+    page = doc.new_page()
+    widget = fitz.Widget()
+    widget.field_type = fitz.PDF_WIDGET_TYPE_TEXT
+    widget.field_name = "name"
+    widget.field_value = value
+    widget.rect = fitz.Rect(72, 72, 300, 100)
+    page.add_widget(widget)
+    doc.save(path)
+    doc.close()
+
+
+_CMAP = (
+    "/CIDInit /ProcSet findresource begin 12 dict begin begincmap /CMapName /X def\n"
+    "1 begincodespacerange <00> <FF> endcodespacerange\n"
+    "1 beginbfchar <41> <{}> endbfchar endcmap CMapName currentdict /CMap defineresource pop end end"
+)
+
+
+def _make_remapped_font_pdf(path: str, target: str) -> None:
+    # same content stream, but the font's ToUnicode CMap maps "A" to another character
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 100), "ABC", fontsize=14)
+    font = page.get_fonts(full=True)[0][0]
+    cmap = doc.get_new_xref()
+    doc.update_object(cmap, "<<>>")
+    doc.update_stream(cmap, _CMAP.format(target).encode())
+    doc.xref_set_key(font, "ToUnicode", f"{cmap} 0 R")
+    doc.save(path)
+    doc.close()
+
+
+def test_page_cache_misses_on_changed_fields_and_fonts(tmp_path):
+    from pdf_grepper.pdf import loader
+
+    page_cache = str(tmp_path / "pages")
+
+    def texts(path):
+        model = loader.load_pdf_or_docx([path], ocr_mode="none", page_cache_dir=page_cache)
+        return [ts.text for ts in model.pages[0].text_blocks]
+
+    alice, bob = str(tmp_path / "alice.pdf"), str(tmp_path / "bob.pdf")
+    _make_form_pdf(alice, "Alice Smith")
+    _make_form_pdf(bob, "Bob Jones")
+    assert texts(alice) == ["Alice Smith"]
+    assert texts(bob) == ["Bob Jones"]
+
+    x, y = str(tmp_path / "x.pdf"), str(tmp_path / "y.pdf")
+    _make_remapped_font_pdf(x, "0058")
+    _make_remapped_font_pdf(y, "0059")
+    assert texts(x) == ["XBC"]
+    assert texts(y) == ["YBC"]
+
+    # object numbers and image/resource names are not part of the address
+    resaved = str(tmp_path / "resaved.pdf")
+    with fitz.open(bob) as doc:
+        doc.save(resaved, garbage=4, deflate=True)
+    with fitz.open(bob) as a, fitz.open(resaved) as b:
+        assert loader._page_fingerprint(a[0], "") == loader._page_fingerprint(b[0], "")
+
+
+def test_export_only_change_reuses_deeper_layers(tmp_path, monkeypatch):
+    from pdf_grepper import pipeline
+
+    pdf_path = _make_pdf("Layered cache")
+    ttl_a, ttl_b = str(tmp_path / "a.ttl"), str(tmp_path / "b.ttl")
+    cache_dir = str(tmp_path / "cache")
+    try:
+        pipeline.run_pipeline([pdf_path], ttl_out=ttl_a, ocr_mode="none", offline=True, cache_dir=cache_dir)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("ingest/IE must come from the cache")
+
+        monkeypatch.setattr(pipeline, "load_pdf_or_docx", fail)
+        monkeypatch.setattr(pipeline, "extract_entities", fail)
+        m2 = pipeline.run_pipeline(
+            [pdf_path],
+            ttl_out=ttl_b,
+            ocr_mode="none",
+            offline=True,
+            cache_dir=cache_dir,
+            base_uri="http://example.com/other/",
+        )
+        assert m2.extra_metadata["cache_layers"] == "ingest,ie,domain"
+        assert "http://example.com/other/" in Path(ttl_b).read_text()
+
+        # Full hit replays the cached Turtle for the same settings
+        Path(ttl_b).unlink()
+        m3 = pipeline.run_pipeline(
+            [pdf_path],
+            ttl_out=ttl_b,
+            ocr_mode="none",
+            offline=True,
+            cache_dir=cache_dir,
+            base_uri="http://example.com/other/",
+        )
+        assert m3.extra_metadata.get("cache") == "true"
+        assert Path(ttl_b).exists()
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
+
+
+def test_in_memory_input_shares_cache_with_its_bytes(tmp_path):
+    pdf_path = _make_pdf("Bytes in, same cache key")
+    cache_dir = tmp_path / "cache"
+    ttl = str(tmp_path / "out.ttl")
+    try:
+        data = Path(pdf_path).read_bytes()
+        first = run_pipeline(input_paths=[data], ttl_out=ttl, ocr_mode="none", offline=True, cache_dir=str(cache_dir))
+        assert first.sources == ["<input-0>.pdf"]
+        assert first.extra_metadata.get("cache") != "true"
+        again = run_pipeline(input_paths=[data], ttl_out=ttl, ocr_mode="none", offline=True, cache_dir=str(cache_dir))
+        assert again.extra_metadata.get("cache") == "true"
+        assert again.sources == first.sources
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
+
+def test_fingerprint_index_skips_rehashing_unchanged_inputs(tmp_path, monkeypatch):
+
+    pdf_path = _make_pdf("Hash me once")
+    old = 1_600_000_000
+    os.utime(pdf_path, (old, old))
+    cache_dir = tmp_path / "cache"
+    ttl = str(tmp_path / "out.ttl")
+    hashed = []
+    real_digest = InputDocument.digest
+
+    def counting_digest(self, algo="sha256"):
+        hashed.append(algo)
+        return real_digest(self, algo)
+
+    monkeypatch.setattr(InputDocument, "digest", counting_digest)
+
+    def run(**kwargs):
+        return run_pipeline(
+            input_paths=[pdf_path], ttl_out=ttl, ocr_mode="none", offline=True, cache_dir=str(cache_dir), **kwargs
+        )
+
+    try:
+        run()
+        assert hashed == ["sha256"]
+        assert json.loads((cache_dir / "fingerprints.json").read_text())
+        assert run().extra_metadata.get("cache") == "true"
+        assert hashed == ["sha256"], "unchanged file must not be re-hashed"
+        # a different digest keys a different cache entry
+        if hash_available("xxh3_128"):
+            assert run(hash_algo="xxh3_128").extra_metadata.get("cache") != "true"
+            assert hashed == ["sha256", "xxh3_128"]
+            hashed.remove("xxh3_128")
+        # changing the file invalidates its fingerprint
+        doc = fitz.open(pdf_path)
+        doc[0].insert_text((72, 200), "edited", fontsize=14)
+        doc.saveIncr()
+        doc.close()
+        os.utime(pdf_path, (old + 10, old + 10))
+        assert run().extra_metadata.get("cache") != "true"
+        assert hashed == ["sha256", "sha256"]
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
+
+
+def test_xxh3_digest_is_optional(monkeypatch):
+    from pdf_grepper import inputs as inputs_mod
+
+    doc = InputDocument(b"%PDF-1.7 content", name="a.pdf")
+    if inputs_mod.xxhash is not None:
+        assert doc.digest("xxh3_128") == inputs_mod.xxhash.xxh3_128(b"%PDF-1.7 content").hexdigest()
+    monkeypatch.setattr(inputs_mod, "xxhash", None)
+    assert not inputs_mod.hash_available("xxh3_128")
+    with pytest.raises(RuntimeError, match="xxhash"):
+        InputDocument(b"%PDF-1.7", name="b.pdf").digest("xxh3_128")
+    with pytest.raises(RuntimeError, match="xxhash"):
+        run_pipeline(input_paths=[b"%PDF-1.7"], ttl_out="unused.ttl", hash_algo="xxh3_128")
+
+
+def test_layer_sections_decode_lazily(tmp_path, monkeypatch):
+    from pdf_grepper import cache as cache_mod
+
+    data = {"pages": [{"index": 0, "text_blocks": [{"text": "x" * 100}]}], "entities": [{"id": "e1"}], "title": None}
+    cache_mod.write_layer(str(tmp_path), "ie", "k", data)
+    assert open(cache_mod.layer_path(str(tmp_path), "ie", "k"), "rb").read(4) == cache_mod.LAYER_MAGIC
+    decoded = []
+    real = cache_mod.zlib.decompress
+    monkeypatch.setattr(cache_mod.zlib, "decompress", lambda b: decoded.append(b) or real(b))
+    layer = cache_mod.read_layer(str(tmp_path), "ie", "k")
+    assert sorted(layer) == ["entities", "pages", "title"]
+    assert layer["entities"] == [{"id": "e1"}]
+    assert len(decoded) == 1, "only the accessed section is decompressed"
+    assert dict(layer) == data
+    assert cache_mod.read_layer(str(tmp_path), "ie", "missing") is None
+    # truncated files are a miss, not an error
+    path = cache_mod.layer_path(str(tmp_path), "ie", "k")
+    blob = open(path, "rb").read()
+    open(path, "wb").write(blob[:-10])
+    assert cache_mod.read_layer(str(tmp_path), "ie", "k") is None
+
+
+def test_prune_evicts_least_recently_used_first(tmp_path):
+    from pdf_grepper import cache as cache_mod
+
+    for i, name in enumerate(["old", "mid", "new"]):
+        cache_mod.write_layer(str(tmp_path), "ie", name, {"blob": os.urandom(4000).hex()})
+        os.utime(cache_mod.layer_path(str(tmp_path), "ie", name), (1_600_000_000 + i, 1_600_000_000 + i))
+    # a hit makes "old" the most recently used entry
+    assert cache_mod.read_layer(str(tmp_path), "ie", "old") is not None
+    size = cache_mod.directory_size(str(tmp_path))
+    remaining, removed = cache_mod.prune(str(tmp_path), max_bytes=size - 1)
+    assert removed == 1 and remaining < size
+    assert cache_mod.read_layer(str(tmp_path), "ie", "mid") is None
+    assert cache_mod.read_layer(str(tmp_path), "ie", "old") is not None
+    assert cache_mod.read_layer(str(tmp_path), "ie", "new") is not None
+
+
+def test_prune_counts_the_ner_memo_and_empties_it_in_place(tmp_path):
+    from pdf_grepper import cache as cache_mod
+    from pdf_grepper.ie.memo import NerMemo
+
+    path = str(tmp_path / cache_mod.NER_MEMO_FILE)
+    memo = NerMemo(path)
+    memo.put_many({f"k{i}": [(0, "Acme" * 50, "ORG")] for i in range(500)})
+    memo.close()
+    old = 1_600_000_000
+    os.utime(path, (old, old))
+    cache_mod.write_layer(str(tmp_path), "ie", "layer", {"blob": os.urandom(4000).hex()})
+    memo_bytes = os.path.getsize(path)
+    layer_bytes = cache_mod.directory_size(str(tmp_path / "ie"))
+    assert memo_bytes > layer_bytes
+
+    # the memo is the least recently used entry: it goes first, emptied but still a valid memo
+    remaining, removed = cache_mod.prune(str(tmp_path), max_bytes=memo_bytes, max_age_days=0)
+    assert removed == 1 and remaining < memo_bytes
+    assert cache_mod.read_layer(str(tmp_path), "ie", "layer") is not None
+    memo = NerMemo(path)
+    assert memo.get_many(["k0"]) == {}
+    memo.put_many({"k0": [(0, "Acme", "ORG")]})
+    assert memo.get_many(["k0"]) == {"k0": [(0, "Acme", "ORG")]}
+    memo.close()
+    # reading marks it used, so only the layer is old enough for the age policy
+    os.utime(tmp_path / "ie" / "layer.pgc", (old, old))
+    assert cache_mod.prune(str(tmp_path), max_bytes=0, max_age_days=1)[1] == 1
+    assert os.path.exists(path) and cache_mod.read_layer(str(tmp_path), "ie", "layer") is None
+
+    missing = tmp_path / "missing"
+    assert cache_mod.prune(str(missing)) == (0, 0)
+    assert not missing.exists()
@@ -63,3 +63,38 @@ def test_cli_invalid_ocr_value():
         Path(pdf_path).unlink(missing_ok=True)
         Path(ttl_path).unlink(missing_ok=True)
 
+
+def test_cli_cache_option_and_cache_commands(tmp_path):
+    runner = CliRunner()
+    pdf_path = _make_pdf("CLI cache")
+    cache_dir = str(tmp_path / "cache")
+    ttl_path = str(tmp_path / "out.ttl")
+    try:
+        args = ["parse", pdf_path, "--out", ttl_path, "--ocr", "none", "--offline", "--cache", cache_dir]
+        assert runner.invoke(app, args).exit_code == 0
+        assert runner.invoke(app, args).exit_code == 0
+        stats = json.loads((tmp_path / "cache" / "stats.json").read_text())
+        assert stats["hits"] >= 1 and stats["misses"] >= 1 and stats["bytes_written"] > 0
+        result = runner.invoke(app, ["cache", "stats", cache_dir])
+        assert result.exit_code == 0 and "hits=" in result.output
+        # entries unused for longer than --max-age go; the bookkeeping files stay
+        for p in (tmp_path / "cache").rglob("*"):
+            if p.is_file():
+                os.utime(p, (1_600_000_000, 1_600_000_000))
+        result = runner.invoke(app, ["cache", "prune", cache_dir, "--max-age", "1"])
+        assert result.exit_code == 0
+        left = {p.name for p in (tmp_path / "cache").rglob("*") if p.is_file()}
+        assert "stats.json" in left and left <= {"fingerprints.json", "stats.json", "ner.sqlite"}
+        (tmp_path / "cache" / "notes.txt").write_text("not a cache entry")
+        assert runner.invoke(app, ["cache", "clear", cache_dir]).exit_code == 0
+        assert [p.name for p in (tmp_path / "cache").iterdir()] == ["notes.txt"]
+        # clear refuses a directory no run has used as a cache; prune leaves a missing one alone
+        result = runner.invoke(app, ["cache", "clear", str(tmp_path / "cache")])
+        assert result.exit_code == 1 and (tmp_path / "cache" / "notes.txt").exists()
+        missing = str(tmp_path / "missing")
+        assert runner.invoke(app, ["cache", "prune", missing]).exit_code == 0
+        assert not os.path.exists(missing)
+        bad = runner.invoke(app, args + ["--hash-algo", "md5"])
+        assert bad.exit_code == 2
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 from typing import List, Tuple, Optional
 
 from pdf_grepper.ie.entities import extract_entities
@@ -39,3 +40,110 @@ def test_entity_deduplication_by_normalized_text():
     normalized = [e.text.lower() for e in ents]
     assert len(normalized) == len(set(normalized)), "Duplicate entities should be deduplicated by normalized text"
 
+
+
+class _FakeEnt:
+    def __init__(self, text, label, start_char):
+        self.text, self.label_, self.start_char = text, label, start_char
+
+
+class _FakeDoc:
+    def __init__(self, text):
+        self.ents = [_FakeEnt(m.group(0), "ORG", m.start()) for m in re.finditer(r"Acme\w*", text)]
+
+
+class _FakeNlp:
+    def __init__(self):
+        self.pipe_names = ["tok2vec", "tagger", "parser", "ner", "lemmatizer"]
+        self.piped = []
+
+    def select_pipes(self, disable):
+        self.pipe_names = [p for p in self.pipe_names if p not in disable]
+
+    def pipe(self, texts, as_tuples, batch_size, n_process):
+        for text, context in texts:
+            self.piped.append(text)
+            yield _FakeDoc(text), context
+
+
+class _FakeSpacy:
+    def __init__(self):
+        self.loads = 0
+
+    def load(self, name):
+        self.loads += 1
+        return _FakeNlp()
+
+
+def test_spacy_model_loaded_once_and_fed_in_chunks(monkeypatch):
+    from pdf_grepper.ie import entities as entities_mod
+
+    fake = _FakeSpacy()
+    monkeypatch.setattr(entities_mod, "spacy", fake)
+    monkeypatch.setattr(entities_mod, "_nlp_cache", {})
+    monkeypatch.setattr(entities_mod, "NER_CHUNK_CHARS", 40)
+    texts = [(f"Acme{i} signed with the operator", SourceSpan(page_index=i)) for i in range(5)]
+    first = extract_entities(texts)
+    second = extract_entities(texts)
+    assert fake.loads == 1, "the model is loaded once per process"
+    nlp = entities_mod.get_nlp()
+    assert nlp.pipe_names == ["tok2vec", "ner"]
+    assert all(len(chunk) <= 40 for chunk in nlp.piped)
+    assert sorted(e.text for e in first) == [f"Acme{i}" for i in range(5)]
+    # every entity carries the span of the block it was found in
+    assert all(e.span is not None and e.span.page_index == int(e.text[4:]) for e in first)
+    assert len(second) == 5
+
+
+def test_chunks_respect_limit_and_keep_all_text():
+    from pdf_grepper.ie.entities import _chunks
+
+    spans = [SourceSpan(page_index=i) for i in range(3)]
+    texts = list(zip(["alpha beta", "gamma " * 30, "delta"], spans))
+    chunks = list(_chunks(texts, max_chars=32))
+    assert all(len(text) <= 32 for text, _ in chunks)
+    assert " ".join(" ".join(text for text, _ in chunks).split()) == " ".join(" ".join(t for t, _ in texts).split())
+    # the offset index maps every word back to the span it came from
+    for text, index in chunks:
+        for m in re.finditer(r"\w+", text):
+            expected = {"alpha": 0, "beta": 0, "gamma": 1, "delta": 2}[m.group(0)]
+            assert index.at(m.start()) is spans[expected]
+
+
+def test_ner_memo_skips_inference_for_seen_chunks(monkeypatch, tmp_path):
+    from pdf_grepper.ie import entities as entities_mod
+    from pdf_grepper.ie.memo import NerMemo
+
+    monkeypatch.setattr(entities_mod, "spacy", _FakeSpacy())
+    monkeypatch.setattr(entities_mod, "_nlp_cache", {})
+    monkeypatch.setattr(entities_mod, "NER_CHUNK_CHARS", 40)
+    path = str(tmp_path / "ner.sqlite")
+    texts = [("Acme1  signed\nwith the operator", SourceSpan(page_index=0)), ("Acme2 too", SourceSpan(page_index=1))]
+    plain = extract_entities(texts)
+    nlp = entities_mod.get_nlp()
+    unmemoised, nlp.piped = nlp.piped, []
+
+    memo = NerMemo(path)
+    first = extract_entities(texts, memo=memo)
+    assert nlp.piped == unmemoised, "the memo runs the model on the chunks of the unmemoised path"
+    assert [(e.text, e.label, e.span) for e in first] == [(e.text, e.label, e.span) for e in plain]
+    memo.close()
+
+    # a later run (new connection) with the same text skips the model; provenance is the current one
+    memo = NerMemo(path)
+    moved = [("Acme1  signed\nwith the operator", SourceSpan(page_index=5))] + texts[1:]
+    again = extract_entities(moved, memo=memo)
+    assert len(nlp.piped) == len(unmemoised)
+    assert memo.hits == len(unmemoised) and memo.misses == 0
+    assert [(e.text, e.label) for e in again] == [(e.text, e.label) for e in first]
+    assert again[0].span.page_index == 5
+    # rewrapped text is a different chunk, run again like the unmemoised path would
+    extract_entities([("Acme1 signed with the operator", SourceSpan(page_index=0))] + texts[1:], memo=memo)
+    assert memo.misses == 1
+
+    # another model version is a different key
+    nlp.meta = {"name": "core_web_sm", "version": "9.9"}
+    piped = len(nlp.piped)
+    extract_entities(texts, memo=memo)
+    assert len(nlp.piped) == piped + len(unmemoised)
+    memo.close()
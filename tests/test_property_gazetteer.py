@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+
+from pdf_grepper.ie.gazetteer import Gazetteer
+from pdf_grepper.types import SourceSpan
+
+
+def _write(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_gazetteer_normalises_and_prefers_longest_match(tmp_path):
+    path = _write(
+        tmp_path / "names.tsv",
+        ["# parts and vendors", "Acme Corp\tORG", "Acme Corp Cloud\tPRODUCT", "M8 bolt", "", "Corp"],
+    )
+    gazetteer = Gazetteer.from_files([path])
+    assert len(gazetteer) == 4
+    text = "Order ACME   corp\ncloud units and an m8 BOLT; acmecorp is not a match, nor is M8 bolts."
+    found = [(text[s:e], name, label) for s, e, name, label in gazetteer.find(text)]
+    assert found == [("ACME   corp\ncloud", "Acme Corp Cloud", "PRODUCT"), ("m8 BOLT", "M8 bolt", "CONCEPT")]
+
+    spans = [SourceSpan(page_index=0), SourceSpan(page_index=1)]
+    entities = gazetteer.extract([("Acme Corp signed.", spans[0]), ("acme corp again, then Corp", spans[1])])
+    assert [(e.text, e.label, e.span.page_index) for e in entities] == [("Acme Corp", "ORG", 0), ("Corp", "CONCEPT", 1)]
+
+
+def test_compiled_gazetteer_is_persisted_and_reused(tmp_path, monkeypatch):
+    path = _write(tmp_path / "names.tsv", ["Pump Station\tFAC"])
+    compiled = str(tmp_path / "compiled")
+    first = Gazetteer.from_files([path], compiled)
+    assert len(os.listdir(compiled)) == 1
+
+    def no_rebuild(*args, **kwargs):
+        raise AssertionError("a compiled gazetteer must be loaded, not rebuilt")
+
+    monkeypatch.setattr(Gazetteer, "from_entries", no_rebuild)
+    again = Gazetteer.from_files([path], compiled)
+    assert again.digest == first.digest
+    assert [m[2] for m in again.find("the pump station")] == ["Pump Station"]
+
+    monkeypatch.undo()
+    _write(tmp_path / "names.tsv", ["Pump Station\tFAC", "Valve\tPRODUCT"])
+    changed = Gazetteer.from_files([path], compiled)
+    assert changed.digest != first.digest and len(changed) == 2
+
+
+def test_compiled_gazetteer_is_plain_data(tmp_path):
+    import pickle
+
+    from pdf_grepper.ie.gazetteer import COMPILED_SUFFIX
+
+    path = _write(tmp_path / "names.tsv", ["Pump Station\tFAC", "Pump\tPRODUCT", "Station Road"])
+    compiled = tmp_path / "compiled"
+    first = Gazetteer.from_files([path], str(compiled))
+    (blob,) = compiled.iterdir()
+    assert blob.suffix == COMPILED_SUFFIX and blob.read_bytes()[:4] == b"PGGZ"
+    text = "pump station road and the pump"
+    assert Gazetteer.load(str(blob)).find(text) == first.find(text)
+
+    # a pickle planted under the compiled name is never unpickled, and a truncated file is rebuilt
+    class Boom:
+        def __reduce__(self):
+            return (os.remove, (path,))
+
+    for payload in (pickle.dumps(Boom()), blob.read_bytes()[:-8]):
+        blob.write_bytes(payload)
+        rebuilt = Gazetteer.from_files([path], str(compiled))
+        assert os.path.exists(path) and rebuilt.find(text) == first.find(text)
+        assert blob.read_bytes()[:4] == b"PGGZ"
+
+
+def test_pipeline_uses_gazetteer_entities(tmp_path):
+    import fitz
+
+    from pdf_grepper.pipeline import run_pipeline
+
+    pdf = str(tmp_path / "doc.pdf")
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 100), "The zx-9 pump uses the Ledger Gateway.", fontsize=12)
+    doc.save(pdf)
+    doc.close()
+    names = _write(tmp_path / "names.tsv", ["ZX-9 pump\tPRODUCT", "Ledger Gateway\tPRODUCT"])
+    model = run_pipeline([pdf], ttl_out=str(tmp_path / "out.ttl"), ocr_mode="none", offline=True, gazetteers=[names])
+    products = {e.text: e for e in model.entities if e.label == "PRODUCT"}
+    assert set(products) == {"ZX-9 pump", "Ledger Gateway"}
+    assert all(e.span is not None and e.span.page_index == 0 for e in products.values())
+    assert [(r.subject_id, r.object_id) for r in model.relations] == [
+        (products["ZX-9 pump"].id, products["Ledger Gateway"].id)
+    ]
@@ -66,3 +66,29 @@ def test_layout_parsing_resilience(monkeypatch):
         # restore not necessary; monkeypatch handles it
         Path(pdf_path).unlink(missing_ok=True)
 
+
+
+def test_boilerplate_bands_skipped_by_ie_and_exported_once(tmp_path):
+    from pdf_grepper.pdf.boilerplate import BoilerplateDetector
+    from pdf_grepper.pipeline import _collect_text_spans, run_pipeline
+
+    pdf_path = tmp_path / "report.pdf"
+    doc = fitz.open()
+    for i in range(6):
+        page = doc.new_page()
+        page.insert_text((72, 40), "ACME Corp - Confidential", fontsize=9)
+        page.insert_text((72, 140 + 20 * i), f"Finding {i}: the valve on line {i} leaks under load.", fontsize=11)
+        page.insert_text((280, 770), f"Page {i + 1} of 6", fontsize=9)
+    doc.save(str(pdf_path))
+    doc.close()
+
+    model = load_pdf_or_docx([str(pdf_path)], ocr_mode="none")
+    assert BoilerplateDetector().mark(model.pages) == 12
+    texts = [t for t, _ in _collect_text_spans(model.pages)]
+    assert texts == [f"Finding {i}: the valve on line {i} leaks under load." for i in range(6)]
+
+    ttl = tmp_path / "out.ttl"
+    run_pipeline([str(pdf_path)], str(ttl), ocr_mode="none", offline=True, skip_boilerplate=True)
+    out = ttl.read_text(encoding="utf-8")
+    assert out.count("ACME Corp - Confidential") == 1
+    assert out.count("Page 1 of 6") == 1 and "Page 2 of 6" not in out
@@ -13,11 +13,17 @@ def _make_pdf_with_pages(texts):
     fd, path = tempfile.mkstemp(suffix=".pdf")
     os.close(fd)
     doc = fitz.open()
+    # A 200 dpi letter-size scan without a text layer (blank pages are skipped by pre-flight)
+    scan = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 1700, 2200), False)
+    scan.clear_with(255)
+    scan_png = scan.tobytes("png")
     for t in texts:
         page = doc.new_page()
         if t is not None:
             page.insert_text((72, 100), t, fontsize=14)
-        # If t is None, leave page blank (sparse text)
+        else:
+            # If t is None, the page is a scan (sparse text)
+            page.insert_image(page.rect, stream=scan_png)
     doc.save(path)
     doc.close()
     return path
@@ -25,7 +31,7 @@ def _make_pdf_with_pages(texts):
 
 # Feature: pdf-intelligence-system, Property 4: Auto OCR triggers on sparse text
 def test_auto_ocr_triggers_on_sparse_text(monkeypatch):
-    pdf_path = _make_pdf_with_pages([None])  # blank page triggers OCR
+    pdf_path = _make_pdf_with_pages([None])  # scanned page triggers OCR
     try:
         monkeypatch.setattr(ocr_mod, "ocr_image_to_text", lambda img: "OCR TEXT")
         model = load_pdf_or_docx([pdf_path], ocr_mode="auto")
@@ -60,3 +66,347 @@ def test_none_ocr_mode_skips_processing(monkeypatch):
     finally:
         Path(pdf_path).unlink(missing_ok=True)
 
+
+def test_tesserocr_engine_routes_to_persistent_pool(monkeypatch):
+    pdf_path = _make_pdf_with_pages([None])
+    seen = []
+
+    class FakePool:
+        def recognize(self, img):
+            seen.append(img.size)
+            return "POOL TEXT"
+
+    try:
+        monkeypatch.setattr(ocr_mod, "tesserocr_available", lambda: True)
+        monkeypatch.setattr(ocr_mod, "get_pool", lambda: FakePool())
+        monkeypatch.setattr(ocr_mod, "ocr_image_to_text", lambda img: "SUBPROCESS SHOULD NOT RUN")
+        model = load_pdf_or_docx([pdf_path], ocr_mode="auto", ocr_engine="tesserocr")
+        texts = [ts.text for ts in model.pages[0].text_blocks if ts.span and ts.span.note == "ocr"]
+        assert texts == ["POOL TEXT"]
+        assert len(seen) == 1
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
+
+
+def test_pool_worker_rebuilds_image_from_raw_buffer(monkeypatch):
+    from PIL import Image
+
+    class FakeApi:
+        def SetImage(self, img):
+            self.img = img
+
+        def GetUTF8Text(self):
+            return f"{self.img.mode}:{self.img.size[0]}x{self.img.size[1]}"
+
+    monkeypatch.setattr(ocr_mod, "_worker_api", FakeApi())
+    img = Image.new("L", (12, 7), color=255)
+    assert ocr_mod._pool_recognize(img.mode, img.size, img.tobytes()) == "L:12x7"
+
+
+def test_pool_worker_sets_source_resolution(monkeypatch):
+    from PIL import Image
+
+    calls = []
+
+    class FakeApi:
+        def SetImage(self, img):
+            calls.append("image")
+
+        def SetSourceResolution(self, dpi):
+            calls.append(dpi)
+
+        def GetUTF8Text(self):
+            return "text"
+
+    class FakeExecutor:
+        def submit(self, fn, *args):
+            return fn(*args)
+
+    monkeypatch.setattr(ocr_mod, "_worker_api", FakeApi())
+    pool = ocr_mod.TesseractPool.__new__(ocr_mod.TesseractPool)
+    pool._executor = FakeExecutor()
+    img = Image.new("L", (12, 7), color=255)
+    img.info["dpi"] = (225, 225)
+    assert pool.submit(img) == "text"
+    assert calls == ["image", 225]
+
+
+def test_tesserocr_engine_falls_back_without_bindings(monkeypatch):
+    pdf_path = _make_pdf_with_pages([None])
+
+    def no_pool():
+        raise AssertionError("pool must not start without tesserocr")
+
+    try:
+        monkeypatch.setattr(ocr_mod, "tesserocr_available", lambda: False)
+        monkeypatch.setattr(ocr_mod, "get_pool", no_pool)
+        monkeypatch.setattr(ocr_mod, "ocr_image_to_text", lambda img: "SUBPROCESS TEXT")
+        model = load_pdf_or_docx([pdf_path], ocr_mode="auto", ocr_engine="tesserocr")
+        texts = [ts.text for ts in model.pages[0].text_blocks if ts.span and ts.span.note == "ocr"]
+        assert texts == ["SUBPROCESS TEXT"]
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
+
+
+def test_local_tesserocr_without_language_data_fails_fast(monkeypatch):
+    class NoTessdata:
+        @staticmethod
+        def get_languages():
+            return ("./", [])
+
+    pdf_path = _make_pdf_with_pages([None])
+    try:
+        monkeypatch.setattr(ocr_mod, "tesserocr", NoTessdata)
+        ocr_mod._tesserocr_languages.cache_clear()
+        with pytest.raises(RuntimeError):
+            load_pdf_or_docx([pdf_path], ocr_mode="local", ocr_engine="tesserocr")
+    finally:
+        ocr_mod._tesserocr_languages.cache_clear()
+        Path(pdf_path).unlink(missing_ok=True)
+
+
+def test_replacing_the_pool_unregisters_its_exit_hook(monkeypatch):
+    registered = []
+
+    class FakePool:
+        def __init__(self, lang="eng", workers=None):
+            self.lang = lang
+
+        def shutdown(self):
+            pass
+
+    monkeypatch.setattr(ocr_mod, "TesseractPool", FakePool)
+    monkeypatch.setattr(ocr_mod, "_pool", None)
+    monkeypatch.setattr(ocr_mod.atexit, "register", registered.append)
+    monkeypatch.setattr(ocr_mod.atexit, "unregister", registered.remove)
+    ocr_mod.get_pool("eng")
+    ocr_mod.get_pool("deu")
+    assert registered == [ocr_mod._pool.shutdown]
+
+
+def test_unknown_ocr_engine_rejected():
+    pdf_path = _make_pdf_with_pages(["text"])
+    try:
+        with pytest.raises(ValueError):
+            load_pdf_or_docx([pdf_path], ocr_mode="none", ocr_engine="bogus")
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
+
+
+def test_pipelined_ocr_matches_sequential_and_bounds_bitmaps(monkeypatch):
+    import threading
+    import time
+
+    from pdf_grepper.pdf import loader
+
+    pdf_path = _make_pdf_with_pages([None, "native text long enough to skip auto OCR", None, None, None])
+    live = {"now": 0, "max": 0}
+    lock = threading.Lock()
+    real_render = loader._render_for_ocr
+
+    def counting_render(page, **kwargs):
+        with lock:
+            live["now"] += 1
+            live["max"] = max(live["max"], live["now"])
+        return real_render(page, **kwargs)
+
+    def slow_ocr(img):
+        time.sleep(0.02)
+        with lock:
+            live["now"] -= 1
+        return f"OCR {img.size[0]}"
+
+    try:
+        monkeypatch.setattr(loader, "_render_for_ocr", counting_render)
+        monkeypatch.setattr(ocr_mod, "ocr_image_to_text", slow_ocr)
+        sequential = load_pdf_or_docx([pdf_path], ocr_mode="auto")
+        live["max"] = 0
+        pipelined = load_pdf_or_docx([pdf_path], ocr_mode="auto", ocr_prefetch=2)
+        assert pipelined.pages == sequential.pages
+        assert [p.index for p in pipelined.pages] == [0, 1, 2, 3, 4]
+        assert 1 <= live["max"] <= 2
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
+
+
+def _make_mixed_pdf() -> str:
+    import io
+
+    from PIL import Image
+
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    buf = io.BytesIO()
+    Image.new("RGB", (200, 100), color=(255, 255, 255)).save(buf, format="PNG")
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 100), "Native paragraph text that needs no OCR at all.", fontsize=12)
+    page.insert_image(fitz.Rect(72, 300, 272, 400), stream=buf.getvalue())
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def test_region_ocr_targets_image_placements_only(monkeypatch):
+    pdf_path = _make_mixed_pdf()
+    sizes = []
+
+    def fake_ocr(img):
+        sizes.append(img.size)
+        return "SCANNED STAMP"
+
+    try:
+        monkeypatch.setattr(ocr_mod, "ocr_image_to_text", fake_ocr)
+        model = load_pdf_or_docx([pdf_path], ocr_mode="auto", ocr_regions=True)
+        ocr_spans = [ts for ts in model.pages[0].text_blocks if ts.span and ts.span.note == "ocr"]
+        assert [ts.text for ts in ocr_spans] == ["SCANNED STAMP"]
+        assert ocr_spans[0].span.bbox == pytest.approx((72, 300, 272, 400))
+        # Only the 200x100 pt clip is rasterised at 300 dpi, not the whole page
+        assert len(sizes) == 1 and sizes[0][0] == pytest.approx(200 * 300 / 72, abs=2)
+
+        # Whole-page auto mode leaves this text-rich page alone
+        sizes.clear()
+        load_pdf_or_docx([pdf_path], ocr_mode="auto")
+        assert sizes == []
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
+
+
+def test_auto_ocr_dpi_follows_text_height_and_scan_resolution(monkeypatch):
+    from pdf_grepper.pdf.loader import _choose_ocr_dpi
+
+    doc = fitz.open()
+    sizes = {}
+    for fontsize in (40, 11, 7, 5):
+        page = doc.new_page()
+        for y in range(72, 760, int(fontsize * 1.5)):
+            page.insert_text((72, y), "The quick brown fox jumps over the lazy dog", fontsize=fontsize)
+        sizes[fontsize] = _choose_ocr_dpi(page)
+    # Large type renders at the 150 dpi floor, body text and 7pt at 300, only smaller type above it
+    assert sizes == {40: 150, 11: 300, 7: 300, 5: 450}
+    # A 600 dpi scan of body text is not rendered at its full resolution
+    scan = doc.new_page()
+    scan.insert_image(scan.rect, stream=doc[1].get_pixmap(dpi=600, colorspace=fitz.csGRAY).tobytes("png"))
+    assert _choose_ocr_dpi(scan) == sizes[11]
+
+    pdf_path = _make_pdf_with_pages([None])
+    seen = []
+    try:
+        monkeypatch.setattr(ocr_mod, "ocr_image_to_text", lambda img: seen.append(img.info["dpi"]) or "OCR")
+        load_pdf_or_docx([pdf_path], ocr_mode="auto", ocr_dpi=150)
+        load_pdf_or_docx([pdf_path], ocr_mode="auto", ocr_dpi="auto")
+        assert seen == [(150, 150), (200, 200)]  # no text height on an empty scan: the scan DPI
+        with pytest.raises(ValueError):
+            load_pdf_or_docx([pdf_path], ocr_dpi="high")
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
+
+
+def test_tiled_ocr_bounds_bitmaps_and_stitches_seams(monkeypatch):
+    from PIL import Image
+
+    from pdf_grepper.pdf import loader
+
+    fd, pdf_path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    doc = fitz.open()
+    page = doc.new_page(width=1191, height=1684)  # A2
+    lines = [f"Drawing note {i:03d} torque 12 Nm" for i in range(60)]
+    for i, text in enumerate(lines):
+        page.insert_text((72, 72 + i * 25), text, fontsize=12)
+    doc.save(pdf_path)
+    doc.close()
+    budget = 4_000_000
+    rendered = []
+
+    def fake_render(page, clip=None, dpi=300):
+        # Stand-in for OCR: the image carries the vector text inside its clip
+        clip = clip or page.rect
+        rendered.append(int(clip.width * dpi / 72) * int(clip.height * dpi / 72))
+        img = Image.new("L", (1, 1))
+        img.info["text"] = page.get_text("text", clip=clip)
+        return img
+
+    try:
+        monkeypatch.setattr(ocr_mod, "tesseract_available", lambda: True)
+        monkeypatch.setattr(ocr_mod, "ocr_image_to_text", lambda img: img.info["text"])
+        monkeypatch.setattr(loader, "_render_for_ocr", fake_render)
+        model = load_pdf_or_docx([pdf_path], ocr_mode="local", ocr_tile_pixels=budget)
+        ocr_spans = [ts for ts in model.pages[0].text_blocks if ts.span and ts.span.note == "ocr"]
+        assert len(rendered) > 1 and max(rendered) <= budget
+        assert ocr_spans[0].text.splitlines() == lines
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
+
+
+def test_ocr_cache_recognises_identical_images_once(tmp_path, monkeypatch):
+    first, second = _make_pdf_with_pages([None]), _make_pdf_with_pages([None, None])
+    calls = []
+
+    def fake_ocr(img):
+        calls.append(img.size)
+        return "FORM 1040"
+
+    try:
+        monkeypatch.setattr(ocr_mod, "ocr_image_to_text", fake_ocr)
+        cache_dir = str(tmp_path / "ocr")
+        load_pdf_or_docx([first], ocr_mode="auto", ocr_cache_dir=cache_dir)
+        model = load_pdf_or_docx([second], ocr_mode="auto", ocr_cache_dir=cache_dir)
+        assert len(calls) == 1
+        assert all(p.text_blocks[-1].text == "FORM 1040" for p in model.pages)
+    finally:
+        Path(first).unlink(missing_ok=True)
+        Path(second).unlink(missing_ok=True)
+
+
+def test_ocr_cache_evicts_least_recently_used(tmp_path):
+    from PIL import Image
+
+    cache = ocr_mod.OcrCache(str(tmp_path / "ocr"), max_bytes=250)
+    keys = [cache.key(Image.new("L", (8, 8), color=c)) for c in (0, 1, 2)]
+    cache.put(keys[0], "a" * 100)
+    cache.put(keys[1], "b" * 100)
+    old = os.path.getmtime(cache._path(keys[1])) - 10
+    os.utime(cache._path(keys[1]), (old, old))
+    os.utime(cache._path(keys[0]), (old - 10, old - 10))
+    assert cache.get(keys[0]) == "a" * 100  # bump: keys[1] is now least recently used
+    cache.put(keys[2], "c" * 100)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+
+
+def test_ocr_cache_key_hashes_rendered_pixels_without_copy():
+    from PIL import Image
+
+    from pdf_grepper.pdf import loader
+
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 100), "cache key", fontsize=14)
+    img = loader._render_for_ocr(page, dpi=100)
+    copy = Image.frombytes(img.mode, img.size, img.tobytes())
+    copy.info["dpi"] = img.info["dpi"]
+
+    def no_copy():
+        raise AssertionError("the rendered bitmap must not be copied")
+
+    img.tobytes = no_copy
+    assert ocr_mod.OcrCache.key(img) == ocr_mod.OcrCache.key(copy)
+    copy.putpixel((0, copy.size[1] - 1), 0)
+    assert ocr_mod.OcrCache.key(img) != ocr_mod.OcrCache.key(copy)
+
+
+def test_ocr_cache_keeps_engines_apart(tmp_path, monkeypatch):
+    from PIL import Image
+
+    class FakePool:
+        def recognize(self, img):
+            return "POOL\n"
+
+    monkeypatch.setattr(ocr_mod, "tesserocr_available", lambda: True)
+    monkeypatch.setattr(ocr_mod, "get_pool", lambda: FakePool())
+    monkeypatch.setattr(ocr_mod, "ocr_image_to_text", lambda img: "SUBPROCESS\n\x0c")
+    img = Image.new("L", (8, 8), color=255)
+    cache_dir = str(tmp_path / "ocr")
+    assert ocr_mod.recognize(img, engine="pytesseract", cache_dir=cache_dir) == "SUBPROCESS\n\x0c"
+    assert ocr_mod.recognize(img, engine="tesserocr", cache_dir=cache_dir) == "POOL\n"
@@ -38,3 +38,259 @@ def test_pdf_loading_preserves_page_structure():
     finally:
         Path(pdf_path).unlink(missing_ok=True)
 
+
+
+def test_parallel_loading_matches_serial():
+    pdf_path = _make_pdf(9)
+    try:
+        serial = load_pdf_or_docx([pdf_path], ocr_mode="none")
+        parallel = load_pdf_or_docx([pdf_path], ocr_mode="none", workers=2)
+        assert [p.index for p in parallel.pages] == list(range(9))
+        assert parallel.pages == serial.pages
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
+
+
+def test_page_stages_run_once_per_page_across_sources():
+    first, second = _make_pdf(2), _make_pdf(3)
+    seen = []
+
+    def stage(doc_path, page_obj, page):
+        seen.append((doc_path, page_obj.number, page.index))
+
+    try:
+        model = load_pdf_or_docx([first, second], ocr_mode="none", page_stages=[stage])
+        assert len(model.pages) == 5
+        assert seen == [(first, 0, 0), (first, 1, 1), (second, 0, 2), (second, 1, 3), (second, 2, 4)]
+    finally:
+        Path(first).unlink(missing_ok=True)
+        Path(second).unlink(missing_ok=True)
+
+
+def test_preflight_classifies_pages_and_skips_idle_stages(monkeypatch):
+    from pdf_grepper.pdf import loader
+    from pdf_grepper.pdf import ocr as ocr_mod
+
+    fd, pdf_path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    doc = fitz.open()
+    scan = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 850, 1100), False)
+    scan.clear_with(200)
+    doc.new_page()  # blank separator
+    doc.new_page().insert_text((72, 100), "Native text page with plenty of words", fontsize=12)
+    doc.new_page().insert_image(fitz.Rect(0, 0, 612, 792), stream=scan.tobytes("png"))
+    vector = doc.new_page()
+    vector.draw_rect(fitz.Rect(100, 100, 200, 150))
+    vector.insert_text((110, 130), "Pump", fontsize=10)
+    mixed = doc.new_page()
+    mixed.insert_text((72, 100), "Caption for the photo below on this page", fontsize=12)
+    mixed.insert_image(fitz.Rect(72, 200, 300, 400), stream=scan.tobytes("png"))
+    doc.save(pdf_path)
+    doc.close()
+    staged, rendered = [], []
+
+    def diagram_only(doc_path, page_obj, page):
+        staged.append(page.index)
+
+    diagram_only.page_kinds = ("vector", "mixed")
+    real_render = loader._render_for_ocr
+
+    def counting_render(page, **kwargs):
+        rendered.append(page.number)
+        return real_render(page, **kwargs)
+
+    try:
+        monkeypatch.setattr(ocr_mod, "ocr_image_to_text", lambda img: "OCR")
+        monkeypatch.setattr(loader, "_render_for_ocr", counting_render)
+        model = load_pdf_or_docx([pdf_path], ocr_mode="auto", page_stages=[diagram_only])
+        assert [p.kind for p in model.pages] == ["blank", "native", "scanned", "vector", "mixed"]
+        assert staged == [3, 4]
+        # The blank page is never rendered; the scan and the sparse vector page are
+        assert rendered == [2, 3]
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
+
+
+def test_annotation_only_page_keeps_its_text():
+    from pdf_grepper.pdf import preflight
+
+    fd, pdf_path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    doc = fitz.open()
+    page = doc.new_page()
+    page.add_freetext_annot(fitz.Rect(72, 72, 300, 120), "Reviewer note", fontsize=11)
+    widget = fitz.Widget()
+    widget.field_type = fitz.PDF_WIDGET_TYPE_TEXT
+    widget.field_name = "name"
+    widget.field_value = "Alice Smith"
+    widget.rect = fitz.Rect(72, 200, 300, 230)
+    page.add_widget(widget)
+    doc.save(pdf_path)
+    doc.close()
+    try:
+        with fitz.open(pdf_path) as saved:
+            profile = preflight.profile_page(saved[0])
+        assert profile.has_text and profile.kind == "native"
+        model = load_pdf_or_docx([pdf_path], ocr_mode="none")
+        assert [ts.text for ts in model.pages[0].text_blocks] == ["Reviewer note", "Alice Smith"]
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
+
+
+def test_aligned_scans_skip_ocr_and_link_native_pages(monkeypatch):
+    from pdf_grepper.pdf import ocr as ocr_mod
+
+    fd, native_path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    native = fitz.open()
+    for i, lines in enumerate((4, 25, 12)):
+        page = native.new_page()
+        for j in range(lines):
+            page.insert_text((72 + 60 * i, 100 + 24 * j), f"Section {i} line {j} of the native text", fontsize=14)
+    native.save(native_path)
+    fd, scan_path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    scans = fitz.open()
+    # Scans of native pages 2 and 0 (out of order), plus a page with no native counterpart
+    extra = fitz.open()
+    extra_page = extra.new_page()
+    extra_page.draw_rect(fitz.Rect(50, 50, 550, 300), fill=(0, 0, 0))
+    for src in (native[2], native[0], extra_page):
+        png = src.get_pixmap(dpi=100, colorspace=fitz.csGRAY).tobytes("png")
+        scans.new_page().insert_image(fitz.Rect(0, 0, 612, 792), stream=png)
+    scans.save(scan_path)
+    native.close()
+    scans.close()
+    extra.close()
+    ocr_calls = []
+
+    def fake_ocr(img):
+        ocr_calls.append(img.size)
+        return "OCR TEXT"
+
+    try:
+        monkeypatch.setattr(ocr_mod, "ocr_image_to_text", fake_ocr)
+        model = load_pdf_or_docx([native_path, scan_path], ocr_mode="auto", align_sources=True)
+        links = [[(s.source_path, s.page_index) for s in p.aligned] for p in model.pages]
+        assert links == [
+            [(scan_path, 1)],
+            [],
+            [(scan_path, 0)],
+            [(native_path, 2)],
+            [(native_path, 0)],
+            [],
+        ]
+        # Only the unmatched scan is recognised
+        assert len(ocr_calls) == 1
+        assert [ts.text for ts in model.pages[5].text_blocks] == ["OCR TEXT"]
+        assert model.pages[3].text_blocks == [] and model.pages[4].text_blocks == []
+    finally:
+        Path(native_path).unlink(missing_ok=True)
+        Path(scan_path).unlink(missing_ok=True)
+
+
+def test_fused_sources_keep_one_span_per_block():
+    paragraphs = [
+        "The feed pump delivers 40 litres per minute to the primary filter stage.",
+        "Operators must log the pressure reading at the start of every shift.",
+    ]
+    paths = []
+    for variant in (
+        paragraphs,
+        # a second source: an OCR-like reading of the same paragraphs plus one of its own
+        [paragraphs[0].replace("litres", "1itres"), paragraphs[1], "Appendix B lists the spare parts per unit."],
+    ):
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        os.close(fd)
+        doc = fitz.open()
+        page = doc.new_page()
+        for i, text in enumerate(variant):
+            page.insert_text((72, 100 + 60 * i), text, fontsize=10)
+        doc.save(path)
+        doc.close()
+        paths.append(path)
+    try:
+        plain = load_pdf_or_docx(paths, ocr_mode="none")
+        fused = load_pdf_or_docx(paths, ocr_mode="none", fuse_sources=True)
+        assert sum(len(p.text_blocks) for p in plain.pages) == 5
+        assert [ts.text for ts in fused.pages[0].text_blocks] == paragraphs
+        assert [ts.text for ts in fused.pages[1].text_blocks] == ["Appendix B lists the spare parts per unit."]
+        for ts in fused.pages[0].text_blocks:
+            assert [(a.source_path, a.page_index) for a in ts.alt_spans] == [(paths[1], 0)]
+    finally:
+        for path in paths:
+            Path(path).unlink(missing_ok=True)
+
+
+def test_fusion_length_prefilter_keeps_reachable_pairs():
+    from rapidfuzz import fuzz
+    from rapidfuzz.utils import default_process
+
+    from pdf_grepper.pdf.fuse import FUSE_THRESHOLD, SpanFuser
+    from pdf_grepper.types import Page, SourceSpan, TextSpan
+
+    words = " ".join(f"w{i:05d}" for i in range(40))
+
+    def fused(shorter: int, longer: int) -> bool:
+        fuser = SpanFuser()
+        for path, n in (("a.pdf", longer), ("b.pdf", shorter)):
+            span = TextSpan(text=words[:n], span=SourceSpan(page_index=0, source_path=path))
+            fuser.fuse_page(Page(index=0, text_blocks=[span]))
+        return fuser.removed == 1
+
+    # a prefix scores exactly 200 * shorter / (shorter + longer): 94.7 for 90 vs 100 chars
+    assert fuzz.ratio(default_process(words[:90]), default_process(words[:100])) > FUSE_THRESHOLD
+    assert fused(90, 100)
+    assert fused(100, 117)  # 92.2
+    assert not fused(100, 118)  # 91.7
+
+
+def test_fusion_keeps_native_span_on_its_page_with_ocr_alternate():
+    import pytest
+
+    from pdf_grepper.pdf.fuse import SpanFuser
+    from pdf_grepper.pipeline import run_pipeline
+    from pdf_grepper.types import Page, SourceSpan, TextSpan
+
+    text = "The feed pump delivers 40 litres per minute to the primary filter stage."
+    ocr = TextSpan(text=text.replace("litres", "1itres"), span=SourceSpan(page_index=0, source_path="scan.pdf", note="ocr"))
+    native = TextSpan(text=text, span=SourceSpan(page_index=1, source_path="native.pdf"))
+    pages = [Page(index=0, text_blocks=[ocr]), Page(index=1, text_blocks=[native])]
+    fuser = SpanFuser()
+    for page in pages:
+        fuser.fuse_page(page)
+    assert pages[0].text_blocks == []
+    assert pages[1].text_blocks == [native] and native.text == text
+    assert native.span.source_path == "native.pdf" and native.span.page_index == 1
+    assert native.alt_spans == [ocr.span]
+    # a third source now fuses into the native span
+    docx = TextSpan(text=text, span=SourceSpan(source_path="variant.docx"))
+    fuser.fuse_page(Page(index=2, text_blocks=[docx]))
+    assert native.alt_spans == [ocr.span, docx.span] and fuser.removed == 2
+
+    # fusion can still change pages that a stream window has already exported
+    with pytest.raises(ValueError, match="stream_window"):
+        run_pipeline(input_paths=[b"%PDF-1.7"], ttl_out="unused.ttl", fuse_sources=True, stream_window=1)
+
+
+def test_in_memory_inputs_match_path_loading():
+    import io
+
+    from pdf_grepper.inputs import InputDocument
+
+    pdf_path = _make_pdf(3)
+    try:
+        data = Path(pdf_path).read_bytes()
+        from_path = load_pdf_or_docx([pdf_path], ocr_mode="none")
+        stream = io.BytesIO(data)
+        model = load_pdf_or_docx([data, stream, InputDocument(data, name="upload.pdf")], ocr_mode="none", workers=2)
+        assert model.sources == ["<input-0>.pdf", "<input-1>.pdf", "upload.pdf"]
+        assert len(model.pages) == 9
+        for k, name in enumerate(model.sources):
+            pages = model.pages[3 * k : 3 * k + 3]
+            assert [ts.text for p in pages for ts in p.text_blocks] == [
+                ts.text for p in from_path.pages for ts in p.text_blocks
+            ]
+            assert {ts.span.source_path for p in pages for ts in p.text_blocks} == {name}
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
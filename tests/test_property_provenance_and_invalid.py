@@ -50,3 +50,25 @@ def test_invalid_file_error_includes_path():
     finally:
         Path(bogus_path).unlink(missing_ok=True)
 
+
+
+def test_missing_file_raises_value_error_and_closes_opened_inputs(monkeypatch):
+    from pdf_grepper import inputs
+
+    good = _make_pdf_with_text("Doc page")
+    missing = good + ".missing.pdf"
+    closed = []
+    close = inputs.InputDocument.close
+
+    def _close(self):
+        closed.append(self.name)
+        close(self)
+
+    monkeypatch.setattr(inputs.InputDocument, "close", _close)
+    try:
+        with pytest.raises(ValueError) as excinfo:
+            load_pdf_or_docx([good, missing], ocr_mode="none")
+        assert str(excinfo.value).startswith(f"Failed to open PDF: {missing}")
+        assert closed == [good]
+    finally:
+        Path(good).unlink(missing_ok=True)
@@ -39,3 +39,38 @@ def test_relation_unique_identifiers():
     ids = [r.id for r in rels]
     assert len(ids) == len(set(ids)), "All relation IDs must be unique"
 
+
+def test_relations_found_inside_longer_lines():
+    entities = _entities_for(["Billing Service", "Ledger API", "Billing", "Auth"])
+    texts: List[Tuple[str, Optional[SourceSpan]]] = [
+        ("Since 2021 the Billing Service now uses the Ledger API for postings.", None),
+        ("Nothing to see on this line.", None),
+        ("Auth   depends\non Billing Service and integrates with Ledger API", None),
+        ("The billing module causes no trouble", None),
+    ]
+    by_id = {e.id: e.text for e in entities}
+    rels = {(by_id[r.subject_id], r.predicate, by_id[r.object_id]): r.confidence for r in extract_relations(entities, texts)}
+    assert rels == {
+        ("Billing Service", "pg:uses", "Ledger API"): 0.4,
+        ("Auth", "pg:dependsOn", "Billing Service"): 0.4,
+        ("Billing Service", "pg:integratesWith", "Ledger API"): 0.4,
+    }
+    exact = extract_relations(entities, [("billing service uses ledger api", None)])
+    assert [r.confidence for r in exact] == [0.5]
+
+
+def test_negated_or_hedged_sentences_do_not_link():
+    from pdf_grepper.ie import relations
+
+    entities = _entities_for(["Billing Service", "Ledger API"])
+    for line in (
+        "The Billing Service no longer uses the Ledger API.",
+        "The Billing Service does not use or depend on anything; it never uses the Ledger API.",
+        "The Billing Service doesn't depend on the Ledger API.",
+        "The Billing Service may be part of the Ledger API.",
+    ):
+        assert extract_relations(entities, [(line, None)]) == [], line
+    assert [r.predicate for r in extract_relations(entities, [("Billing Service uses Ledger API", None)])] == ["pg:uses"]
+    # the prefilter only passes lines carrying a trigger's distinctive word
+    assert "is" not in relations._TRIGGER_WORDS
+    assert all(any(word in trigger for word in relations._TRIGGER_WORDS) for trigger in relations.TRIGGERS)
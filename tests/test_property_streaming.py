@@ -0,0 +1,66 @@
+import os
+import tempfile
+from pathlib import Path
+
+import fitz  # PyMuPDF
+from rdflib import Graph
+
+from pdf_grepper.pdf.loader import iter_pages
+from pdf_grepper.pipeline import run_pipeline
+
+
+def _make_pdf(num_pages: int) -> str:
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    doc = fitz.open()
+    for i in range(num_pages):
+        page = doc.new_page()
+        page.insert_text((72, 100), f"Acme Rocket page {i+1} weighs {i+10} kg", fontsize=14)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def _text_labels(g: Graph) -> set:
+    return {str(o) for s, p, o in g if str(p).endswith("#label") and "/text/" in str(s)}
+
+
+def test_iter_pages_is_lazy_and_ordered():
+    pdf_path = _make_pdf(4)
+    try:
+        pages = iter_pages([pdf_path], ocr_mode="none")
+        first = next(pages)
+        assert first.index == 0
+        assert [p.index for p in pages] == [1, 2, 3]
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
+
+
+def test_streaming_run_matches_batch_findings(tmp_path):
+    pdf_path = _make_pdf(5)
+    try:
+        batch = run_pipeline(
+            input_paths=[pdf_path],
+            ttl_out=str(tmp_path / "batch.ttl"),
+            ocr_mode="none",
+            offline=True,
+        )
+        streamed = run_pipeline(
+            input_paths=[pdf_path],
+            ttl_out=str(tmp_path / "stream.ttl"),
+            ocr_mode="none",
+            offline=True,
+            stream_window=2,
+        )
+        assert streamed.pages == []
+        assert streamed.extra_metadata["page_count"] == "5"
+        assert sorted(e.text for e in streamed.entities) == sorted(e.text for e in batch.entities)
+        assert len(streamed.dimensions) == len(batch.dimensions)
+
+        # Chunked Turtle output parses and carries every page's text
+        g_stream = Graph().parse(tmp_path / "stream.ttl", format="turtle")
+        g_batch = Graph().parse(tmp_path / "batch.ttl", format="turtle")
+        assert _text_labels(g_stream) == _text_labels(g_batch)
+        assert len(_text_labels(g_stream)) == 5
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)